@@ -20,11 +20,15 @@
 
 
 import argparse
-import os, sys, stat, datetime
+import os, sys, io, stat, datetime
 import shutil, subprocess
 import json
 import ibm_db
 
+# shared module to read collection files, compressed or not
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+import histfiles
+
 # function to execute sql file
 def exec_sql_file(conn, path):
 
@@ -86,6 +90,7 @@ def setup_IBMHIST(conn, bldrtn_path):
 
     # register procedures
     print("    Registering procedures ...")
+    exec_sql_file(conn, "proc_rescan.sql")
     exec_sql_file(conn, "proc_collect.sql")
     exec_sql_file(conn, "proc_archive.sql")
 
@@ -123,7 +128,7 @@ def drop_IBMHIST(conn):
             exit()
 
 # function to test arguments and set configurations in IBMHIST.TAB_CONFIG
-def config_IBMHIST(conn, coll_path, arch_path, max_size, arch_cmd, arch_ext):
+def config_IBMHIST(conn, coll_path, arch_path, max_size, arch_cmd, arch_ext, arch_jobs, arch_time_limit, comp_cmd, comp_ext):
 
     print("Configuring IBMHIST settings ...")
 
@@ -180,6 +185,37 @@ def config_IBMHIST(conn, coll_path, arch_path, max_size, arch_cmd, arch_ext):
     ibm_db.exec_immediate(conn, "INSERT INTO IBMHIST.TAB_CONFIG VALUES ( 'ARCH_CMD', '%s', 'COMMAND USED TO ARCHIVE HOURLY DIRECTORIES') " % arch_cmd )
     ibm_db.exec_immediate(conn, "INSERT INTO IBMHIST.TAB_CONFIG VALUES ( 'ARCH_EXT', '%s', 'EXTENSION OF ARCHIVE HOURLY DIRECTORIES') " % arch_ext )
 
+    # add number of hourly directories archived at once and time limit of each archival run
+    print("    Setting ARCH_JOBS to '%s' and ARCH_TIME_LIMIT to '%s' seconds ..." % (arch_jobs, arch_time_limit) )
+    assert 1 <= arch_jobs <= 32, "Archival jobs: %s is not between 1 and 32" % (arch_jobs)
+    assert arch_time_limit >= 0, "Archival time limit: %s is negative" % (arch_time_limit)
+    ibm_db.exec_immediate(conn, "INSERT INTO IBMHIST.TAB_CONFIG VALUES ( 'ARCH_JOBS', '%d', 'NUMBER OF HOURLY DIRECTORIES ARCHIVED AT ONCE') " % arch_jobs )
+    ibm_db.exec_immediate(conn, "INSERT INTO IBMHIST.TAB_CONFIG VALUES ( 'ARCH_TIME_LIMIT', '%d', 'SECONDS EACH ARCHIVAL RUN STARTS ARCHIVING HOURLY DIRECTORIES FOR') " % arch_time_limit )
+
+    # add compression command and compression extension
+    print("    Setting COMP_CMD to '%s' and COMP_EXT to '%s' ..." % (comp_cmd, comp_ext) )
+    if comp_cmd:
+        assert comp_ext in histfiles.compress_exts, "Compression extension: %s is not one of: %s" % (comp_ext, ", ".join(histfiles.compress_exts))
+        # test compression functionality by compressing a copy of task_details.json
+        src, dest = "comp_test.json", "comp_test.json" + comp_ext
+        shutil.copyfile("task_details.json", src)
+        comp_cmd_test = comp_cmd.replace("_src_", src).replace("_dest_", dest)
+        if os.path.exists(dest):
+            os.remove(dest)
+        subprocess.check_call(comp_cmd_test, shell=True)
+        assert os.path.exists(dest), "Compression command: %s failed, could not find compressed file %s " % (comp_cmd, dest)
+        with open("task_details.json", "rb") as f:
+            content = f.read()
+        with histfiles.open_file(dest) as f:
+            comp_content = f.read()
+        os.remove(dest)
+        if os.path.exists(src):
+            os.remove(src)
+        if comp_content != content:
+            raise RuntimeError("Compression command: %s failed, could not read compressed file %s " % (comp_cmd, dest))
+    ibm_db.exec_immediate(conn, "INSERT INTO IBMHIST.TAB_CONFIG VALUES ( 'COMP_CMD', '%s', 'COMMAND USED TO COMPRESS COLLECTION FILES') " % comp_cmd )
+    ibm_db.exec_immediate(conn, "INSERT INTO IBMHIST.TAB_CONFIG VALUES ( 'COMP_EXT', '%s', 'EXTENSION OF COMPRESSED COLLECTION FILES') " % comp_ext )
+
     # add task_details.json path configuration
     task_details_path = os.path.realpath("task_details.json")
     print("    Setting TASK_DETAILS_PATH to '%s' ..." % (task_details_path) )
@@ -210,7 +246,7 @@ def test_IBMHIST(conn, database):
     assert coll_file, "Collection file was not found after calling IBMHIST.PROC_COLLECT: %s" % os.path.join(coll_dir['PATH'], 'DUMMY_SQL_TASK_timestamp.del')
     # read collection file and ensure header and data is correct
     coll_file = os.path.join(coll_dir['PATH'], coll_file[0])
-    with open(coll_file) as f:
+    with io.TextIOWrapper(histfiles.open_file(coll_file)) as f:
         lines = f.readlines()
         assert "DUMMY_HEADER" in lines[0], "Header not found in collection file %s after calling IBMHIST.PROC_COLLECT on a dummy SQL task" % coll_file
         assert "DUMMY_DATA" in lines[1], "Data not found in collection file %s after calling IBMHIST.PROC_COLLECT on a dummy SQL task" % coll_file
@@ -235,7 +271,7 @@ def test_IBMHIST(conn, database):
     assert coll_file, "Collection file was not found after calling IBMHIST.PROC_COLLECT: %s" % os.path.join(coll_dir['PATH'], 'DUMMY_SYS_TASK_timestamp.del')
     # read collection file and ensure header and data is correct
     coll_file = os.path.join(coll_dir['PATH'], coll_file[0])
-    with open(coll_file) as f:
+    with io.TextIOWrapper(histfiles.open_file(coll_file)) as f:
         lines = f.readlines()
         assert "DUMMY_HEADER" in lines[0], "Header not found in collection file %s after calling IBMHIST.PROC_COLLECT on a dummy SYS task" % coll_file
         assert "DUMMY_DATA" in lines[1], "Data not found in collection file %s after calling IBMHIST.PROC_COLLECT on a dummy SYS task" % coll_file
@@ -384,6 +420,17 @@ def schedule_tasks(conn, database, in_coll_lvl, env):
     # schedule IBMHIST.PROC_ARCHIVE (database) task
     ibm_db.exec_immediate(conn, "CALL SYSPROC.ADMIN_TASK_ADD ( 'ARCHIVE', NULL, NULL, NULL, '*/10 * * * *', 'IBMHIST', 'PROC_ARCHIVE', 'values (''%s'')', NULL, 'IBMHIST Archival' )" % (database) )
 
+    # IBMHIST.PROC_COLLECT only copies task_details.json on first collection into an hourly directory, so sync the copy in current collection directories
+    stmt = ibm_db.exec_immediate(conn, "SELECT VALUE FROM IBMHIST.TAB_CONFIG WHERE CONFIG_NAME = 'TASK_DETAILS_PATH'")
+    task_details_path = ibm_db.fetch_row(stmt) and ibm_db.result(stmt, "VALUE")
+    if task_details_path:
+        stmt = ibm_db.exec_immediate(conn, "SELECT PATH FROM IBMHIST.TAB_DIRS WHERE STATUS = 'COLL'")
+        while ibm_db.fetch_row(stmt):
+            coll_path = ibm_db.result(stmt, "PATH")
+            print("    Syncing task_details_copy.json in collection directory '%s' ..." % (coll_path) )
+            sync_stmt, ret_source, ret_target, retcode = ibm_db.callproc(conn, 'IBMHIST.SYNC_FILE', (task_details_path, os.path.join(coll_path, 'task_details_copy.json'), 0))
+            assert retcode is None or retcode >= 0, "Failed to sync task_details.json to collection directory: %s, external.C line number: %s" % (coll_path, retcode)
+
     # collection will begin in approximately 5 minutes
     print("    Collection will begin in approximately 5 minutes ...")
 
@@ -461,6 +508,18 @@ def main():
                             else '.tar.gz',
                         help='extension of archived hourly folders beginning with ".", default: %(default)s')
 
+    # archival jobs and time limit
+    parser.add_argument('-ajobs', '--arch_jobs', metavar='', type=int, default=2,
+                        help='number of hourly folders archived at once, between 1 and 32, default: %(default)s')
+    parser.add_argument('-atl', '--arch_time_limit', metavar='', type=int, default=300,
+                        help='seconds each archival run starts archiving hourly folders for, remaining folders are archived by the next run, 0 is unlimited, default: %(default)s')
+
+    # compression command and extension of collection files
+    parser.add_argument('-ccmd', '--comp_cmd', metavar='', default='',
+                        help='command used to compress collection files with "_src_" and "_dest_" placeholders, for example: "gzip -c _src_ > _dest_", collection files are not compressed if unspecified')
+    parser.add_argument('-cext', '--comp_ext', metavar='', default='',
+                        help='extension of compressed collection files beginning with ".", one of: %s' % ", ".join(histfiles.compress_exts))
+
     # collection level of tasks
     parser.add_argument('-lvl', '--coll_lvl', metavar='', type=int,
                         help='scope of tasks to schedule (1 will only schedule key tasks, 2 will schedule more), all tasks scheduled if unspecified')
@@ -492,7 +551,7 @@ def main():
     elif args.update_config_only:
 
         # test arguments and set configurations in IBMHIST.TAB_CONFIG
-        config_IBMHIST(conn, args.coll_path, args.arch_path, args.max_size, args.arch_cmd, args.arch_ext)
+        config_IBMHIST(conn, args.coll_path, args.arch_path, args.max_size, args.arch_cmd, args.arch_ext, args.arch_jobs, args.arch_time_limit, args.comp_cmd, args.comp_ext)
 
     elif args.update_tasks_only:
 
@@ -520,7 +579,7 @@ def main():
         setup_IBMHIST(conn, args.bldrtn_path)
 
         # test arguments and set configurations in IBMHIST.TAB_CONFIG
-        config_IBMHIST(conn, args.coll_path, args.arch_path, args.max_size, args.arch_cmd, args.arch_ext)
+        config_IBMHIST(conn, args.coll_path, args.arch_path, args.max_size, args.arch_cmd, args.arch_ext, args.arch_jobs, args.arch_time_limit, args.comp_cmd, args.comp_ext)
 
         # test basic functionality of IBMHIST.PROC_COLLECT and IBMHIST.PROC_ARCHIVE
         test_IBMHIST(conn, args.database)
@@ -29,27 +29,38 @@
 // path_get_type                            //
 // path_get_size                            //
 // copy_file                                //
+// sync_file                                //
 // clob_to_file                             //
 // make_directory                           //
 // remove_directory                         //
 // move_directory                           //
 // sizeof_directory                         //
+// sizeof_files                             //
+// system_calls                             //
 //                                          //
 // SQL Wrapping Functions:                  //
 // sql_path_exists                          //
 // sql_path_readable_writable               //
 // sql_copy_file                            //
+// sql_sync_file                            //
 // sql_clob_to_file                         //
 // sql_make_directory                       //
 // sql_remove_directory                     //
 // sql_move_directory                       //
 // sql_sizeof_directory                     //
+// sql_sizeof_files                         //
 // sql_is_windows                           //
 // sql_system_call                          //
+// sql_system_calls                         //
 //                                          //
 //////////////////////////////////////////////
 
 
+// copy_file_range is a GNU extension on Linux
+#if defined __linux__ && ! defined _GNU_SOURCE
+    #define _GNU_SOURCE
+#endif
+
 #include <stdlib.h>
 #include <stdio.h>
 #include <errno.h>
@@ -63,6 +74,14 @@
 #else
     #include <unistd.h>
     #include <dirent.h>
+    #include <sys/types.h>
+    #include <sys/wait.h>
+#endif
+
+// copy_file_range is available from glibc 2.27, copy_file falls back to fread/fwrite without it
+#if defined __GLIBC__ && ( __GLIBC__ > 2 || ( __GLIBC__ == 2 && __GLIBC_MINOR__ >= 27 ) )
+    #include <fcntl.h>
+    #define OS_COPY_FILE_RANGE
 #endif
 
 #if defined DB2NT
@@ -122,6 +141,9 @@
 
 #define OS_MAX_PATH_LEN ( 256 )
 #define FILE_IO_BUFFER_SIZE ( 4096 )
+#define OS_MAX_CMD_LEN ( 4096 )
+#define OS_MAX_JOBS ( 32 )
+#define OS_MAX_CALLS ( 1024 )
 
 #if defined(__cplusplus)
 extern "C" {
@@ -149,9 +171,14 @@ int path_get_type ( const char * path ) ;
 // returns path size in bytes, or (-1 * __LINE__) if error
 long long int path_get_size ( const char * path ) ;
 
-// writes or appends from source path to target path using fread/fwrite
+// writes or appends from source path to target path using copy_file_range if available, else fread/fwrite
 int copy_file ( const char * source_path, const char * target_path, const char * mode ) ;
 
+// writes from source path to target path using copy_file, only if target does not exist or its content differs
+// uses stat64/_stat64 to skip comparing content if sizes are equal and target is not older than source
+// returns 1 if copied, 0 if target is unchanged, or (-1 * __LINE__) if error
+int sync_file ( const char * source_path, const char * target_path ) ;
+
 // writes or appends from clob to path using fwrite
 int clob_to_file ( const char * path, const char * mode, const SQLUDF_CLOB * in_clob ) ;
 
@@ -167,6 +194,14 @@ int move_directory ( const char * source_path, const char * target_path ) ;
 // recursively gets size of directory
 long long int sizeof_directory ( const char * path ) ;
 
+// gets size of files in directory with names starting with prefix, without recursing into subdirectories
+long long int sizeof_files ( const char * path, const char * prefix ) ;
+
+// runs commands separated by new lines using fork/exec or CreateProcess, with at most jobs running at once
+// sets statuses to one character for each command in order, '0' if it returned 0, '1' otherwise
+// returns 0 if all commands returned 0, or (-1 * __LINE__) if error
+int system_calls ( const char * commands, const int jobs, char * statuses ) ;
+
 //////////////////////////////////////////////
 //           SQL Wrapper Functions          //
 // wrap around core functions to interface  //
@@ -206,6 +241,18 @@ void SQL_API_FN sql_copy_file (
     SQLUDF_NULLIND * retcode_ind,
     SQLUDF_TRAIL_ARGS ) ;
 
+// writes from source_path to target_path
+// only if target_path does not exist or its content differs from source_path
+// sets retcode to 1 if copied, 0 if unchanged, (-1 * __LINE__) on error
+void SQL_API_FN sql_sync_file (
+    SQLUDF_VARCHAR * source_path,
+    SQLUDF_VARCHAR * target_path,
+    SQLUDF_INTEGER * retcode,
+    SQLUDF_NULLIND * source_path_ind,
+    SQLUDF_NULLIND * target_path_ind,
+    SQLUDF_NULLIND * retcode_ind,
+    SQLUDF_TRAIL_ARGS ) ;
+
 // writes if mode="w" or appends if mode="a"
 // from in_clob to path
 // sets retcode to 0 on success, (-1 * __LINE__) on error
@@ -258,6 +305,17 @@ void SQL_API_FN sql_sizeof_directory (
     SQLUDF_NULLIND * retcode_ind,
     SQLUDF_TRAIL_ARGS ) ;
 
+// gets size of files in directory path with names starting with prefix
+// sets retcode to size in bytes on success, (-1 * __LINE__) on error
+void SQL_API_FN sql_sizeof_files (
+    SQLUDF_VARCHAR * path,
+    SQLUDF_VARCHAR * prefix,
+    SQLUDF_BIGINT  * retcode,
+    SQLUDF_NULLIND * path_ind,
+    SQLUDF_NULLIND * prefix_ind,
+    SQLUDF_NULLIND * retcode_ind,
+    SQLUDF_TRAIL_ARGS ) ;
+
 // sets retcode to 1 if windows, 0 otherwise
 void SQL_API_FN sql_is_windows (
     SQLUDF_INTEGER * retcode,
@@ -273,6 +331,20 @@ void SQL_API_FN sql_system_call (
     SQLUDF_NULLIND *retcode_ind,
     SQLUDF_TRAIL_ARGS ) ;
 
+// executes commands separated by new lines, with at most jobs executing at once
+// sets statuses to '0' for each command which returned 0, '1' otherwise
+// sets retcode to 0 on success, (-1 * __LINE__) on error
+void SQL_API_FN sql_system_calls (
+    SQLUDF_VARCHAR * commands,
+    SQLUDF_INTEGER * jobs,
+    SQLUDF_VARCHAR * statuses,
+    SQLUDF_INTEGER * retcode,
+    SQLUDF_NULLIND * commands_ind,
+    SQLUDF_NULLIND * jobs_ind,
+    SQLUDF_NULLIND * statuses_ind,
+    SQLUDF_NULLIND * retcode_ind,
+    SQLUDF_TRAIL_ARGS ) ;
+
 
 #if defined(__cplusplus)
 }
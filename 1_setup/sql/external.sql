@@ -62,6 +62,18 @@ external name 'external!sql_copy_file' @
 grant execute on procedure IBMHIST.COPY_FILE to PUBLIC @
 
 
+create or replace procedure IBMHIST.SYNC_FILE (
+    in source_path varchar(256),
+    in target_path varchar(256),
+    out retcode int
+)
+language c
+no sql
+parameter style sql
+external name 'external!sql_sync_file' @
+grant execute on procedure IBMHIST.SYNC_FILE to PUBLIC @
+
+
 create or replace procedure IBMHIST.CLOB_TO_FILE (
     in path varchar(256),
     in mode char,
@@ -120,6 +132,18 @@ external name 'external!sql_sizeof_directory' @
 grant execute on procedure IBMHIST.SIZEOF_DIRECTORY to PUBLIC @
 
 
+create or replace procedure IBMHIST.SIZEOF_FILES (
+    in path varchar(256),
+    in prefix varchar(256),
+    out retcode bigint
+)
+language c
+no sql
+parameter style sql
+external name 'external!sql_sizeof_files' @
+grant execute on procedure IBMHIST.SIZEOF_FILES to PUBLIC @
+
+
 create or replace procedure IBMHIST.IS_WINDOWS (
     out retcode int
 )
@@ -138,4 +162,17 @@ language c
 no sql
 parameter style sql
 external name 'external!sql_system_call' @
-grant execute on procedure IBMHIST.SYSTEM_CALL to PUBLIC @
\ No newline at end of file
+grant execute on procedure IBMHIST.SYSTEM_CALL to PUBLIC @
+
+
+create or replace procedure IBMHIST.SYSTEM_CALLS (
+    in commands varchar(32672),
+    in jobs int,
+    out statuses varchar(1024),
+    out retcode int
+)
+language c
+no sql
+parameter style sql
+external name 'external!sql_system_calls' @
+grant execute on procedure IBMHIST.SYSTEM_CALLS to PUBLIC @
\ No newline at end of file
@@ -44,6 +44,12 @@ begin
     declare arch_status                   varchar(4) ;
     declare base_arch_cmd, arch_cmd       varchar(512) ;
     declare base_arch_ext, arch_ext       varchar(512) ;
+    declare arch_cmds, batch_paths        varchar(32672) ;
+    declare arch_statuses                 varchar(1024) ;
+    declare arch_errs                     varchar(2048)   default '' ;
+    declare arch_jobs, arch_time_limit    int ;
+    declare start_time                    timestamp ;
+    declare batch_size, batch_index       int             default 0 ;
 
     declare err_msg                       varchar(2048)   default '' ;
     declare vSQLCODE, SQLCODE, retcode    int             default 0 ;
@@ -143,79 +149,160 @@ begin
         goto exit ;
     end if ;
 
-    -- loop through past data collection directories in IBMHIST.TAB_DIRS and archive them
-    open coll_cur ;
-    fetch from coll_cur into cur_path ;
-    while ( vSQLCODE = 0 and vSQLSTATE = '00000' )
+    -- get number of directories archived at once and time limit in seconds of each run, 0 if unlimited
+    -- directories which are not archived within the time limit are archived by the next run
+    select INT ( COALESCE ( MAX ( value ), '1' ) ) into arch_jobs
+        from IBMHIST.TAB_CONFIG
+        where config_name = 'ARCH_JOBS' ;
+    select INT ( COALESCE ( MAX ( value ), '0' ) ) into arch_time_limit
+        from IBMHIST.TAB_CONFIG
+        where config_name = 'ARCH_TIME_LIMIT' ;
+
+    if ( vSQLCODE < 0 or vSQLSTATE != '00000' or retcode < 0 ) then
+        set err_msg = 'Failed to get archival jobs or archival time limit from IBMHIST.TAB_CONFIG' ;
+        goto exit ;
+    end if ;
+
+    set arch_jobs = LEAST ( GREATEST ( arch_jobs, 1 ), 32 ) ;
+    set start_time = current timestamp ;
+    set batch_size = arch_jobs ;
+
+    -- archive past data collection directories in IBMHIST.TAB_DIRS in batches of up to arch_jobs directories
+    -- until there are none left or the time limit is reached
+    while ( batch_size = arch_jobs and
+            ( arch_time_limit <= 0 or TIMESTAMPDIFF ( 2, CHAR ( current timestamp - start_time ) ) < arch_time_limit ) )
     do
 
-        -- reset parameters
-        set arch_path = base_arch_path ;
-        set arch_cmd = base_arch_cmd ;
-        set arch_ext = base_arch_ext ;
+        -- get archival commands and paths of next batch of past data collection directories
+        -- paths are kept with the commands, so the directories which were archived are the ones removed
+        set arch_cmds = '' ;
+        set batch_paths = '' ;
+        set batch_size = 0 ;
+        open coll_cur ;
+        fetch from coll_cur into cur_path ;
+        while ( vSQLCODE = 0 and vSQLSTATE = '00000' and batch_size < arch_jobs )
+        do
 
-        -- check if current data collection path exists
-        call IBMHIST.PATH_EXISTS ( cur_path, retcode ) ;
+            -- reset parameters
+            set arch_path = base_arch_path ;
+            set arch_cmd = base_arch_cmd ;
+            set arch_ext = base_arch_ext ;
 
-        if ( vSQLCODE < 0 or vSQLSTATE != '00000' or retcode < 0 ) then
-            set err_msg = 'Failed to find data collection: ' || cur_path || ', external.C line number: ' || retcode ;
-            goto exit ;
-        end if ;
+            -- check if current data collection path exists
+            call IBMHIST.PATH_EXISTS ( cur_path, retcode ) ;
 
-        -- set data archival path
-        set cur_name = RIGHT ( cur_path, LENGTH ( cur_path ) - LOCATE_IN_STRING ( cur_path , p_sep, -1 ) ) ;
-        set arch_path = arch_path || p_sep || cur_name || arch_ext ;
+            if ( vSQLCODE < 0 or vSQLSTATE != '00000' or retcode < 0 ) then
+                set err_msg = 'Failed to find data collection: ' || cur_path || ', external.C line number: ' || retcode ;
+                goto exit ;
+            end if ;
 
-        if ( vSQLCODE < 0 or vSQLSTATE != '00000' or retcode < 0 ) then
-            set err_msg = 'Failed to set data archival path' ;
-            goto exit ;
-        end if ;
+            -- set data archival path
+            set cur_name = RIGHT ( cur_path, LENGTH ( cur_path ) - LOCATE_IN_STRING ( cur_path , p_sep, -1 ) ) ;
+            set arch_path = arch_path || p_sep || cur_name || arch_ext ;
 
-        -- archive
-        set arch_cmd = REPLACE ( arch_cmd, '_src_', cur_path ) ;
-        set arch_cmd = REPLACE ( arch_cmd, '_dest_', arch_path ) ;
-        call IBMHIST.SYSTEM_CALL ( arch_cmd , retcode ) ;
+            if ( vSQLCODE < 0 or vSQLSTATE != '00000' or retcode < 0 ) then
+                set err_msg = 'Failed to set data archival path' ;
+                goto exit ;
+            end if ;
 
-        if ( vSQLCODE < 0 or vSQLSTATE != '00000' or retcode < 0 ) then
-            set err_msg = 'Failed to archive: ' || cur_path || ' to: ' || arch_path || ', system return code: ' || retcode ;
-            goto exit ;
-        end if ;
+            -- add archival command and path, both are separated by new lines
+            set arch_cmd = REPLACE ( arch_cmd, '_src_', cur_path ) ;
+            set arch_cmd = REPLACE ( arch_cmd, '_dest_', arch_path ) ;
+            set arch_cmds = arch_cmds || arch_cmd || CHR ( 10 ) ;
+            set batch_paths = batch_paths || cur_path || CHR ( 10 ) ;
+            set batch_size = batch_size + 1 ;
 
-        -- check if data archival path exists
-        call IBMHIST.PATH_EXISTS ( arch_path, retcode ) ;
+            fetch from coll_cur into cur_path ;
+        end while ;
+        close coll_cur ;
 
-        if ( vSQLCODE < 0 or vSQLSTATE != '00000' or retcode < 0 ) then
-            set err_msg = 'Failed to find data archival: ' || arch_path || ', external.C line number: ' || retcode ;
-            goto exit ;
-        end if ;
+        set vSQLCODE = 0 ;
+        set vSQLSTATE = '00000' ;
 
-        -- remove current data collection path
-        call IBMHIST.REMOVE_DIRECTORY ( cur_path, retcode ) ;
+        -- archive batch, with all of its directories archived at once
+        -- statuses has a '0' for each directory which was archived, a failed archival is reported after the others are recorded
+        if ( batch_size > 0 ) then
+
+            call IBMHIST.SYSTEM_CALLS ( arch_cmds, arch_jobs, arch_statuses, retcode ) ;
+
+            if ( vSQLCODE < 0 or vSQLSTATE != '00000' or arch_statuses is null ) then
+                set err_msg = 'Failed to archive batch of ' || batch_size || ' data collections, external.C line number: ' || retcode ;
+                goto exit ;
+            end if ;
+
+            set retcode = 0 ;
 
-        if ( vSQLCODE < 0 or vSQLSTATE != '00000' or retcode < 0 ) then
-            set err_msg = 'Failed to remove data collection:' || cur_path || ', external.C line number: ' || retcode ;
-            goto exit ;
         end if ;
 
-        -- update IBMHIST.TAB_DIRS
-        call IBMHIST.SIZEOF_DIRECTORY ( arch_path, arch_size ) ;
-        set arch_status = 'ARCH' ;
+        -- remove archived data collection directories of batch and update IBMHIST.TAB_DIRS
+        set batch_index = 0 ;
+        while ( batch_index < batch_size )
+        do
 
-        update IBMHIST.TAB_DIRS u
-            set u.path = arch_path, u.size = arch_size, u.status = arch_status
-            where u.path = cur_path ;
+            -- get next path of batch
+            set cur_path = SUBSTR ( batch_paths, 1, LOCATE ( CHR ( 10 ), batch_paths ) - 1 ) ;
+            set batch_paths = SUBSTR ( batch_paths, LOCATE ( CHR ( 10 ), batch_paths ) + 1 ) ;
+            set batch_index = batch_index + 1 ;
 
-        if ( vSQLCODE < 0 or vSQLSTATE != '00000' or retcode < 0 ) then
-            set err_msg = 'Failed to update IBMHIST.TAB_DIRS' ;
+            -- set data archival path
+            set cur_name = RIGHT ( cur_path, LENGTH ( cur_path ) - LOCATE_IN_STRING ( cur_path , p_sep, -1 ) ) ;
+            set arch_path = base_arch_path || p_sep || cur_name || base_arch_ext ;
+
+            if ( SUBSTR ( arch_statuses, batch_index, 1 ) = '0' ) then
+
+                -- check if data archival path exists
+                call IBMHIST.PATH_EXISTS ( arch_path, retcode ) ;
+
+                if ( vSQLCODE < 0 or vSQLSTATE != '00000' or retcode < 0 ) then
+                    set err_msg = 'Failed to find data archival: ' || arch_path || ', external.C line number: ' || retcode ;
+                    goto exit ;
+                end if ;
+
+                -- remove current data collection path
+                call IBMHIST.REMOVE_DIRECTORY ( cur_path, retcode ) ;
+
+                if ( vSQLCODE < 0 or vSQLSTATE != '00000' or retcode < 0 ) then
+                    set err_msg = 'Failed to remove data collection:' || cur_path || ', external.C line number: ' || retcode ;
+                    goto exit ;
+                end if ;
+
+                -- update IBMHIST.TAB_DIRS
+                call IBMHIST.SIZEOF_DIRECTORY ( arch_path, arch_size ) ;
+                set arch_status = 'ARCH' ;
+
+                update IBMHIST.TAB_DIRS u
+                    set u.path = arch_path, u.size = arch_size, u.status = arch_status
+                    where u.path = cur_path ;
+
+                if ( vSQLCODE < 0 or vSQLSTATE != '00000' or retcode < 0 ) then
+                    set err_msg = 'Failed to update IBMHIST.TAB_DIRS' ;
+                    goto exit ;
+                end if ;
+
+            elseif ( arch_errs = '' ) then
+
+                -- keep data collection directory, so it is archived again by the next run
+                set arch_errs = 'Failed to archive: ' || cur_path || ' to: ' || arch_path ;
+
+            end if ;
+
+        end while ;
+
+        -- report failed archival once the archived directories of the batch are recorded
+        if ( arch_errs != '' ) then
+            set err_msg = arch_errs ;
             goto exit ;
         end if ;
 
-        fetch from coll_cur into cur_path ;
     end while ;
-    close coll_cur ;
 
-    set vSQLCODE = 0 ;
-    set vSQLSTATE = '00000' ;
+    -- rescan size of current data collection directories, as collections only add the size of the files they write
+    call IBMHIST.PROC_RESCAN_DIRS ( 'COLL' ) ;
+
+    if ( vSQLCODE < 0 or vSQLSTATE != '00000' or retcode < 0 ) then
+        set err_msg = 'Failed to rescan size of data collection directories' ;
+        goto exit ;
+    end if ;
 
     -- get max size
     select value into max_size
@@ -44,10 +44,11 @@ begin
     declare p_sep                         char ;
     declare task_details_path             varchar(512) ;
     declare coll_path, lob_path           varchar(512) ;
-    declare coll_size                     bigint ;
+    declare coll_size, lob_size           bigint ;
     declare coll_status                   varchar(7) ;
     declare file_type                     varchar(3) ;
     declare file_path, tmp_path           varchar(512) ;
+    declare comp_cmd, comp_ext            varchar(512) ;
 
     declare err_msg                       varchar(2048)   default '' ;
     declare vSQLCODE, SQLCODE, retcode    int             default 0 ;
@@ -178,11 +179,29 @@ begin
         goto exit ;
     end if ;
 
-    -- copy task_details.json file to data collection path
-    call IBMHIST.COPY_FILE ( task_details_path, coll_path || p_sep || 'task_details_copy.json', 'w', retcode ) ;
+    -- copy task_details.json file to data collection path, only on first collection into this hourly directory
+    -- setup.py syncs the copy in current collection directories when tasks are changed
+    if not exists (select * from IBMHIST.TAB_DIRS where path = coll_path) then
+
+        call IBMHIST.SYNC_FILE ( task_details_path, coll_path || p_sep || 'task_details_copy.json', retcode ) ;
+
+        if ( vSQLCODE < 0 or vSQLSTATE != '00000' or retcode < 0 ) then
+            set err_msg = 'Failed to copy task_details.json from: ' || task_details_path || ' to: ' || coll_path || ', external.C line number: ' || retcode ;
+            goto exit ;
+        end if ;
+
+    end if ;
+
+    -- get compression command and compression extension, collection files are not compressed if they are not set
+    select COALESCE ( MAX ( value ), '' ) into comp_cmd
+        from IBMHIST.TAB_CONFIG
+        where config_name = 'COMP_CMD' ;
+    select COALESCE ( MAX ( value ), '' ) into comp_ext
+        from IBMHIST.TAB_CONFIG
+        where config_name = 'COMP_EXT' ;
 
     if ( vSQLCODE < 0 or vSQLSTATE != '00000' or retcode < 0 ) then
-        set err_msg = 'Failed to copy task_details.json from: ' || task_details_path || ' to: ' || coll_path || ', external.C line number: ' || retcode ;
+        set err_msg = 'Failed to get compression command or compression extension from IBMHIST.TAB_CONFIG' ;
         goto exit ;
     end if ;
 
@@ -199,9 +218,11 @@ begin
         goto exit ;
     end if ;
 
-    -- execute command and export data to temp file
+    -- execute command and export data to file
     if  ( class = 'SQL' ) then
 
+        -- export can not append, so data is exported to temp file and appended to header
+        -- copy_file appends in the kernel where supported, so data is not copied through a buffer
         call SYSPROC.ADMIN_CMD ( ' export to ' || tmp_path || ' of ' || file_type || ' lobs to ' || lob_path || ' ' || command ) ;
 
         if ( vSQLCODE < 0 or vSQLSTATE != '00000' or retcode < 0 ) then
@@ -209,43 +230,94 @@ begin
             goto exit ;
         end if ;
 
+        -- append data to header
+        call IBMHIST.COPY_FILE ( tmp_path, file_path, 'a', retcode ) ;
+
+        if ( vSQLCODE < 0 or vSQLSTATE != '00000' or retcode < 0 ) then
+            set err_msg = 'Failed to append data: ' || tmp_path || ' to header: ' || file_path || ', external.C line number: ' || retcode ;
+            goto exit ;
+        end if ;
+
+        -- remove temp file
+        call IBMHIST.REMOVE_DIRECTORY( tmp_path, retcode ) ;
+
+        if ( vSQLCODE < 0 or vSQLSTATE != '00000' or retcode < 0 ) then
+            set err_msg = 'Failed to remove temp: ' || tmp_path || ', external.C line number: ' || retcode ;
+            goto exit ;
+        end if ;
+
     elseif ( class = 'SYS' ) then
 
-        call IBMHIST.SYSTEM_CALL ( command || ' >> ' || tmp_path , retcode ) ;
+        -- output of command is appended directly to header
+        call IBMHIST.SYSTEM_CALL ( command || ' >> ' || file_path , retcode ) ;
 
         if ( vSQLCODE < 0 or vSQLSTATE != '00000' or retcode < 0 ) then
-            set err_msg = 'Failed to execute command and export to: ' || tmp_path || ', system return code: ' || retcode ;
+            set err_msg = 'Failed to execute command and export to: ' || file_path || ', system return code: ' || retcode ;
             goto exit ;
         end if ;
 
     end if;
 
-    -- append data to header
-    call IBMHIST.COPY_FILE ( tmp_path, file_path, 'a', retcode ) ;
+    -- compress file if a compression command is set, lob files are not compressed as they are read by offset
+    if ( comp_cmd != '' ) then
+
+        set comp_cmd = REPLACE ( comp_cmd, '_src_', file_path ) ;
+        set comp_cmd = REPLACE ( comp_cmd, '_dest_', file_path || comp_ext ) ;
+        call IBMHIST.SYSTEM_CALL ( comp_cmd , retcode ) ;
+
+        if ( vSQLCODE < 0 or vSQLSTATE != '00000' or retcode < 0 ) then
+            set err_msg = 'Failed to compress: ' || file_path || ' to: ' || file_path || comp_ext || ', system return code: ' || retcode ;
+            goto exit ;
+        end if ;
+
+        -- check if compressed file exists
+        call IBMHIST.PATH_EXISTS ( file_path || comp_ext, retcode ) ;
+
+        if ( vSQLCODE < 0 or vSQLSTATE != '00000' or retcode < 0 ) then
+            set err_msg = 'Failed to find compressed file: ' || file_path || comp_ext || ', external.C line number: ' || retcode ;
+            goto exit ;
+        end if ;
+
+        -- remove uncompressed file, unless compression command removed it
+        call IBMHIST.PATH_EXISTS ( file_path, retcode ) ;
+
+        if ( retcode = 0 ) then
+            call IBMHIST.REMOVE_DIRECTORY ( file_path, retcode ) ;
+        else
+            set retcode = 0 ;
+        end if ;
+
+        if ( vSQLCODE < 0 or vSQLSTATE != '00000' or retcode < 0 ) then
+            set err_msg = 'Failed to remove uncompressed file: ' || file_path || ', external.C line number: ' || retcode ;
+            goto exit ;
+        end if ;
+
+        set file_path = file_path || comp_ext ;
 
-    if ( vSQLCODE < 0 or vSQLSTATE != '00000' or retcode < 0 ) then
-        set err_msg = 'Failed to append data: ' || tmp_path || ' to header: ' || file_path || ', external.C line number: ' || retcode ;
-        goto exit ;
     end if ;
 
-    -- remove temp file
-    call IBMHIST.REMOVE_DIRECTORY( tmp_path, retcode ) ;
+    -- get size of file and lob files written by this collection
+    -- lob files are named after the file they were exported with, so only they are stat'ed in the lob directory
+    call IBMHIST.SIZEOF_DIRECTORY( file_path, coll_size ) ;
+    call IBMHIST.SIZEOF_FILES( lob_path, collection_name || '_' || yr || mn || dy || hr || mi || '.', lob_size ) ;
 
-    if ( vSQLCODE < 0 or vSQLSTATE != '00000' or retcode < 0 ) then
-        set err_msg = 'Failed to remove temp: ' || tmp_path || ', external.C line number: ' || retcode ;
+    if ( vSQLCODE < 0 or vSQLSTATE != '00000' or coll_size < 0 or lob_size < 0 ) then
+        set err_msg = 'Failed to get size of: ' || file_path || ', external.C line number: ' || ( CASE WHEN coll_size < 0 THEN coll_size ELSE lob_size END ) ;
         goto exit ;
     end if ;
 
     -- update IBMHIST.TAB_DIRS
-    call IBMHIST.SIZEOF_DIRECTORY( coll_path, coll_size ) ;
+    -- the size of the directory is only scanned in full when it is first added, then each collection adds the size it wrote
+    -- directories are scanned in full again when archived, or by IBMHIST.PROC_RESCAN_DIRS
     set coll_status = 'COLL' ;
 
     if exists (select * from IBMHIST.TAB_DIRS where path = coll_path)
     then
         update IBMHIST.TAB_DIRS
-            set size = coll_size, status = coll_status, time = sch_time
+            set size = size + coll_size + lob_size, status = coll_status, time = sch_time
             where path = coll_path;
     else
+        call IBMHIST.SIZEOF_DIRECTORY( coll_path, coll_size ) ;
         insert into IBMHIST.TAB_DIRS
             values(coll_path, coll_size, coll_status, sch_time) ;
     end if ;
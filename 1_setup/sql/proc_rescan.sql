@@ -0,0 +1,99 @@
+--------------------------------------------------------------------------------
+-- (c) Copyright IBM Corp. 2020 All rights reserved.
+
+-- The following sample of source code ("Sample") is owned by International
+-- Business Machines Corporation or one of its subsidiaries ("IBM") and is
+-- copyrighted and licensed, not sold. You may use, copy, modify, and
+-- distribute the Sample in any form without payment to IBM, for the purpose of
+-- assisting you in the development of your applications.
+
+-- The Sample code is provided to you on an "AS IS" basis, without warranty of
+-- any kind. IBM HEREBY EXPRESSLY DISCLAIMS ALL WARRANTIES, EITHER EXPRESS OR
+-- IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF
+-- MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE. Some jurisdictions do
+-- not allow for the exclusion or limitation of implied warranties, so the above
+-- limitations or exclusions may not apply to you. IBM shall not be liable for
+-- any damages you suffer as a result of using, copying, modifying or
+-- distributing the Sample, even if IBM has been advised of the possibility of
+-- such damages.
+--------------------------------------------------------------------------------
+
+
+set schema IBMHIST ; @
+
+
+-- procedure to rescan the size of directories in IBMHIST.TAB_DIRS
+-- collections only add the size of the files they write, so this corrects the size of directories changed otherwise
+create or replace procedure IBMHIST.PROC_RESCAN_DIRS (
+    in dir_status varchar(4) -- status of directories to rescan, COLL or ARCH, or NULL for all directories
+)
+language SQL
+begin
+
+    -- declare variables
+    declare cur_path                      varchar(512) ;
+    declare cur_size                      bigint ;
+
+    declare err_msg                       varchar(2048)   default '' ;
+    declare vSQLCODE, SQLCODE, retcode    int             default 0 ;
+    declare vSQLSTATE, SQLSTATE           char(5)         default '00000' ;
+
+    -- cursor for directories to rescan
+    declare dir_cur cursor for
+        select path from IBMHIST.TAB_DIRS
+        where dir_status is NULL or status = dir_status
+        order by time asc ;
+
+    -- exception handler
+    declare continue handler for SQLEXCEPTION, SQLWARNING, NOT FOUND
+    begin
+        select SQLCODE, SQLSTATE into vSQLCODE, vSQLSTATE from SYSIBM.SYSDUMMY1 ;
+    end ;
+
+    -- loop through directories in IBMHIST.TAB_DIRS and update their size
+    open dir_cur ;
+    fetch from dir_cur into cur_path ;
+    while ( vSQLCODE = 0 and vSQLSTATE = '00000' )
+    do
+
+        -- get size of directory, skipping directories which have been removed since
+        call IBMHIST.SIZEOF_DIRECTORY ( cur_path, cur_size ) ;
+
+        if ( vSQLCODE < 0 or vSQLSTATE != '00000' ) then
+            set err_msg = 'Failed to get size of: ' || cur_path ;
+            goto exit ;
+        end if ;
+
+        if ( cur_size >= 0 ) then
+            update IBMHIST.TAB_DIRS u
+                set u.size = cur_size
+                where u.path = cur_path ;
+
+            if ( vSQLCODE < 0 or vSQLSTATE != '00000' ) then
+                set err_msg = 'Failed to update IBMHIST.TAB_DIRS' ;
+                goto exit ;
+            end if ;
+        end if ;
+
+        fetch from dir_cur into cur_path ;
+    end while ;
+    close dir_cur ;
+
+    set vSQLCODE = 0 ;
+    set vSQLSTATE = '00000' ;
+
+exit :
+
+    -- if error detected, log error into IBMHIST.TAB_ERRS
+    if ( vSQLCODE < 0 or vSQLSTATE != '00000' or retcode < 0 or err_msg != '' ) then
+        insert into IBMHIST.TAB_ERRS
+            values( current timestamp, 'PROC_RESCAN_DIRS', 'RESCAN', vSQLCODE, vSQLSTATE, err_msg ) ;
+        return -1 ;
+    end if;
+
+    return 0 ;
+
+end @
+
+
+grant execute on procedure IBMHIST.PROC_RESCAN_DIRS to PUBLIC @
\ No newline at end of file
@@ -22,7 +22,7 @@
 set schema IBMHIST ; @
 
 
--- table of configurations such as COLL_PATH, ARCH_PATH, MAX_SIZE, ARCH_CMD, ARCH_EXT, TASK_DETAILS_PATH, etc
+-- table of configurations such as COLL_PATH, ARCH_PATH, MAX_SIZE, ARCH_CMD, ARCH_EXT, ARCH_JOBS, ARCH_TIME_LIMIT, COMP_CMD, COMP_EXT, TASK_DETAILS_PATH, etc
 create table IBMHIST.TAB_CONFIG (
         config_name   varchar(64)    not null, -- name of configuration
         value         varchar(512)   not null, -- value of configuration
@@ -32,6 +32,15 @@ import re
 import json
 from pathlib import Path
 import time
+import shutil
+import tempfile
+import threading
+import concurrent.futures
+
+# Shared module to read task definitions and collection schemas
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+import histfiles
+import histmeta
 
 collectionTimeColName = "COLLECTION_TIME"
 monTSName = "HISTMON"
@@ -41,6 +50,39 @@ tempTsName = "MONTMP32K"
 bp32kName = "MONBP32K"
 taskDetailFileName = "task_details_copy.json"
 
+# Data files are loaded into tables with one LOAD for each batch of files.
+# If a probe LOAD fails with one of these errors for lack of authority, files are imported one at a time instead.
+# LOAD authorization is checked once before the workers start, so they only read useLoad.
+loadBatchSize = 200
+loadAuthErrors = ["SQL0551N", "SQL0552N", "SQL1092N"]
+useLoad = True
+
+# Compressed data files are decompressed into a temporary directory in this path before they are loaded, as Db2 only reads plain files.
+# None uses the system temporary directory.
+tempPath = None
+
+# Bookkeeping table of the files loaded into each data table, so incremental loads only load new files.
+loadedFilesTableName = schemaName + ".LOADED_FILES"
+
+# Collections are loaded by worker threads, each with its own connection, which are closed when all collections are loaded.
+workerData = threading.local()
+workerConns = []
+# Progress output of the workers is serialized, so lines are never interleaved.
+printLock = threading.Lock()
+
+# Get the connection of the current worker, connecting on its first collection.
+def getWorkerConn(dbname):
+  if not hasattr(workerData, "conn"):
+    workerData.conn = ibm_db.connect(dbname, '', '')
+    with printLock:
+      workerConns.append(workerData.conn)
+  return workerData.conn
+
+# Print the progress of loading a collection, with the time since its load started.
+def printProgress(collectionName, startTime, *message):
+  with printLock:
+    print("[{} {:7.1f}s]".format(collectionName, time.time() - startTime), *message, flush=True)
+
 # Set up preconditions. Set up the table space with proper page size.
 def createDBObjects(conn):
   # Drop the system temporary table space
@@ -70,6 +112,206 @@ def createDBObjects(conn):
 
   return 0
 
+# Find the raw data files of a collection, compressed or not.
+def findDataFiles(sourcePath, collectionName):
+  return [file for ext in ("",) + histfiles.compress_exts for file in sourcePath.rglob(collectionName + "*.del" + ext)]
+
+# Decompress the compressed data files of a batch into a temporary directory, streaming them so they are never read into memory.
+# Returns the batch with each compressed file replaced by its decompressed file.
+def decompressFiles(fileList, tempDir):
+  plainFiles = []
+  for file in fileList:
+    ext = histfiles.compress_ext(file.name)
+    if ext:
+      plainFile = Path(tempDir) / file.name[:-len(ext)]
+      with histfiles.open_file(str(file)) as source, open(plainFile, "wb") as target:
+        shutil.copyfileobj(source, target, 1024 * 1024)
+      file = plainFile
+    plainFiles.append(file)
+  return plainFiles
+
+# Load data files into a table with one LOAD for each batch of files, or one IMPORT for each file if LOAD is not authorized.
+# LOAD appends the files in bulk without logging rows, and NONRECOVERABLE leaves the table space out of backup pending.
+# LOAD and IMPORT commit on their own, so the files are recorded as loaded as soon as they are committed,
+# and a failed run never leaves loaded files unrecorded to be loaded again by the next incremental load.
+def loadFiles(conn, collectionName, startTime, fileList, tableName):
+  for i in range(0, len(fileList), loadBatchSize):
+    with tempfile.TemporaryDirectory(dir=tempPath) as tempDir:
+      batch = decompressFiles(fileList[i:i + loadBatchSize], tempDir)
+      if useLoad:
+        loadCmd = "CALL SYSPROC.ADMIN_CMD('load from {} of del insert into {} nonrecoverable' )".format(", ".join(str(file) for file in batch), tableName)
+        stmt = ibm_db.exec_immediate(conn, loadCmd)
+        recordLoadedFiles(conn, collectionName, fileList[i:i + loadBatchSize])
+        continue
+      for file, plainFile in zip(fileList[i:i + loadBatchSize], batch):
+        importCmd = "CALL SYSPROC.ADMIN_CMD('import from {} of del insert into {}' )".format(plainFile, tableName)
+        stmt = ibm_db.exec_immediate(conn, importCmd)
+        recordLoadedFiles(conn, collectionName, [file])
+
+# Check whether LOAD is authorized, with a LOAD of an empty file into the bookkeeping table of loaded files.
+def loadAuthorized(conn):
+  with tempfile.TemporaryDirectory(dir=tempPath) as tempDir:
+    emptyFile = Path(tempDir) / "empty.del"
+    emptyFile.touch()
+    loadCmd = "CALL SYSPROC.ADMIN_CMD('load from {} of del insert into {} nonrecoverable' )".format(emptyFile, loadedFilesTableName)
+    try:
+      stmt = ibm_db.exec_immediate(conn, loadCmd)
+    except Exception as e:
+      if not any(code in str(e) for code in loadAuthErrors):
+        raise
+      print("LOAD is not authorized, importing files one at a time instead:", e)
+      return False
+  return True
+
+# Check whether a table space exists.
+def tableSpaceExists(conn, tsName):
+  stmt = ibm_db.prepare(conn, "select 1 from syscat.tablespaces where tbspace = ?")
+  ibm_db.execute(stmt, (tsName,))
+  return ibm_db.fetch_tuple(stmt) != False
+
+# Check whether a table exists.
+def tableExists(conn, tableName):
+  schema, name = tableName.split('.')
+  stmt = ibm_db.prepare(conn, "select 1 from syscat.tables where tabschema = ? and tabname = ?")
+  ibm_db.execute(stmt, (schema, name))
+  return ibm_db.fetch_tuple(stmt) != False
+
+# Create the bookkeeping table of loaded files if it does not exist.
+# It is in the same table space as the data tables, so it is dropped with them when all data is reloaded.
+def createLoadedFilesTable(conn):
+  if not tableExists(conn, loadedFilesTableName):
+    stmt = ibm_db.exec_immediate(conn, "create table {} ( COLLECTION_NAME varchar(128) not null, FILE_NAME varchar(256) not null, \
+                                        LOAD_TIME timestamp not null default current timestamp ) in {}".format(loadedFilesTableName, monTSName))
+
+# Get the names of the files of a collection which have already been loaded.
+def getLoadedFiles(conn, collectionName):
+  stmt = ibm_db.prepare(conn, "select FILE_NAME from {} where COLLECTION_NAME = ?".format(loadedFilesTableName))
+  ibm_db.execute(stmt, (collectionName,))
+  loadedFiles = set()
+  tuple = ibm_db.fetch_tuple(stmt)
+  while tuple != False:
+    loadedFiles.add(tuple[0])
+    tuple = ibm_db.fetch_tuple(stmt)
+  return loadedFiles
+
+# Record the files of a collection as loaded.
+def recordLoadedFiles(conn, collectionName, fileList):
+  stmt = ibm_db.prepare(conn, "insert into {} ( COLLECTION_NAME, FILE_NAME ) values ( ?, ? )".format(loadedFilesTableName))
+  for file in fileList:
+    ibm_db.execute(stmt, (collectionName, file.name))
+
+# Get the minute in the name of a data file as a timestamp.
+# Rows in a file are never collected before the minute in its name.
+def fileMinute(file):
+  ts = re.search("[0-9]{12}", file.name).group(0)
+  return "{}-{}-{}-{}.{}.00".format(ts[0:4], ts[4:6], ts[6:8], ts[8:10], ts[10:12])
+
+# Load the data files of a collection into its table, and build its delta table if needed.
+# In incremental mode, only the files which have not been loaded yet are loaded into the existing tables,
+# and only the delta rows collected since the first new file are built again.
+# Runs in a worker thread, over the connection of the worker.
+def loadCollection(dbname, task, fileList, incremental, explain):
+  startTime = time.time()
+  collectionName = task['collection_name']
+  conn = getWorkerConn(dbname)
+  tableName = schemaName + '.' + collectionName
+  deltaTableName = tableName + delExt
+
+  # Skip the files which have already been loaded into the data table
+  sinceTime = None
+  if incremental and tableExists(conn, tableName):
+    loadedFiles = getLoadedFiles(conn, collectionName)
+    fileList = [file for file in fileList if file.name not in loadedFiles]
+    if not fileList:
+      printProgress(collectionName, startTime, "No new files to load")
+      return
+    sinceTime = min(fileMinute(file) for file in fileList)
+  else:
+    # Create the data table
+    printProgress(collectionName, startTime, "Creating the data table", tableName)
+    createTable = "create table {} as ( {} ) WITH NO DATA NOT LOGGED INITIALLY IN {}".format(tableName, task['collection_command'], monTSName)
+    stmt = ibm_db.exec_immediate(conn, createTable)
+  
+  # Load data into table
+  printProgress(collectionName, startTime, "Loading", len(fileList), "files into", tableName)
+  loadFiles(conn, collectionName, startTime, fileList, tableName)
+
+  # Check whether we need to create and load the delta table
+  if task['loader_diff_exempt_columns'] != "ALL":
+    if sinceTime is not None and not tableExists(conn, deltaTableName):
+      sinceTime = None
+    loadDelta(conn, collectionName, startTime, task, tableName, deltaTableName, sinceTime, explain)
+
+  printProgress(collectionName, startTime, "Done")
+
+# Build the delta table of a collection from its data table, creating it if sinceTime is not given.
+# If sinceTime is given, the delta rows collected since then are built again, each join key starting from its last row before then.
+def loadDelta(conn, collectionName, startTime, task, tableName, deltaTableName, sinceTime, explain):
+  if sinceTime is not None:
+    printProgress(collectionName, startTime, "Deleting the delta data since", sinceTime, "from", deltaTableName)
+    stmt = ibm_db.exec_immediate(conn, "delete from {} where {} >= '{}'".format(deltaTableName, collectionTimeColName, sinceTime))
+
+  # Read column names and types of the data table from the describe command
+  # The delta table is not described, as its TIMESTAMP differences are BIGINT columns
+  desCmd = "CALL SYSPROC.ADMIN_CMD('describe table {} show detail' )".format(tableName)
+  tabDes = ibm_db.exec_immediate(conn, desCmd)
+  colNames, timestampColList, colList = [], [], []
+  exemptionColList = [col.strip() for col in task['loader_diff_exempt_columns'].split(',')]
+  # The join columns may be a null string ("loader_join_columns": ""), then rows are compared in collection time order
+  joinColumns = [col.strip() for col in task['loader_join_columns'].split(",") if col.strip()]
+
+  # Each row is compared with the previous row of its join columns in one pass, with LAG over a window of the join columns
+  # Rows with a null join column have no previous row, as they can not be joined with one
+  window = "OVER ( {}ORDER BY {} )".format("PARTITION BY {} ".format(','.join(joinColumns)) if joinColumns else "", collectionTimeColName)
+  notNull = " AND ".join("{} IS NOT NULL".format(col) for col in joinColumns)
+  def previous(colName):
+    return "LAG({}) {}".format("CASE WHEN {} THEN {} END".format(notNull, colName) if joinColumns else colName, window)
+
+  tuple = ibm_db.fetch_tuple(tabDes)
+  while tuple != False:
+    colName, colType = tuple[0], tuple[2]
+    colNames.append(colName)
+    if colType in ["TIMESTAMP", "BIGINT"] and colName not in exemptionColList and colName != collectionTimeColName:
+      if colType == "TIMESTAMP":
+        timestampColList.append(colName)
+        colList.append("COALESCE(TIMESTAMPDIFF(2, {} - {}), 0) AS {}".format(colName, previous(colName), colName))
+      else:
+        colList.append("COALESCE({} - {}, 0) AS {}".format(colName, previous(colName), colName))
+    else:
+      colList.append(colName)
+    tuple = ibm_db.fetch_tuple(tabDes)
+
+  # Create the delta table with the columns of the data table, with BIGINT columns for the TIMESTAMP differences
+  # The column types are set as the table is created, so no columns need to be altered and the table reorganized
+  if sinceTime is None:
+    printProgress(collectionName, startTime, "Creating the delta data table", deltaTableName)
+    deltaColList = ["CAST(NULL AS BIGINT) AS {}".format(col) if col in timestampColList else col for col in colNames]
+    createDeltaTable = "create table {} as ( select {} from {} ) WITH NO DATA NOT LOGGED INITIALLY IN {}".format(deltaTableName, ", ".join(deltaColList), tableName, monTSName)
+    stmt = ibm_db.exec_immediate(conn, createDeltaTable)
+
+  # Select the delta of each row from the data table
+  selectDelta = "SELECT {}\nFROM {}".format(",\n  ".join(colList), tableName)
+  if sinceTime is None:
+    loadDeltaStmt = "INSERT INTO {} ( {} )\n{}".format(deltaTableName, ", ".join(colNames), selectDelta)
+  else:
+    # Only select the rows collected since sinceTime, and the last row of each join key before then as their previous row
+    # The rows before sinceTime are left out of the delta rows inserted
+    seedColumns = ','.join(joinColumns + ["MAX({})".format(collectionTimeColName)])
+    selectDelta = "{}\nWHERE {} >= '{}' OR ( {} ) IN ( SELECT {} FROM {} WHERE {} < '{}' {})".format(
+      selectDelta, collectionTimeColName, sinceTime, ','.join(joinColumns + [collectionTimeColName]), seedColumns, tableName, collectionTimeColName, sinceTime,
+      "GROUP BY {} ".format(','.join(joinColumns)) if joinColumns else "")
+    loadDeltaStmt = "INSERT INTO {} ( {} )\nSELECT {} FROM (\n{}\n) AS DELTA\nWHERE {} >= '{}'".format(
+      deltaTableName, ", ".join(colNames), ", ".join(colNames), selectDelta, collectionTimeColName, sinceTime)
+
+  # Print and explain the statement if asked, so its access plan can be formatted with db2exfmt
+  if explain:
+    printProgress(collectionName, startTime, "Explaining the delta statement:\n" + loadDeltaStmt)
+    stmt = ibm_db.exec_immediate(conn, "EXPLAIN PLAN FOR " + loadDeltaStmt)
+
+  # Load the delta data into table
+  printProgress(collectionName, startTime, "Loading data into", deltaTableName)
+  stmt = ibm_db.exec_immediate(conn, loadDeltaStmt)
+
 def main():
   # Parse the input arguments
   parser = argparse.ArgumentParser()
@@ -78,7 +320,14 @@ def main():
   parser.add_argument("-dataCollectionName", dest="dataCollectionName", help = "Data collection name, as defined in the task_details.json file")
   parser.add_argument("-startDate", dest="startDate", help = "Start timestamp (Default: localtime) (Must be of format YYYY-MM-DD-hh.mm.ss)")
   parser.add_argument("-endDate", dest="endDate", help = "End timestamp (Default: localtime) (Must be of format YYYY-MM-DD-hh.mm.ss)")
+  parser.add_argument("-jobs", dest="jobs", type=int, default=1, help = "Number of collections to load concurrently, each over its own connection, 0 uses one per core (Default: 1)")
+  parser.add_argument("-incremental", dest="incremental", action="store_true", help = "Only load the files which have not been loaded yet into the existing tables, instead of dropping and loading all data again")
+  parser.add_argument("-explain", dest="explain", action="store_true", help = "Print the statement building each delta table and explain it into the explain tables, to format its access plan with db2exfmt")
+  parser.add_argument("-tempPath", dest="tempPath", help = "Directory to decompress compressed raw data files into before they are loaded, which must be readable by the instance owner (Default: system temporary directory)")
+  parser.add_argument("-schemaFrom", dest="schemaFrom", help = "Schema file written by common/histmeta.py, or a task_details.json file, to read task definitions from instead of the hourly directories")
   args = parser.parse_args()
+  global tempPath, useLoad
+  tempPath = args.tempPath
   sourcePath = Path(args.sourcePath)
   # Check if the raw data path exists
   if not sourcePath.exists():
@@ -88,8 +337,22 @@ def main():
   print("Connecting to database:", args.dbname)
   conn = ibm_db.connect(args.dbname, '', '')
 
-  # Set up preconditions
-  createDBObjects(conn)
+  # Set up preconditions, keeping the loaded data in incremental mode if the table space exists
+  if args.incremental and tableSpaceExists(conn, monTSName):
+    print("Loading new files into table space", monTSName)
+  else:
+    createDBObjects(conn)
+  createLoadedFilesTable(conn)
+
+  # Check LOAD authorization before the workers start, so they all load or all import files
+  useLoad = loadAuthorized(conn)
+
+  # Create the explain tables if they do not exist yet
+  if args.explain:
+    try:
+      stmt = ibm_db.exec_immediate(conn, "CALL SYSPROC.SYSINSTALLOBJECTS('EXPLAIN', 'C', CAST (NULL AS VARCHAR(128)), CAST (NULL AS VARCHAR(128)))")
+    except:
+      pass
   
   # When -startDate and -endDate are specified, filter the qualified raw files 
   startDate, endDate = args.startDate, args.endDate
@@ -106,18 +369,20 @@ def main():
     print("No hourly directory found in {}".format(sourcePath))
     exit(1)
 
-  # Load task details from json file
-  searchTaskDetailFile = [file for file in hourDirList[0].glob(taskDetailFileName)]
-  if searchTaskDetailFile:
-    taskDetailFile = searchTaskDetailFile.pop()
+  # Load task details from the schema file if given, otherwise from the json file of the hourly directories
+  if args.schemaFrom:
+    print("Loading tasks from", args.schemaFrom, "...")
+    tasks = histmeta.read_schema_file(args.schemaFrom)['tasks']
   else:
-    print("Task details file {} is not found under {}".format(taskDetailFileName, hourDirList[0]))
-    exit(1)
-  print("Loading tasks from task_details.json ...")
-  with open(taskDetailFile) as file:
-    tasks = json.load(file)
+    taskDetailFile = histmeta.task_details_file(hourDirList[:1])
+    if taskDetailFile is None:
+      print("Task details file {} is not found under {}".format(taskDetailFileName, hourDirList[0]))
+      exit(1)
+    print("Loading tasks from task_details.json ...")
+    tasks = histmeta.load_schema(taskDetailFile)['tasks']
 
-  # For each SQL task, import the data and delta data into tables if needed
+  # For each SQL task, find the raw data files to import into tables
+  loadList = []
   for task in tasks:
     collectionName = task['collection_name']
     if args.dataCollectionName and args.dataCollectionName != collectionName:
@@ -126,7 +391,7 @@ def main():
       # Find raw data files
       fileList = []
       if startDate and endDate:
-        files = list(sourcePath.rglob(collectionName + "*.del"))
+        files = findDataFiles(sourcePath, collectionName)
         for file in files:
           tsPattern = re.search("[0-9]{12}", file.name)
           if tsPattern:
@@ -137,88 +402,33 @@ def main():
           print("No raw data file found for {} with the time range from {} to {}".format(collectionName, startDate, endDate))
           continue
       else:
-        fileList = list(sourcePath.rglob(collectionName + "*.del"))
+        fileList = findDataFiles(sourcePath, collectionName)
       if not fileList:
         print("No raw data file found for {}".format(collectionName))
         continue
-      tableName = schemaName + '.' + collectionName
-      deltaTableName = tableName + delExt
-
-      # Create the data table
-      print("Creating the data table:",tableName) 
-      createTable = "create table {} as ( {} ) WITH NO DATA NOT LOGGED INITIALLY IN {}".format(tableName, task['collection_command'], monTSName)
-      stmt = ibm_db.exec_immediate(conn, createTable)
-      
-      # Load data into table
-      print("Loading data into", tableName)
-      for file in fileList:
-        importCmd = "CALL SYSPROC.ADMIN_CMD('import from {} of del insert into {}' )".format(file, tableName)
-        stmt = ibm_db.exec_immediate(conn, importCmd)
+      loadList.append((task, fileList))
 
-      # Check whether we need to create and load the delta table
-      if task['loader_diff_exempt_columns'] != "ALL":
-        print("Creating the delta data table:",deltaTableName)
-        createDeltaTable = "create table {} as ( {} ) WITH NO DATA NOT LOGGED INITIALLY IN {}".format(deltaTableName, task['collection_command'], monTSName)
-        stmt = ibm_db.exec_immediate(conn, createDeltaTable)
- 
-        # Read column names and types from the describe command
-        desCmd = "CALL SYSPROC.ADMIN_CMD('describe table {} show detail' )".format(deltaTableName)
-        tabDes = ibm_db.exec_immediate(conn, desCmd)
-        loadDeltaStmt = "insert into {} (".format(deltaTableName)
-        alterColList, colList = [], ""
-        exemptionColList = [col.strip() for col in task['loader_diff_exempt_columns'].split(',')]
-        joinColumns = [col.strip() for col in task['loader_join_columns'].split(",") ]
-        # The array should never be empty unless somebody forgot to specify
-        # "loader_join_columns" in the JSON file, but never hurts to check
-        if joinColumns:
-          # Despite not empty, the array may still contain only one element, and
-          # that could be a null string ("loader_join_columns": "")
-          if joinColumns[0]:
-            orderByList = ','.join(joinColumns + [collectionTimeColName])
-          else:
-            orderByList = collectionTimeColName
-        else:
-         orderByList = collectionTimeColName
-        tuple = ibm_db.fetch_tuple(tabDes)
-        while tuple != False:
-          colName, colType = tuple[0], tuple[2]
-          loadDeltaStmt = "{} {},".format(loadDeltaStmt, colName)
-          if colType in ["TIMESTAMP", "BIGINT"] and colName not in exemptionColList and colName != collectionTimeColName:
-            if colType == "TIMESTAMP":
-              alterColList.append(colName)
-              colList="{} COALESCE(TIMESTAMPDIFF(2, current.{} - previous.{}), 0),".format(colList, colName, colName)
-            else:
-              colList="{} COALESCE(current.{} - previous.{}, 0),".format(colList, colName, colName)
-          else:
-            colList = "{} current.{},".format(colList, colName)
-          tuple = ibm_db.fetch_tuple(tabDes)
-
-        # Alter the column data type from TIMESTAMP to BIGINT
-        for col in alterColList:
-          stmt = ibm_db.exec_immediate(conn,"alter table {} alter column {} set data type bigint".format(deltaTableName, col))
-          stmt = ibm_db.exec_immediate(conn, "CALL SYSPROC.ADMIN_CMD('reorg table {}' )".format(deltaTableName))
-          stmt = ibm_db.exec_immediate(conn, "commit")
-
-        # Remove the last comma and append the closing bracket
-        loadDeltaStmt = loadDeltaStmt.rstrip(',') + ")"
-        colList = colList.rstrip(',')
-        loadDeltaStmt = "{} with current as ( SELECT ( row_number() over ( order by {} ) ) rowId, \
-                         {}.* from {} order by {} ) select ".format(loadDeltaStmt, orderByList, tableName, tableName, orderByList)
-        # Append the column list
-        loadDeltaStmt += colList
-        # Append the join clause
-        loadDeltaStmt = "{} FROM current AS previous RIGHT JOIN current ON previous.rowId + 1 = current.rowId ".format(loadDeltaStmt)
-        for col in joinColumns:
-          # col can still be an empty string ("loader_join_columns": "")
-          if col:
-            loadDeltaStmt = "{} and previous.{} = current.{} ".format(loadDeltaStmt, col, col)
-
-        # Load the delta data into table
-        print("Loading data into", deltaTableName)
-        stmt = ibm_db.exec_immediate(conn, loadDeltaStmt)
+  # Load the collections concurrently, each worker loading one collection at a time over its own connection
+  jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+  print("Loading", len(loadList), "collections with", min(jobs, len(loadList)), "workers ...")
+  failed = []
+  with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as pool:
+    futures = {pool.submit(loadCollection, args.dbname, task, fileList, args.incremental, args.explain): task['collection_name'] for task, fileList in loadList}
+    for future in concurrent.futures.as_completed(futures):
+      try:
+        future.result()
+      except Exception as e:
+        print("Failed to load {}: {}".format(futures[future], e))
+        failed.append(futures[future])
+
+  for workerConn in workerConns:
+    ibm_db.close(workerConn)
 
   print("Closing connection ...")
   ibm_db.close(conn)
+  if failed:
+    print("Failed to load:", ", ".join(failed))
+    exit(1)
 
 if __name__== "__main__":
   main()
@@ -29,34 +29,112 @@ import os
 import argparse
 import re
 import time
-import json
+import io
+import heapq
+import itertools
+import csv
+import operator
 from pathlib import Path
 
+# Shared module to read hourly directories and archived hourly directories
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+import histfiles
+import histindex
+import histmeta
+
 firstCol = "SCHEDULEDTIME"
 colTimeColName = "COLLECTION_TIME"
 colTimeColIndex = 0
 applHandleColName = "APPLICATION_HANDLE"
+memberColName = "MEMBER"
 taskDetailFileName = "task_details_copy.json"
+sampleRowCount = 1000
+readChunkSize = 1 << 20
+# Rows are held as their columns joined by null characters until they are printed, as null characters are dropped from all
+# raw data files. Joined rows sort in the same order as their columns, as the separator sorts before any other character.
+rowSeparator = "\0"
+# Translation of lines without strings with commas, quotes or new lines to joined rows
+joinTable = str.maketrans({'"': None, ",": rowSeparator})
+
+# Indexes of hourly directories built by common/histindex.py, and the filtered values of their key columns.
+# Files which are not indexed are read in full.
+indexPath = None
+indexKeys = {}
+
+# Open a raw data file for reading, streaming it from its archive if the hourly directory is archived.
+# Non-ascii characters are dropped as the file is decoded.
+def openRawFile(file):
+  return io.TextIOWrapper(histfiles.open_file(file), encoding="ascii", errors="ignore", newline="")
+
+# Read an open raw data file in chunks completed to the end of their last line.
+# Null characters in binary data are dropped from each chunk, as they can not be tokenized,
+# which avoids a Python call for each line.
+def readChunks(f):
+  for chunk in iter(lambda: f.read(readChunkSize), ""):
+    yield (chunk + f.readline()).replace('\0', '')
+
+# Read the lines of an open raw data file in chunks.
+def readLines(f):
+  return itertools.chain.from_iterable(io.StringIO(chunk, newline="") for chunk in readChunks(f))
+
+# Tokenize a chunk of whole rows in Db2 DEL format with columnCount columns, as rows with their columns joined.
+# Db2 only quotes character strings and writes every column of each row, so complete lines with columnCount - 1 commas,
+# an even number of quotes and no doubled quotes have no strings with commas, quotes or new lines. Their rows are the lines
+# of the joined chunk, with its quotes dropped and its commas replaced, without creating a value for each column.
+# Other lines only have the commas outside their strings replaced, or are tokenized with csv.reader if they have quotes
+# doubled inside strings. The whole chunk is tokenized with csv.reader if it has strings with new lines.
+def tokenizeChunk(chunk, joined, columnCount):
+  lines = chunk.split("\n")
+  rows = joined.split("\n")
+  # The last line of a file which is still being written can be truncated, with fewer columns and a string with commas
+  truncated = len(lines) - 1 if lines[-1] else -1
+  if not lines[-1]:
+    lines.pop()
+    rows.pop()
+  doubledQuotes = '""' in chunk
+  # Dropping the quotes of a line shortens its row by its number of quotes
+  others = [i for i, (line, row, commaCount) in enumerate(zip(lines, rows, map(operator.methodcaller("count", ","), lines)))
+            if commaCount != columnCount - 1 or (len(line) - len(row)) % 2 or line[-1:] == "\r" or i == truncated or doubledQuotes and '""' in line]
+  # Strings with new lines span several lines, which can only be tokenized together
+  if any((len(lines[i]) - len(rows[i])) % 2 for i in others):
+    return map(rowSeparator.join, csv.reader(io.StringIO(chunk, newline="")))
+  # The commas outside strings are in the even parts of a line split on quotes, and strings are the odd parts,
+  # so an empty even part between two strings is a quote doubled inside a string
+  replaceCommas = operator.methodcaller("replace", ",", rowSeparator)
+  tokenized = []
+  for i in others:
+    parts = lines[i][:-1].split('"') if lines[i][-1:] == "\r" else lines[i].split('"')
+    if "" in parts[2:-1:2]:
+      tokenized.append(i)
+    else:
+      parts[::2] = map(replaceCommas, parts[::2])
+      rows[i] = "".join(parts)
+  for i, row in zip(tokenized, csv.reader([lines[i] for i in tokenized])):
+    rows[i] = rowSeparator.join(row)
+  return rows
+
+# Read the rows of a raw data file in Db2 DEL format as joined rows, starting with the column names.
+# Columns are delimited by commas and character strings by double quotes, with quotes inside strings doubled,
+# so strings containing commas, quotes or new lines are read as one value without their quotes.
+def readDelFile(file):
+  with openRawFile(file) as f:
+    header = next(csv.reader([f.readline().replace('\0', '')]), [])
+    yield rowSeparator.join(header)
+    for chunk in readChunks(f):
+      joined = chunk.translate(joinTable)
+      # Complete a string with new lines, which leaves an odd number of quotes in the chunk until it ends
+      while (len(chunk) - len(joined)) % 2:
+        line = f.readline().replace('\0', '')
+        if not line:
+          break
+        chunk += line
+        joined += line.translate(joinTable)
+      yield from tokenizeChunk(chunk, joined, len(header))
 
 # Read raw data from raw files and print the data in tabular format.
-def readAndPrintData(columns, fileList, summaryCols, applHandle, dataType):
-  rawData = []
+def readAndPrintData(columns, fileList, summaryCols, filters, dataType):
   if summaryCols == "ALL":
-    for file in fileList:
-      with open(file, encoding="latin-1") as f:
-        # Skip the first line which are the column names
-        next(f)
-        for line in f:
-          detailLine = [x.strip('\n') for x in line.encode('ascii', 'ignore').decode('ascii').split(',')]
-          if matchApplHandle(detailLine, applHandle, columns):
-            rawData.append(detailLine)
-    if not rawData:
-      print("Data not found for {}".format(dataType))
-      exit(1)
-    # Sort the collection data by COLLECTION_TIME
-    rawData.sort()
-    printTabularData([columns] + rawData)
-    print("Printing the output into a file with no wrap provides a more readable view.")
+    summaryIndex, summaryCols = None, columns
   else:
     summaryColsIn = [col.strip() for col in summaryCols.split(",") ]
     summaryIndex, summaryCols = [colTimeColIndex], [colTimeColName]
@@ -68,44 +146,198 @@ def readAndPrintData(columns, fileList, summaryCols, applHandle, dataType):
       else:
         summaryIndex.append(index)
         summaryCols.append(col)
-    for file in fileList:
-      with open(file, encoding="latin-1") as f:
-        # Skip the first line which are the column names
-        next(f)
-        for line in f:
-          lineList = [x.strip('\n') for x in line.encode('ascii', 'ignore').decode('ascii').split(',')]
-          summaryLine = [lineList[i] for i in summaryIndex]
-          # Filter the raw data by application handle if needed
-          if matchApplHandle(lineList, applHandle, columns):
-            rawData.append(summaryLine)
-    if not rawData:
-      print("Data not found for {}".format(dataType))
-      exit(1)
-    # Sort the collection data by COLLECTION_TIME
-    rawData.sort()
-    printTabularData([summaryCols] + rawData)
+  # Rows are merged from all files by COLLECTION_TIME and printed as they are read
+  rawData = map(operator.methodcaller("split", rowSeparator), itertools.chain.from_iterable(mergeRawData(fileList, summaryIndex, filters, len(columns))))
+  if not printTabularData(summaryCols, rawData):
+    print("Data not found for {}".format(dataType))
+    exit(1)
+  if summaryIndex is None:
+    print("Printing the output into a file with no wrap provides a more readable view.")
+
+# Raised when the column names of a raw data file do not have as many columns as the column names read from the schema,
+# so the column names are read again from the header line of the file.
+class ColumnCountError(Exception):
+  def __init__(self, file):
+    super().__init__("Unexpected number of columns in {}".format(file))
+    self.file = file
+
+# Read the rows of a raw data file that match the filters as joined rows, with only the summary columns if given.
+# If columnCount is given, ColumnCountError is raised if the column names of the file have a different number of columns.
+def readRawFile(file, summaryIndex, filters, columnCount=None):
+  offsets = histindex.lookup(file, indexKeys, indexPath)
+  if offsets is not None:
+    rows = readIndexedDelFile(file, offsets, filters)
+    header = next(rows, [])
+  elif filters:
+    rows = readFilteredDelFile(file, filters)
+    header = next(rows, [])
+  else:
+    rows = readDelFile(file)
+    header = next(rows, "")
+    header = header.split(rowSeparator) if header else []
+  # Files without rows to read have no column names to check
+  if columnCount is not None and header and len(header) != columnCount:
+    raise ColumnCountError(file)
+  if offsets is None and not filters:
+    if summaryIndex is None:
+      return rows
+    rows = map(operator.methodcaller("split", rowSeparator), rows)
+  # Get only the summary columns if given, itemgetter returns a value instead of a tuple for one column
+  # Short or truncated rows without all the summary columns are skipped
+  if summaryIndex is not None:
+    minLength = max(summaryIndex) + 1
+    rows = (row for row in rows if len(row) >= minLength)
+    rows = map(operator.itemgetter(*summaryIndex) if len(summaryIndex) > 1 else lambda row: (row[summaryIndex[0]],), rows)
+  return map(rowSeparator.join, rows)
+
+# Get the minute in the name of a raw data file, in the same format as COLLECTION_TIME.
+def fileMinute(file):
+  ts = re.search("[0-9]{12}", os.path.basename(file)).group(0)
+  return "{}-{}-{}-{}.{}".format(ts[0:4], ts[4:6], ts[6:8], ts[8:10], ts[10:12])
 
-# Helper function to print the raw data in tabular format
-def printTabularData(table):
+# Merge the collections of raw data files in COLLECTION_TIME order, without loading the files into memory.
+# Each file is in collection order and has no rows collected before the minute in its name,
+# so files are only opened once the merge reaches their minute, and only a few are open at a time.
+# Rows with the same COLLECTION_TIME are one collection, which is yielded as a sorted list of joined rows,
+# so rows are printed in the same order as a sort of all rows.
+# The column names of the first file are checked against columnCount, before any row is printed.
+def mergeRawData(fileList, summaryIndex, filters, columnCount):
+  fileList = sorted(fileList, key=fileMinute)
+  fileMinutes = [fileMinute(file) for file in fileList]
+  heap, fileCount = [], 0
+  while True:
+    while fileCount < len(fileList) and (not heap or fileMinutes[fileCount] <= heap[0][0]):
+      pushNextCollection(heap, fileCount, readCollections(readRawFile(fileList[fileCount], summaryIndex, filters, None if fileCount else columnCount)))
+      fileCount += 1
+    if not heap:
+      return
+    colTime, collection = heap[0][0], []
+    while heap and heap[0][0] == colTime:
+      colTime, fileIndex, rows, collections = heapq.heappop(heap)
+      collection += rows
+      pushNextCollection(heap, fileIndex, collections)
+    collection.sort()
+    yield collection
+
+# Group the joined rows of a raw data file into collections of rows with the same COLLECTION_TIME.
+# COLLECTION_TIME is the first column, and empty rows of blank lines have no COLLECTION_TIME and are skipped.
+def readCollections(rows):
+  return itertools.groupby(filter(None, rows), lambda row: row.partition(rowSeparator)[0])
+
+# Push the next collection of a raw data file onto the merge heap, ordered by COLLECTION_TIME, then file.
+# Each file has at most one collection on the heap, so the rows of collections are never compared.
+def pushNextCollection(heap, fileIndex, collections):
+  for colTime, rows in collections:
+    heapq.heappush(heap, (colTime, fileIndex, list(rows), collections))
+    return
+
+# Helper function to print the raw data in tabular format as it is read.
+# Column widths are taken from the header and a sample of the first rows, longer values in later rows only widen their row.
+# Short or truncated rows are printed with empty values for their missing columns.
+def printTabularData(header, rows):
+  columnCount = len(header)
+  fitRow = lambda row: tuple(row) if len(row) == columnCount else tuple(row[:columnCount]) + ("",) * (columnCount - len(row))
+  sample = [fitRow(row) for row in itertools.islice(rows, sampleRowCount)]
+  if not sample:
+    return False
+  table = [fitRow(header)] + sample
   longest_cols = [ (max([len(str(row[i])) for row in table]) + 3) for i in range(len(table[0]))]
-  row_format = "".join(["{:>" + str(longest_col) + "}" for longest_col in longest_cols])
-  for row in table:
-    print(row_format.format(*row))
-
-# Check if the given data record matches the specified application handle.
-def matchApplHandle(line, applHandle, columns):
-  if applHandle:
-    try: 
-      applHandleIndex = columns.index(applHandleColName)
-    except ValueError:
-      print("{} is not a valid column name.".format(applHandleColName))
-      print("The -applHandle option is not supported for this data type.")
-      exit(1)
-    else:
-      if line[applHandleIndex] != applHandle:
-        return False
+  # Rows are formatted with printf-style formatting and written without a Python loop, which is faster than str.format and print
+  row_format = "".join(["%" + str(longest_col) + "s" for longest_col in longest_cols]) + "\n"
+  sys.stdout.writelines(map(row_format.__mod__, itertools.chain(table, map(fitRow, rows))))
   return True
 
+# Get the index of a column used by a filter option, resolved once for all rows.
+def getColumnIndex(columns, col, option):
+  try:
+    return columns.index(col)
+  except ValueError:
+    print("{} is not a valid column name.".format(col))
+    print("The {} option is not supported for this data type.".format(option))
+    exit(1)
+
+# Build the filters from the command line options.
+# Each filter is a (column index, predicate, substring) tuple, lines without the substring can never match the filter.
+def buildFilters(columns, args):
+  filters = []
+  if args.applHandle:
+    filters.append((getColumnIndex(columns, applHandleColName, "-applHandle"), args.applHandle.__eq__, args.applHandle))
+  if args.member:
+    filters.append((getColumnIndex(columns, memberColName, "-member"), args.member.__eq__, args.member))
+  for col, low, high in args.range or []:
+    filters.append((getColumnIndex(columns, col, "-range"), rangePredicate(low, high), None))
+  for col, pattern in args.regex or []:
+    filters.append((getColumnIndex(columns, col, "-regex"), re.compile(pattern).search, None))
+  return filters
+
+# Make a predicate for values between low and high inclusive, compared as numbers if both are numbers, otherwise as text.
+def rangePredicate(low, high):
+  try:
+    low, high = float(low), float(high)
+  except ValueError:
+    return lambda value: low <= value <= high
+  def inRange(value):
+    try:
+      return low <= float(value) <= high
+    except ValueError:
+      return False
+  return inRange
+
+# Split the columns of a line up to column maxIndex without tokenizing the whole line.
+# Returns None if one of these columns is a string with commas or quotes, which needs to be tokenized,
+# and fewer columns if the line is short or truncated.
+def splitPrefix(line, maxIndex):
+  prefix = line.rstrip('\r\n').split(',', maxIndex + 1)[:maxIndex + 1]
+  for i, value in enumerate(prefix):
+    if '"' in value:
+      if len(value) < 2 or value[0] != '"' or value[-1] != '"' or value.count('"') != 2:
+        return None
+      prefix[i] = value[1:-1]
+  return prefix
+
+# Read the rows of a raw data file in Db2 DEL format that match all filters, starting with the column names.
+# Lines are rejected before they are tokenized, first by the filter substrings, then by the filtered columns split from
+# the start of the line, so filters on the first columns such as MEMBER and APPLICATION_HANDLE reject most lines cheaply.
+def readFilteredDelFile(file, filters):
+  maxIndex = max(index for index, predicate, substring in filters)
+  substrings = [substring for index, predicate, substring in filters if substring]
+  with openRawFile(file) as f:
+    lines = readLines(f)
+    # The first line are the column names
+    yield next(csv.reader(itertools.islice(lines, 1)), [])
+    for line in lines:
+      # Join the lines of strings with new lines, which leave an odd number of quotes until the string ends
+      while line.count('"') % 2:
+        nextLine = next(lines, None)
+        if nextLine is None:
+          break
+        line += nextLine
+      if not all(substring in line for substring in substrings):
+        continue
+      prefix = splitPrefix(line, maxIndex)
+      row = None
+      if prefix is None:
+        row = prefix = next(csv.reader([line]))
+      # Skip short or truncated lines which do not have all the filtered columns
+      if len(prefix) <= maxIndex:
+        continue
+      if all(predicate(prefix[index]) for index, predicate, substring in filters):
+        yield row or next(csv.reader([line]))
+
+# Read the rows of a raw data file at the byte offsets found in its index that match all filters, starting with the column names.
+# Only the rows with the indexed values are read, so files without them are not read at all.
+# Short or truncated rows which do not have all the filtered columns are skipped.
+def readIndexedDelFile(file, offsets, filters):
+  if not offsets:
+    return
+  maxIndex = max((index for index, predicate, substring in filters), default=-1)
+  rows = csv.reader(io.StringIO(histindex.read_offsets(file, offsets, "ascii"), newline=""))
+  # The first line are the column names
+  yield next(rows, [])
+  for row in rows:
+    if len(row) > maxIndex and all(predicate(row[index]) for index, predicate, substring in filters):
+      yield row
+
 def main():
   # read parameters from command line;
   parser = argparse.ArgumentParser()
@@ -115,6 +347,13 @@ def main():
   parser.add_argument("-startDate", dest="startDate", help = "Start timestamp (Default: localtime) (Must be of format YYYY-MM-DD-hh.mm.ss)")
   parser.add_argument("-endDate", dest="endDate", help = "End timestamp (Default: localtime) (Must be of format YYYY-MM-DD-hh.mm.ss)")
   parser.add_argument("-applHandle", dest="applHandle", help = "If applHandle is specified we only show data that matches the application_handle")
+  parser.add_argument("-member", dest="member", help = "If member is specified we only show data that matches the member")
+  parser.add_argument("-range", dest="range", nargs=3, action="append", metavar=("COLUMN", "MIN", "MAX"), help = "Only show data where the column is between min and max, compared as numbers if both are numbers. Can be repeated.")
+  parser.add_argument("-regex", dest="regex", nargs=2, action="append", metavar=("COLUMN", "PATTERN"), help = "Only show data where the column matches the regular expression. Can be repeated.")
+  parser.add_argument("-archivePath", dest="archivePath", help = "The path of the archived hourly directories, which are read without extracting them. (Default: sourcePath with an _archive suffix)")
+  parser.add_argument("-cachePath", dest="cachePath", help = "The path to cache archive indexes and collection schemas in, so archives are only read once to find their files and column names are only read once")
+  parser.add_argument("-schemaFrom", dest="schemaFrom", help = "Schema file written by common/histmeta.py, or a task_details.json file, to read task definitions and column names from instead of the hourly directories")
+  parser.add_argument("-indexPath", dest="indexPath", help = "The path of the indexes built by common/histindex.py, used to only read the rows matching -applHandle and -member. (Default: sourcePath with an _index suffix)")
 
   args = parser.parse_args()
  
@@ -135,35 +374,41 @@ def main():
   except ValueError:
     print("Unexpected time format! Expected time format is YYYY-MM-DD-hh.mm.ss")
     exit(1)
-  hourDirList = [hourDir for hourDir in basePath.glob('*_??????????') if startHour <= time.mktime(time.strptime(hourDir.name[-10:], '%Y%m%d%H')) <= endTs ]
+  histfiles.index_cache_path = args.cachePath
+  hourDirList = [hourDir for hourDir in histfiles.hour_dirs(str(basePath), '*_??????????', args.archivePath) if startHour <= time.mktime(time.strptime(histfiles.hour_name(hourDir)[-10:], '%Y%m%d%H')) <= endTs ]
   if not hourDirList:
     print("No hourly directory found under {}".format(basePath))
     exit(1)
 
-  # Find the task details file and read the defined summary columns in summary display mode
-  summaryCols = "ALL"
-  if args.displayMode == "summary":
-    searchTaskDetailFile = [file for file in hourDirList[0].glob(taskDetailFileName)]
-    if searchTaskDetailFile:
-      taskDetailFile = searchTaskDetailFile.pop()
-    else:
+  # Load the task definitions from the schema file if given, otherwise from the task details file of the hourly directories
+  # Schemas are cached by a hash of the task details, with the column names of each data collection type once they are read
+  histmeta.cache_path = args.cachePath
+  if args.schemaFrom:
+    schema = histmeta.read_schema_file(args.schemaFrom)
+  else:
+    # The task details are only needed in summary display mode
+    taskDetailFile = histmeta.task_details_file(hourDirList[:1])
+    if taskDetailFile is None and args.displayMode == "summary":
       print("Task details file {} is not found under {}".format(taskDetailFileName, hourDirList[0]))
       exit(1)
-    with open(taskDetailFile) as file:
-      tasks = json.load(file)
-    for task in tasks:
-      if task['collection_name'] == dataType:
-        if task['collection_class'] != "SQL":
-          print("Data type {} with command type {} is not supported.".format(dataType, task['collection_class']))
-          exit(1) 
-        summaryCols = task['quickparse_summary_columns']
+    schema = histmeta.load_schema(taskDetailFile) if taskDetailFile else histmeta.new_schema(b"[]")
+
+  # Read the defined summary columns in summary display mode
+  summaryCols = "ALL"
+  if args.displayMode == "summary":
+    task = histmeta.collection_task(schema, dataType)
+    if task:
+      if task['collection_class'] != "SQL":
+        print("Data type {} with command type {} is not supported.".format(dataType, task['collection_class']))
+        exit(1) 
+      summaryCols = task['quickparse_summary_columns']
   
   # Find the qualified raw data files based on the time range given
   fileList = []
   for dir in hourDirList:
-    files = list(dir.glob(dataType + "_*.del"))
+    files = histfiles.list_data_files(dir, dataType + "_*.del")
     for file in files:
-      tsPattern = re.search("[0-9]{12}", file.name)
+      tsPattern = re.search("[0-9]{12}", os.path.basename(file))
       if tsPattern:
         fileTs = time.mktime(time.strptime(tsPattern.group(0), "%Y%m%d%H%M"))
         if startTs <= fileTs <= endTs:
@@ -174,13 +419,19 @@ def main():
     print("No raw data file found with the given time range.")
     exit(1)
 
-  # Read the first line of a sample raw data file to get the column names
-  with open(fileList[0], encoding="latin-1") as file:
-    columnLine = file.readline().split(',')
-  columns = [col.strip().strip('\n') for col in columnLine]
+  # Get the column names from the schema, or from the first line of a sample raw data file if the schema does not have them
+  columns = histmeta.collection_columns(schema, dataType, fileList[0])
     
-  # Read raw data from files and print the data
-  readAndPrintData(columns, fileList, summaryCols, args.applHandle, dataType)
+  # Read raw data from files and print the data, seeking to the rows matching -applHandle and -member in indexed files
+  global indexPath, indexKeys
+  indexPath = os.path.abspath(args.indexPath or histindex.default_index_path(str(basePath)))
+  indexKeys = {col: [value] for col, value in [(applHandleColName, args.applHandle), (memberColName, args.member)] if value}
+  try:
+    readAndPrintData(columns, fileList, summaryCols, buildFilters(columns, args), dataType)
+  except ColumnCountError as e:
+    # The column names of the schema are out of date, e.g. after a fixpack added columns, so read them from the file again
+    columns = histmeta.collection_columns(schema, dataType, e.file, reread=True)
+    readAndPrintData(columns, fileList, summaryCols, buildFilters(columns, args), dataType)
 
 if __name__== "__main__":
     main()
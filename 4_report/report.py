@@ -1,47 +1,348 @@
 import argparse
 import os
+import sys
 import io
 import codecs
 import re, glob, json
+import functools, multiprocessing
+import mmap
+from collections import OrderedDict
 import numpy as np
 import pandas as pd
 
+# pyarrow is optional, only needed to cache parsed collection files as parquet files
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# shared module to read hourly directories and archived hourly directories
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+import histfiles
+import histindex
+
 # collection time format
 collection_time_format = '%Y-%m-%d-%H.%M.%S.%f'
 
+# time formats in hourly directory names (db_yyyymmddhh) and collection file names (name_yyyymmddhhmi.del)
+hour_dir_format = '%Y%m%d%H'
+file_time_format = '%Y%m%d%H%M'
+
+# collections can finish after the minute in their file name
+# so keep files up to this long before the start time
+file_time_slack = pd.Timedelta(minutes=1)
+
 # global output variables
 label_chars = 40
 value_chars = 15
 str_chars = 80
 stats = False
 
+# global output format variables
+# text reports are printed as they are generated
+# other formats collect metric series and tables as records, which are written to output_path after the report
+output_format = 'text'
+output_path = None
+output_records = []
+
+# fields added to each record, labels the next series is indented under, and start and end times of each interval
+output_fields = dict()
+output_labels = []
+output_times = []
+
 # cached lobs
 lob_cache = dict()
 
+# lob file paths by lob file name, built on first lob read
+# archived hourly directories are only indexed when a lob from their hour is read
+lob_index = None
+lob_archives = []
+
+# memory mapped lob files by path, least recently used first
+lob_maps = OrderedDict()
+max_lob_maps = 16
+
+# directory to cache parsed collection files in, disabled if None
+cache_path = None
+
+# directory to read archived hourly directories from, the collection path with an _archive suffix if None
+archive_path = None
+
+# directory to read indexes of hourly directories from, the collection path with an _index suffix if None
+# indexes are built with common/histindex.py, files which are not indexed are read in full
+index_path = None
+
+# columns collection dataframes are filtered and sorted on, always loaded with the columns a report needs
+key_columns = ['COLLECTION_TIME', 'MEMBER', 'APPLICATION_HANDLE']
+
+# ingest variables
+# collection files are parsed in chunks of chunk_rows rows, filtering each chunk before it is kept
+# max_memory is the limit in megabytes of collection data held in memory, disabled if None
+chunk_rows = 10000
+max_memory = None
+
+# number of processes to parse collection files with
+jobs = 1
+
+# file wrapper to replace null bytes as the file is read
+# so binary data does not terminate, without holding a copy of the whole file
+class NullReplacedFile:
+
+    def __init__(self, f):
+        self.f = f
+
+    def read(self, size=-1):
+        return self.f.read(size).replace('\x00', '.')
+
+    def __iter__(self):
+        for line in self.f:
+            yield line.replace('\x00', '.')
+
+# function to filter dataframe on collection time, members and application handles
+def filter_df(df, filters):
+
+    # filter on members
+    if filters.get('members'):
+        df = df.loc[ df['MEMBER'].isin(filters['members']) ]
+
+    # filter on application handles
+    if filters.get('application_handles'):
+        df = df.loc[ df['APPLICATION_HANDLE'].isin(filters['application_handles']) ]
+
+    # transform collection time column to datetime and filter on collection times
+    df = df.assign(COLLECTION_TIME=pd.to_datetime( df['COLLECTION_TIME'], format=collection_time_format ).dt.floor('S'))
+    df = df.loc[ ( df['COLLECTION_TIME'] >= filters['start_time'] ) & ( df['COLLECTION_TIME'] <= filters['end_time'] ) ]
+
+    return df
+
+# function to keep only the needed columns of dataframe, and the key columns, all columns if columns is None
+def project_df(df, columns=None):
+
+    if columns is None:
+        return df
+    return df[ [ col for col in df.columns if col in columns or col in key_columns ] ]
+
+# function to read a collection file into a dataframe
+# the file is decoded and parsed in chunks, and each chunk is filtered before it is kept
+# if cache_file is given, all rows and columns of each chunk are also written to it before they are filtered,
+# so the cache serves any later filters and columns, files parsed into chunks of different column types are not cached
+def file_to_df(file, filters=None, columns=None, cache_file=None):
+
+    global chunk_rows
+
+    # cached files are keyed by path, size and modification time
+    # write to a temp file first so concurrent reports never read a partial cache file
+    writer = None
+    if cache_file:
+        key = json.dumps( histfiles.file_key(file) )
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        tmp_file = cache_file + '.' + str(os.getpid()) + '.tmp'
+
+    # only the needed columns are parsed if the file is not cached
+    usecols = None if cache_file or columns is None else lambda col: col in columns or col in key_columns
+
+    parsed = False
+    try:
+        with io.TextIOWrapper(histfiles.open_file(file), encoding='utf-8', errors='ignore') as f:
+            dfs = []
+            for df in pd.read_csv(NullReplacedFile(f), chunksize=chunk_rows, usecols=usecols):
+                if cache_file:
+                    try:
+                        table = pyarrow.Table.from_pandas(df, schema=writer.schema if writer else None, preserve_index=False)
+                        if writer is None:
+                            writer = pyarrow.parquet.ParquetWriter(tmp_file, table.schema.with_metadata( { **table.schema.metadata, b'file_key': key.encode() } ))
+                        writer.write_table(table)
+                    except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError):
+                        cache_file = None
+                if filters is not None:
+                    df = filter_df(df, filters)
+                dfs.append(project_df(df, columns))
+        parsed = True
+    finally:
+        # the cache file is only replaced if the whole file was parsed and written
+        if writer:
+            writer.close()
+            if parsed and cache_file:
+                os.replace(tmp_file, cache_file)
+            else:
+                os.remove(tmp_file)
+
+    return pd.concat( dfs ) if len(dfs) > 1 else dfs[0]
+
+# function to get path of the cache file of a collection file
+def cache_file_path(file, cache_path):
+
+    return os.path.join(cache_path, os.path.splitdrive(file)[1].lstrip('/\\') + '.parquet')
+
+# function to read a collection file from its cache file, None if it is not cached or has changed since it was cached
+# only the needed columns are read, and rows are filtered on members and application handles as they are read
+def cached_file_to_df(file, cache_file, filters, columns=None):
+
+    try:
+        schema = pyarrow.parquet.read_schema(cache_file)
+    except (OSError, pyarrow.ArrowInvalid):
+        return None
+    if ( schema.metadata or dict() ).get(b'file_key') != json.dumps( histfiles.file_key(file) ).encode():
+        return None
+
+    if columns is not None:
+        columns = [ col for col in schema.names if col in columns or col in key_columns ]
+    row_filters = [ (col, 'in', filters[name]) for col, name in [ ('MEMBER', 'members'), ('APPLICATION_HANDLE', 'application_handles') ]
+                    if filters.get(name) and col in schema.names ]
+    df = pyarrow.parquet.read_table(cache_file, columns=columns, filters=row_filters or None).to_pandas()
+
+    # missing strings are read as None, replace them with NaN as they are parsed from collection files
+    strings = df.select_dtypes(include='object').columns
+    df[strings] = df[strings].fillna(np.nan)
+
+    return filter_df(df, filters)
+
+# function to find collection files based on name, in hourly directories and archived hourly directories
+# hourly directories and files outside of the time range are skipped using the times in their names
+def collection_files(collection_name, start_time=pd.Timestamp.min, end_time=pd.Timestamp.max):
+
+    global file_time_slack, archive_path
+
+    files = []
+    for hour_dir in histfiles.hour_dirs( '', '*_' + '[0-9]' * 10 + '*', archive_path ):
+
+        # skip hourly directory if it is outside of the time range
+        # directories with unexpected names are always searched
+        match = re.search( r'_([0-9]{10})(_tm_chg)?$', histfiles.hour_name(hour_dir) )
+        if match:
+            hour = pd.to_datetime( match.group(1), format=hour_dir_format )
+            if hour > end_time or hour + pd.Timedelta(hours=1) + file_time_slack <= start_time:
+                continue
+
+        for file in histfiles.list_data_files( hour_dir, collection_name + '_*.del' ):
+
+            # skip file if it is outside of the time range
+            match = re.search( r'_([0-9]{12})\.del(\.[a-z0-9]+)?$', file )
+            if match:
+                minute = pd.to_datetime( match.group(1), format=file_time_format )
+                if minute > end_time or minute + pd.Timedelta(minutes=1) + file_time_slack <= start_time:
+                    continue
+
+            files.append(file)
+
+    # sort files so they are merged in the same order regardless of how they are parsed
+    return sorted(files)
+
+# function to load a collection file into a filtered dataframe with the needed columns, from the cache if enabled
+# if the file is not cached and is indexed, only the records with the filtered members and application handles are read
+# otherwise the file is parsed in chunks, and written to the cache if enabled
+# cache and index paths are passed in as worker processes may not inherit globals
+def load_file(file, filters, columns=None, cache_path=None, index_path=None):
+
+    cache_file = cache_file_path(file, cache_path) if cache_path else None
+    if cache_file:
+        df = cached_file_to_df(file, cache_file, filters, columns)
+        if df is not None:
+            return df
+
+    keys = { col: filters[name] for col, name in [ ('MEMBER', 'members'), ('APPLICATION_HANDLE', 'application_handles') ] if filters.get(name) }
+    offsets = histindex.lookup(file, keys, index_path)
+    if offsets is not None:
+        usecols = None if columns is None else lambda col: col in columns or col in key_columns
+        return filter_df(pd.read_csv( io.StringIO( histindex.read_offsets(file, offsets) ), usecols=usecols ), filters)
+
+    return file_to_df(file, filters, columns, cache_file)
+
 # function to create dataframe from collections based on name
-def collection_to_df(collection_name):
+# collections are filtered on collection time, members and application handles as they are loaded
+# only the given columns and the key columns are loaded, all columns if columns is None
+def collection_to_df(collection_name, start_time=pd.Timestamp.min, end_time=pd.Timestamp.max, members=None, application_handles=None, columns=None):
+
+    global cache_path, index_path, max_memory, jobs
+
+    filters = { 'start_time': start_time, 'end_time': end_time, 'members': members, 'application_handles': application_handles }
 
-    # look for collection files
-    files = glob.glob( '*/'+ collection_name +'_*.del' )
+    # look for collection files within the time range
+    files = collection_files(collection_name, start_time, end_time)
     assert files, "No " + collection_name + " files found."
 
-    # load all files into dataframes
-    # dfs = [pd.read_csv(file) for file in files]
-    dfs = []
-    for file in files:
-        with codecs.open(file, 'r', encoding='utf-8', errors='ignore') as f:
-            # need to replace null bytes so binary data does not terminate
-            f = f.read()
-            f = f.replace('\x00', '.')
-            f = io.StringIO(f)
-            # load file into dataframe
-            dfs.append( pd.read_csv(f) )
-
-    # concatante all the dataframes together
-    df = pd.concat( dfs )
+    # load all files into filtered dataframes, in parallel if more than one job
+    # files are loaded in the order they are best read in, so archives are read in the order they are stored
+    read_files = histfiles.read_order(files)
+    pool = None
+    if jobs != 1 and len(files) > 1:
+        pool = multiprocessing.Pool( jobs if jobs > 0 else None )
+        results = pool.imap( functools.partial(load_file, filters=filters, columns=columns, cache_path=cache_path, index_path=index_path), read_files, chunksize=4 )
+    else:
+        results = ( load_file(file, filters, columns, cache_path, index_path) for file in read_files )
+
+    dfs = dict()
+    size = 0
+    try:
+        for file, df in zip(read_files, results):
+
+            # stop if collection data exceeds the memory limit
+            # raised as an exception rather than asserted, so the limit is still enforced when python runs with -O
+            size += df.memory_usage(deep=True).sum()
+            if max_memory is not None and size > max_memory * 1024 * 1024:
+                raise MemoryError("Loaded " + collection_name + " data exceeds the memory limit of " + str(max_memory) + " MB, narrow down the time range, members or application handles.")
+
+            dfs[file] = df
+    finally:
+        if pool:
+            pool.terminate()
+
+    # concatante all the dataframes together in the order of files, then in collection time order
+    # empty dataframes are left out, as empty files read through an index have no column types
+    df = pd.concat( [ dfs[file] for file in files if len(dfs[file]) ] or [ dfs[files[0]] ] )
+    df = df.sort_values( 'COLLECTION_TIME', kind='mergesort' )
 
     return df
 
+# function to get path of lob file from its name
+# all lob directories are indexed once, instead of searched for every lob
+def get_lob_path(lob_file):
+
+    global lob_index, lob_archives, archive_path
+
+    if lob_index is None:
+        lob_index, lob_archives = dict(), []
+        for hour_dir in histfiles.hour_dirs( '', '*', archive_path ):
+            if os.path.isdir(hour_dir):
+                for path in glob.glob( os.path.join(hour_dir, 'lob', '*') ):
+                    lob_index.setdefault( os.path.basename(path), path )
+            elif histfiles.archive_ext(hour_dir):
+                lob_archives.append(hour_dir)
+
+    # index lob directories of archived hourly directories from the hour in the lob file name
+    if lob_file not in lob_index:
+        match = re.search( r'_([0-9]{10})[0-9]{2}\.del', lob_file )
+        for hour_dir in [ d for d in lob_archives if not match or match.group(1) in histfiles.hour_name(d) ]:
+            lob_archives.remove(hour_dir)
+            for path in histfiles.list_files( hour_dir, 'lob/*' ):
+                lob_index.setdefault( os.path.basename(path), path )
+
+    return lob_index.get(lob_file)
+
+# function to get memory mapped lob file
+# mapped files are kept open for reuse, closing the least recently used if there are too many
+def get_lob_map(path):
+
+    global lob_maps, max_lob_maps
+
+    # return mapped file if previously mapped
+    if path in lob_maps:
+        lob_maps.move_to_end(path)
+        return lob_maps[path]
+
+    # map lob file, empty files can not be mapped
+    with open(path, 'rb') as f:
+        lob_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b''
+
+    lob_maps[path] = lob_map
+    if len(lob_maps) > max_lob_maps:
+        _, old_map = lob_maps.popitem(last=False)
+        if old_map:
+            old_map.close()
+
+    return lob_map
+
 # function to read lobs from lob id
 def get_lob(lob_id):
 
@@ -59,23 +360,52 @@ def get_lob(lob_id):
     lob_file = '.'.join(lob_id_parsed[:-2])
     lob_start, lob_size = int(lob_id_parsed[-2]), int(lob_id_parsed[-1])
 
-    # get matching lob files
-    lob_files = glob.glob( '*/lob/'+ lob_file )
-    if not lob_files:
+    # get matching lob file
+    lob_path = get_lob_path(lob_file)
+    if not lob_path:
         return "LOB_FILE: " + lob_file + " NOT FOUND"
 
-    # read lob file and get lob
-    with open(lob_files[0], 'rb') as lob:
-        lob = lob.read()
-        lob = lob.replace(b'\x00', b'.')
-        lob = lob[lob_start : lob_start + lob_size]
-        lob = lob.decode('utf-8')
-        lob = lob.ljust(str_chars-1)
+    # read only the lob from the lob file, memory mapped unless it is archived
+    if histfiles.split_archive_path(lob_path)[0]:
+        lob = histfiles.read_range(lob_path, lob_start, lob_size)
+    else:
+        lob = get_lob_map(lob_path)[lob_start : lob_start + lob_size]
+    lob = lob.replace(b'\x00', b'.')
+    lob = lob.decode('utf-8')
+    lob = lob.ljust(str_chars-1)
 
     # cache to lob cache and return lob
     lob_cache[lob_id] = lob
     return lob
 
+# function to calculate z = ( v - mean ) / std of each value, with mean and std calculated without that value
+# as the value can skew results for small series
+# nan values are skipped and inf values make the z of other values nan, like series.mean() and series.std()
+def leave_one_out_z(values):
+
+    is_nan, is_inf = np.isnan(values), np.isinf(values)
+    is_finite = ~is_nan & ~is_inf
+
+    # shift finite values by the first one, so identical values sum to exactly 0
+    shift = values[is_finite][0] if is_finite.any() else 0.0
+    shifted = np.where(is_finite, values - shift, 0.0)
+
+    # sums, sums of squares and counts of the other values
+    sums = shifted.sum() - shifted
+    squares = ( shifted * shifted ).sum() - shifted * shifted
+    counts = ( ~is_nan ).sum() - ( ~is_nan )
+    infs = is_inf.sum() - is_inf
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        means = sums / counts
+        stds = np.sqrt( np.maximum( squares - sums * means, 0 ) / ( counts - 1 ) )
+        z = ( values - shift - means ) / stds
+
+    # std needs at least two other values, and is nan if any other value is inf
+    z[ ( counts < 2 ) | ( infs > 0 ) ] = np.nan
+
+    return z
+
 # function to convert series to a string with values and additional information
 def series_to_str(series, round_places=2, sep='|', prefix='', suffix='', z_threshold=3):
 
@@ -92,22 +422,18 @@ def series_to_str(series, round_places=2, sep='|', prefix='', suffix='', z_thres
 
         string += ' ' + sep
 
+        # calculate z scores of all values, and check if outputting to terminal only once
+        z = leave_one_out_z(series.to_numpy(dtype=np.float64))
+        is_terminal = os.fstat(0) == os.fstat(1)
+
         # append values to string
         for i, v in enumerate(series.to_list()):
 
-            # remove current value for outlier calculations
-            # as it can skew results for small series
-            series_wo_val = series.drop(i)
-
-            # calculate z = ( v - mean ) / std wihout current value
-            with np.errstate(divide='ignore', invalid='ignore'):
-                z = ( v - series_wo_val.mean() ) / series_wo_val.std()
-
             # if z > z_threshold or z < -z_threshold, consider value as outlier
             outlier, color_begin, color_end = ' ', '', ''
-            if abs(z) > z_threshold:
+            if abs(z[i]) > z_threshold:
                 # color outlier as red if being outputted to terminal
-                if os.fstat(0) == os.fstat(1):
+                if is_terminal:
                     color_begin, color_end = '\033[91m', '\033[0m'
                 # place asterisk next to outlier if being outputted to file
                 else:
@@ -147,6 +473,9 @@ def series_to_str(series, round_places=2, sep='|', prefix='', suffix='', z_thres
 # function to print seperator
 def print_seperator(lines):
 
+    if output_format != 'text':
+        return
+
     if lines == 0:
         print( "" )
     elif lines == 1:
@@ -160,6 +489,15 @@ def print_seperator(lines):
 # function to print header and collection times
 def print_header(report, collection_times=None, period=1, diff=False, outliers=False):
 
+    global output_format, output_fields, output_times
+
+    # store report and collection times for records
+    if output_format != 'text':
+        output_fields['report'] = report
+        if collection_times is not None:
+            output_times = [ ( collection_times[i-period] if diff else None, collection_times[i] ) for i in range(period, len(collection_times), period) ]
+        return
+
     print_seperator(2)
 
     # print report name
@@ -191,656 +529,730 @@ def print_header(report, collection_times=None, period=1, diff=False, outliers=F
 
     print_seperator(2)
 
+# function to print text, only when outputting text
+def print_text(text=''):
+
+    if output_format == 'text':
+        print( text )
+
+# function to print heading, records after the heading are part of its section
+def print_heading(heading):
+
+    global output_fields, output_labels
+
+    if output_format == 'text':
+        print( heading )
+    else:
+        output_fields['section'] = heading.strip('- ')
+        output_labels = []
+
+# function to print series of values with a label
+# records are named by the label and the labels it is indented under, and have a value for each interval
+def print_series(label, series, **kwargs):
+
+    global label_chars, output_records, output_labels
+
+    if output_format == 'text':
+        print( label.ljust(label_chars) + series_to_str(series, **kwargs) )
+        return
+
+    # pop labels indented as far or further than this label
+    indent = len(label) - len(label.lstrip())
+    output_labels = [ (i, l) for i, l in output_labels if i < indent ] + [ (indent, label.strip()) ]
+    metric = ' / '.join( l for i, l in output_labels )
+
+    for i, v in enumerate(series.to_list()):
+        start_time, end_time = output_times[i] if i < len(output_times) else (None, None)
+        output_records.append( dict(output_fields, metric=metric, interval=i+1, start_time=start_time, end_time=end_time, value=v) )
+
+# function to print table of top values with a title
+# records have the rank of the row and a value for each numeric column, other columns are added as fields
+def print_table(title, df, columns, header, max_colwidth=-1):
+
+    global output_records
+
+    if output_format == 'text':
+        print( title )
+        print_seperator(1)
+        print( df.to_string(columns=columns, header=header, index=False, justify="left", col_space=20, max_colwidth=max_colwidth) )
+        print_seperator(0)
+        return
+
+    df = df[columns].set_axis(header, axis=1)
+    is_numeric = [ pd.api.types.is_numeric_dtype(dtype) for dtype in df.dtypes ]
+    for rank, row in enumerate(df.itertuples(index=False, name=None)):
+        fields = { h.lower().replace(' ', '_') : v.rstrip() if isinstance(v, str) else v for h, v, n in zip(header, row, is_numeric) if not n }
+        for h, v, n in zip(header, row, is_numeric):
+            if n:
+                output_records.append( dict(output_fields, section=title, metric=h, rank=rank+1, value=v, **fields) )
+
+# function to write records to output path, or to stdout if there is no output path
+def write_output():
+
+    global output_format, output_path, output_records
+
+    if output_format == 'text':
+        return
+
+    df = pd.DataFrame(output_records)
+    if output_format == 'json':
+        df.to_json(output_path or sys.stdout, orient='records', lines=True, date_format='iso')
+    elif output_format == 'csv':
+        df.to_csv(output_path or sys.stdout, index=False)
+    elif output_format == 'parquet':
+        assert output_path, "An output path is required for parquet output."
+        df.to_parquet(output_path, index=False)
+
 # function to print common req metrics
 # requires mon_get_database or mon_get connection with diff values
 def print_common_req_metrics(df):
 
     global label_chars
 
-    print( "Work volume and throughput" )
+    print_heading( "Work volume and throughput" )
     print_seperator(1)
 
     # print( "                                  Per second             Total" )
     # print( "                                  ---------------------  -----------------------" )
     # print( "TOTAL_APP_COMMITS                 0                      0" )
     series = df['TOTAL_APP_COMMITS']
-    print( "TOTAL_APP_COMMITS".ljust(label_chars) + series_to_str(series) )
+    print_series( "TOTAL_APP_COMMITS", series )
     series = df['TOTAL_APP_COMMITS'] / df['SECONDS_ELAPSED']
-    print( "  Per second".ljust(label_chars) + series_to_str(series) )
+    print_series( "  Per second", series )
     # print( "ACT_COMPLETED_TOTAL               0                      0" )
     series = df['ACT_COMPLETED_TOTAL']
-    print( "ACT_COMPLETED_TOTAL".ljust(label_chars) + series_to_str(series) )
+    print_series( "ACT_COMPLETED_TOTAL", series )
     series = df['ACT_COMPLETED_TOTAL'] / df['SECONDS_ELAPSED']
-    print( "  Per second".ljust(label_chars) + series_to_str(series) )
+    print_series( "  Per second", series )
     # print( "APP_RQSTS_COMPLETED_TOTAL         0                      0" )
     series = df['APP_RQSTS_COMPLETED_TOTAL']
-    print( "APP_RQSTS_COMPLETED_TOTAL".ljust(label_chars) + series_to_str(series) )
+    print_series( "APP_RQSTS_COMPLETED_TOTAL", series )
     series = df['APP_RQSTS_COMPLETED_TOTAL'] / df['SECONDS_ELAPSED']
-    print( "  Per second".ljust(label_chars) + series_to_str(series) )
+    print_series( "  Per second", series )
     print_seperator(0)
 
     series = df['TOTAL_CPU_TIME']
-    print( "TOTAL_CPU_TIME".ljust(label_chars) + series_to_str(series) )
+    print_series( "TOTAL_CPU_TIME", series )
     series = df['TOTAL_CPU_TIME'] / df['APP_RQSTS_COMPLETED_TOTAL']
-    print( "  Per request".ljust(label_chars) + series_to_str(series) )
+    print_series( "  Per request", series )
     print_seperator(0)
 
-    print( "Row processing" )
+    print_heading( "Row processing" )
     # print( "  ROWS_READ/ROWS_RETURNED         = 0 (0/0)" )
     series = df['ROWS_READ'] / df['ROWS_RETURNED']
-    print( "  ROWS_READ/ROWS_RETURNED".ljust(label_chars) + series_to_str(series) )
+    print_series( "  ROWS_READ/ROWS_RETURNED", series )
     series = df['ROWS_READ']
-    print( "    ROWS_READ".ljust(label_chars) + series_to_str(series) )
+    print_series( "    ROWS_READ", series )
     series = df['ROWS_RETURNED']
-    print( "    ROWS_RETURNED".ljust(label_chars) + series_to_str(series) )
+    print_series( "    ROWS_RETURNED", series )
     series = df['ROWS_MODIFIED']
-    print( "  ROWS_MODIFIED".ljust(label_chars) + series_to_str(series) )
+    print_series( "  ROWS_MODIFIED", series )
     print_seperator(0)
 
-    print( "Wait times" )
+    print_heading( "Wait times" )
     print_seperator(1)
 
-    print( "-- Wait time as a percentage of elapsed time --" )
+    print_heading( "-- Wait time as a percentage of elapsed time --" )
     print_seperator(0)
 
     # print( "                                         %    Wait time/Total time" )
     # print( "                                         ---  ----------------------------------" )
     # print( "For requests                             0    0/0" )
-    print( "For requests" )
+    print_heading( "For requests" )
     series = 100 * ( df['TOTAL_WAIT_TIME'] / df['TOTAL_RQST_TIME'] )
-    print( "  Percent Wait time/Total time".ljust(label_chars) + series_to_str(series, suffix='%') )
+    print_series( "  Percent Wait time/Total time", series, suffix='%' )
     series = df['TOTAL_WAIT_TIME']
-    print( "    Wait time".ljust(label_chars) + series_to_str(series) )
+    print_series( "    Wait time", series )
     series = df['TOTAL_RQST_TIME']
-    print( "    Total time".ljust(label_chars) + series_to_str(series) )
+    print_series( "    Total time", series )
     # print( "For activities                           0    0/0" )
-    print( "For activities" )
+    print_heading( "For activities" )
     series = 100 * ( df['TOTAL_ACT_WAIT_TIME'] / df['TOTAL_ACT_TIME'] )
-    print( "  Percent Wait time/Total time".ljust(label_chars) + series_to_str(series, suffix='%') )
+    print_series( "  Percent Wait time/Total time", series, suffix='%' )
     series = df['TOTAL_ACT_WAIT_TIME']
-    print( "    Wait time".ljust(label_chars) + series_to_str(series) )
+    print_series( "    Wait time", series )
     series = df['TOTAL_ACT_TIME']
-    print( "    Total time".ljust(label_chars) + series_to_str(series) )
+    print_series( "    Total time", series )
     print_seperator(0)
 
-    print( "-- Time waiting for next client request --" )
+    print_heading( "-- Time waiting for next client request --" )
     print_seperator(0)
 
     series = df['CLIENT_IDLE_WAIT_TIME']
-    print( "CLIENT_IDLE_WAIT_TIME".ljust(label_chars) + series_to_str(series) )
+    print_series( "CLIENT_IDLE_WAIT_TIME", series )
     series = df['CLIENT_IDLE_WAIT_TIME'] / df['SECONDS_ELAPSED']
-    print( "  Per second".ljust(label_chars) + series_to_str(series) )
+    print_series( "  Per second", series )
     print_seperator(0)
 
-    print( "-- Detailed breakdown of TOTAL_WAIT_TIME --" )
+    print_heading( "-- Detailed breakdown of TOTAL_WAIT_TIME --" )
     print_seperator(0)
 
     # print( "                              %    Total" )
     # print( "                              ---  ---------------------------------------------" )
     # print( "TOTAL_WAIT_TIME               100  0" )
     series = df['TOTAL_WAIT_TIME']
-    print( "TOTAL_WAIT_TIME".ljust(label_chars) + series_to_str(series) )
+    print_series( "TOTAL_WAIT_TIME", series )
     print_seperator(0)
 
-    print( "I/O wait time" )
+    print_heading( "I/O wait time" )
     # print( "  POOL_READ_TIME              0    0" )
     series = df['POOL_READ_TIME']
-    print( "  POOL_READ_TIME".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_READ_TIME", series )
     series = 100 * ( df['POOL_READ_TIME'] / df['TOTAL_WAIT_TIME'] )
-    print( "    Percent of total wait time".ljust(label_chars) + series_to_str(series, suffix='%') )
+    print_series( "    Percent of total wait time", series, suffix='%' )
     # print( "  POOL_WRITE_TIME             0    0" )
     series = df['POOL_WRITE_TIME']
-    print( "  POOL_WRITE_TIME".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_WRITE_TIME", series )
     series = 100 * ( df['POOL_WRITE_TIME'] / df['TOTAL_WAIT_TIME'] )
-    print( "    Percent of total wait time".ljust(label_chars) + series_to_str(series, suffix='%') )
+    print_series( "    Percent of total wait time", series, suffix='%' )
     # print( "  DIRECT_READ_TIME            0    4" )
     series = df['DIRECT_READ_TIME']
-    print( "  DIRECT_READ_TIME".ljust(label_chars) + series_to_str(series) )
+    print_series( "  DIRECT_READ_TIME", series )
     series = 100 * ( df['DIRECT_READ_TIME'] / df['TOTAL_WAIT_TIME'] )
-    print( "    Percent of total wait time".ljust(label_chars) + series_to_str(series, suffix='%') )
+    print_series( "    Percent of total wait time", series, suffix='%' )
     # print( "  DIRECT_WRITE_TIME           0    0" )
     series = df['DIRECT_WRITE_TIME']
-    print( "  DIRECT_WRITE_TIME".ljust(label_chars) + series_to_str(series) )
+    print_series( "  DIRECT_WRITE_TIME", series )
     series = 100 * ( df['DIRECT_WRITE_TIME'] / df['TOTAL_WAIT_TIME'] )
-    print( "    Percent of total wait time".ljust(label_chars) + series_to_str(series, suffix='%') )
+    print_series( "    Percent of total wait time", series, suffix='%' )
     # print( "  LOG_DISK_WAIT_TIME          0    0" )
     series = df['LOG_DISK_WAIT_TIME']
-    print( "  LOG_DISK_WAIT_TIME".ljust(label_chars) + series_to_str(series) )
+    print_series( "  LOG_DISK_WAIT_TIME", series )
     series = 100 * ( df['LOG_DISK_WAIT_TIME'] / df['TOTAL_WAIT_TIME'] )
-    print( "    Percent of total wait time".ljust(label_chars) + series_to_str(series, suffix='%') )
+    print_series( "    Percent of total wait time", series, suffix='%' )
     # print( "LOCK_WAIT_TIME                0    0" )
     series = df['LOCK_WAIT_TIME']
-    print( "LOCK_WAIT_TIME".ljust(label_chars) + series_to_str(series) )
+    print_series( "LOCK_WAIT_TIME", series )
     series = 100 * ( df['LOCK_WAIT_TIME'] / df['TOTAL_WAIT_TIME'] )
-    print( "  Percent of total wait time".ljust(label_chars) + series_to_str(series, suffix='%') )
+    print_series( "  Percent of total wait time", series, suffix='%' )
     # print( "AGENT_WAIT_TIME               0    0" )
     series = df['AGENT_WAIT_TIME']
-    print( "AGENT_WAIT_TIME".ljust(label_chars) + series_to_str(series) )
+    print_series( "AGENT_WAIT_TIME", series )
     series = 100 * ( df['AGENT_WAIT_TIME'] / df['TOTAL_WAIT_TIME'] )
-    print( "  Percent of total wait time".ljust(label_chars) + series_to_str(series, suffix='%') )
-    print( "Network and FCM" )
+    print_series( "  Percent of total wait time", series, suffix='%' )
+    print_heading( "Network and FCM" )
     # print( "  TCPIP_SEND_WAIT_TIME        0    0" )
     series = df['TCPIP_SEND_WAIT_TIME']
-    print( "  TCPIP_SEND_WAIT_TIME".ljust(label_chars) + series_to_str(series) )
+    print_series( "  TCPIP_SEND_WAIT_TIME", series )
     series = 100 * ( df['TCPIP_SEND_WAIT_TIME'] / df['TOTAL_WAIT_TIME'] )
-    print( "    Percent of total wait time".ljust(label_chars) + series_to_str(series, suffix='%') )
+    print_series( "    Percent of total wait time", series, suffix='%' )
     # print( "  TCPIP_RECV_WAIT_TIME        0    0" )
     series = df['TCPIP_RECV_WAIT_TIME']
-    print( "  TCPIP_RECV_WAIT_TIME".ljust(label_chars) + series_to_str(series) )
+    print_series( "  TCPIP_RECV_WAIT_TIME", series )
     series = 100 * ( df['TCPIP_RECV_WAIT_TIME'] / df['TOTAL_WAIT_TIME'] )
-    print( "    Percent of total wait time".ljust(label_chars) + series_to_str(series, suffix='%') )
+    print_series( "    Percent of total wait time", series, suffix='%' )
     # print( "  IPC_SEND_WAIT_TIME          0    0" )
     series = df['IPC_SEND_WAIT_TIME']
-    print( "  IPC_SEND_WAIT_TIME".ljust(label_chars) + series_to_str(series) )
+    print_series( "  IPC_SEND_WAIT_TIME", series )
     series = 100 * ( df['IPC_SEND_WAIT_TIME'] / df['TOTAL_WAIT_TIME'] )
-    print( "    Percent of total wait time".ljust(label_chars) + series_to_str(series, suffix='%') )
+    print_series( "    Percent of total wait time", series, suffix='%' )
     # print( "  IPC_RECV_WAIT_TIME          0    0" )
     series = df['IPC_RECV_WAIT_TIME']
-    print( "  IPC_RECV_WAIT_TIME".ljust(label_chars) + series_to_str(series) )
+    print_series( "  IPC_RECV_WAIT_TIME", series )
     series = 100 * ( df['IPC_RECV_WAIT_TIME'] / df['TOTAL_WAIT_TIME'] )
-    print( "    Percent of total wait time".ljust(label_chars) + series_to_str(series, suffix='%') )
+    print_series( "    Percent of total wait time", series, suffix='%' )
     # print( "  FCM_SEND_WAIT_TIME          0    0" )
     series = df['FCM_SEND_WAIT_TIME']
-    print( "  FCM_SEND_WAIT_TIME".ljust(label_chars) + series_to_str(series) )
+    print_series( "  FCM_SEND_WAIT_TIME", series )
     series = 100 * ( df['FCM_SEND_WAIT_TIME'] / df['TOTAL_WAIT_TIME'] )
-    print( "    Percent of total wait time".ljust(label_chars) + series_to_str(series, suffix='%') )
+    print_series( "    Percent of total wait time", series, suffix='%' )
     # print( "  FCM_RECV_WAIT_TIME          0    0" )
     series = df['FCM_RECV_WAIT_TIME']
-    print( "  FCM_RECV_WAIT_TIME".ljust(label_chars) + series_to_str(series) )
+    print_series( "  FCM_RECV_WAIT_TIME", series )
     series = 100 * ( df['FCM_RECV_WAIT_TIME'] / df['TOTAL_WAIT_TIME'] )
-    print( "    Percent of total wait time".ljust(label_chars) + series_to_str(series, suffix='%') )
+    print_series( "    Percent of total wait time", series, suffix='%' )
     # print( "WLM_QUEUE_TIME_TOTAL          0    0" )
     series = df['WLM_QUEUE_TIME_TOTAL']
-    print( "WLM_QUEUE_TIME_TOTAL".ljust(label_chars) + series_to_str(series) )
+    print_series( "WLM_QUEUE_TIME_TOTAL", series )
     series = 100 * ( df['WLM_QUEUE_TIME_TOTAL'] / df['TOTAL_WAIT_TIME'] )
-    print( "  Percent of total wait time".ljust(label_chars) + series_to_str(series, suffix='%') )
+    print_series( "  Percent of total wait time", series, suffix='%' )
     # print( "CF_WAIT_TIME                  0    0" )
     series = df['CF_WAIT_TIME']
-    print( "CF_WAIT_TIME".ljust(label_chars) + series_to_str(series) )
+    print_series( "CF_WAIT_TIME", series )
     series = 100 * ( df['CF_WAIT_TIME'] / df['TOTAL_WAIT_TIME'] )
-    print( "  Percent of total wait time".ljust(label_chars) + series_to_str(series, suffix='%') )
+    print_series( "  Percent of total wait time", series, suffix='%' )
     # print( "RECLAIM_WAIT_TIME             0    0" )
     series = df['RECLAIM_WAIT_TIME']
-    print( "RECLAIM_WAIT_TIME".ljust(label_chars) + series_to_str(series) )
+    print_series( "RECLAIM_WAIT_TIME", series )
     series = 100 * ( df['RECLAIM_WAIT_TIME'] / df['TOTAL_WAIT_TIME'] )
-    print( "  Percent of total wait time".ljust(label_chars) + series_to_str(series, suffix='%') )
+    print_series( "  Percent of total wait time", series, suffix='%' )
     # print( "SMP_RECLAIM_WAIT_TIME         0    0" )
     series = df['SPACEMAPPAGE_RECLAIM_WAIT_TIME']
-    print( "SMP_RECLAIM_WAIT_TIME".ljust(label_chars) + series_to_str(series) )
+    print_series( "SMP_RECLAIM_WAIT_TIME", series )
     series = 100 * ( df['SPACEMAPPAGE_RECLAIM_WAIT_TIME'] / df['TOTAL_WAIT_TIME'] )
-    print( "  Percent of total wait time".ljust(label_chars) + series_to_str(series, suffix='%') )
+    print_series( "  Percent of total wait time", series, suffix='%' )
     print_seperator(0)
 
-    print( "Component times" )
+    print_heading( "Component times" )
     print_seperator(1)
 
-    print( "-- Detailed breakdown of processing time --" )
+    print_heading( "-- Detailed breakdown of processing time --" )
     print_seperator(0)
 
     # print( "                                    %                 Total" )
     # print( "                                    ----------------  --------------------------" )
     # print( "Total processing                    100               0" )
     series = df['TOTAL_RQST_TIME'] - df['TOTAL_WAIT_TIME']
-    print( "Total processing".ljust(label_chars) + series_to_str(series) )
+    print_series( "Total processing", series )
     print_seperator(0)
 
-    print( "Section execution" )
+    print_heading( "Section execution" )
     # print( "  TOTAL_SECTION_PROC_TIME           0                 0" )
     series = df['TOTAL_SECTION_PROC_TIME']
-    print( "  TOTAL_SECTION_PROC_TIME".ljust(label_chars) + series_to_str(series) )
+    print_series( "  TOTAL_SECTION_PROC_TIME", series )
     series = 100 * ( df['TOTAL_SECTION_PROC_TIME'] / (df['TOTAL_RQST_TIME'] - df['TOTAL_WAIT_TIME'] ) )
-    print( "    Percent of total proc time".ljust(label_chars) + series_to_str(series, suffix='%') )
+    print_series( "    Percent of total proc time", series, suffix='%' )
     # print( "    TOTAL_SECTION_SORT_PROC_TIME    0                 0" )
     series = df['TOTAL_SECTION_SORT_PROC_TIME']
-    print( "  TOTAL_SECTION_SORT_PROC_TIME".ljust(label_chars) + series_to_str(series) )
+    print_series( "  TOTAL_SECTION_SORT_PROC_TIME", series )
     series = 100 * ( df['TOTAL_SECTION_SORT_PROC_TIME'] / (df['TOTAL_RQST_TIME'] - df['TOTAL_WAIT_TIME'] ) )
-    print( "    Percent of total proc time".ljust(label_chars) + series_to_str(series, suffix='%') )
-    print( "Compile" )
+    print_series( "    Percent of total proc time", series, suffix='%' )
+    print_heading( "Compile" )
     # print( "  TOTAL_COMPILE_PROC_TIME           0                 0" )
     series = df['TOTAL_COMPILE_PROC_TIME']
-    print( "  TOTAL_COMPILE_PROC_TIME".ljust(label_chars) + series_to_str(series) )
+    print_series( "  TOTAL_COMPILE_PROC_TIME", series )
     series = 100 * ( df['TOTAL_COMPILE_PROC_TIME'] / (df['TOTAL_RQST_TIME'] - df['TOTAL_WAIT_TIME'] ) )
-    print( "    Percent of total proc time".ljust(label_chars) + series_to_str(series, suffix='%') )
+    print_series( "    Percent of total proc time", series, suffix='%' )
     # print( "  TOTAL_IMPLICIT_COMPILE_PROC_TIME  0                 0" )
     series = df['TOTAL_IMPLICIT_COMPILE_PROC_TIME']
-    print( "  TOTAL_IMPLICIT_COMPILE_PROC_TIME".ljust(label_chars) + series_to_str(series) )
+    print_series( "  TOTAL_IMPLICIT_COMPILE_PROC_TIME", series )
     series = 100 * ( df['TOTAL_IMPLICIT_COMPILE_PROC_TIME'] / (df['TOTAL_RQST_TIME'] - df['TOTAL_WAIT_TIME'] ) )
-    print( "    Percent of total proc time".ljust(label_chars) + series_to_str(series, suffix='%') )
-    print( "Transaction end processing" )
+    print_series( "    Percent of total proc time", series, suffix='%' )
+    print_heading( "Transaction end processing" )
     # print( "  TOTAL_COMMIT_PROC_TIME            0                 0" )
     series = df['TOTAL_COMMIT_PROC_TIME']
-    print( "  TOTAL_COMMIT_PROC_TIME".ljust(label_chars) + series_to_str(series) )
+    print_series( "  TOTAL_COMMIT_PROC_TIME", series )
     series = 100 * ( df['TOTAL_COMMIT_PROC_TIME'] / (df['TOTAL_RQST_TIME'] - df['TOTAL_WAIT_TIME'] ) )
-    print( "    Percent of total proc time".ljust(label_chars) + series_to_str(series, suffix='%') )
+    print_series( "    Percent of total proc time", series, suffix='%' )
     # print( "  TOTAL_ROLLBACK_PROC_TIME          0                 0" )
     series = df['TOTAL_ROLLBACK_PROC_TIME']
-    print( "  TOTAL_ROLLBACK_PROC_TIME".ljust(label_chars) + series_to_str(series) )
+    print_series( "  TOTAL_ROLLBACK_PROC_TIME", series )
     series = 100 * ( df['TOTAL_ROLLBACK_PROC_TIME'] / (df['TOTAL_RQST_TIME'] - df['TOTAL_WAIT_TIME'] ) )
-    print( "    Percent of total proc time".ljust(label_chars) + series_to_str(series, suffix='%') )
-    print( "Utilities" )
+    print_series( "    Percent of total proc time", series, suffix='%' )
+    print_heading( "Utilities" )
     # print( "  TOTAL_RUNSTATS_PROC_TIME          0                 0" )
     series = df['TOTAL_RUNSTATS_PROC_TIME']
-    print( "  TOTAL_RUNSTATS_PROC_TIME".ljust(label_chars) + series_to_str(series) )
+    print_series( "  TOTAL_RUNSTATS_PROC_TIME", series )
     series = 100 * ( df['TOTAL_RUNSTATS_PROC_TIME'] / (df['TOTAL_RQST_TIME'] - df['TOTAL_WAIT_TIME'] ) )
-    print( "    Percent of total proc time".ljust(label_chars) + series_to_str(series, suffix='%') )
+    print_series( "    Percent of total proc time", series, suffix='%' )
     # print( "  TOTAL_REORGS_PROC_TIME            0                 0" )
     series = df['TOTAL_REORG_PROC_TIME']
-    print( "  TOTAL_REORGS_PROC_TIME".ljust(label_chars) + series_to_str(series) )
+    print_series( "  TOTAL_REORGS_PROC_TIME", series )
     series = 100 * ( df['TOTAL_REORG_PROC_TIME'] / (df['TOTAL_RQST_TIME'] - df['TOTAL_WAIT_TIME'] ) )
-    print( "    Percent of total proc time".ljust(label_chars) + series_to_str(series, suffix='%') )
+    print_series( "    Percent of total proc time", series, suffix='%' )
     # print( "  TOTAL_LOAD_PROC_TIME              0                 0" )
     series = df['TOTAL_LOAD_PROC_TIME']
-    print( "  TOTAL_LOAD_PROC_TIME".ljust(label_chars) + series_to_str(series) )
+    print_series( "  TOTAL_LOAD_PROC_TIME", series )
     series = 100 * ( df['TOTAL_LOAD_PROC_TIME'] / (df['TOTAL_RQST_TIME'] - df['TOTAL_WAIT_TIME'] ) )
-    print( "    Percent of total proc time".ljust(label_chars) + series_to_str(series, suffix='%') )
+    print_series( "    Percent of total proc time", series, suffix='%' )
     print_seperator(0)
 
-    print( "Buffer pool" )
+    print_heading( "Buffer pool" )
     print_seperator(1)
 
-    print( "Buffer pool hit ratios" )
+    print_heading( "Buffer pool hit ratios" )
     print_seperator(0)
 
     # print( "Type             Ratio            Formula" )
     # print( "---------------  ---------------  ----------------------------------------------" )
     # print( "Data             96               (1-(1+0-0)/(29+0))" )
     series = ( 1  - ( ( df['POOL_DATA_P_READS'] + df['POOL_TEMP_DATA_P_READS'] - df['POOL_ASYNC_DATA_READS'] ) / ( df['POOL_DATA_L_READS'] + df['POOL_TEMP_DATA_L_READS'] ) ) ) * 100
-    print( "Data hit ratio".ljust(label_chars) + series_to_str(series) )
+    print_series( "Data hit ratio", series )
     series = df['POOL_DATA_P_READS']
-    print( "  POOL_DATA_P_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_DATA_P_READS", series )
     series = df['POOL_TEMP_DATA_P_READS']
-    print( "  POOL_TEMP_DATA_P_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_TEMP_DATA_P_READS", series )
     series = df['POOL_ASYNC_DATA_READS']
-    print( "  POOL_ASYNC_DATA_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_ASYNC_DATA_READS", series )
     series = df['POOL_DATA_L_READS']
-    print( "  POOL_DATA_L_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_DATA_L_READS", series )
     series = df['POOL_TEMP_DATA_L_READS']
-    print( "  POOL_TEMP_DATA_L_READS".ljust(label_chars) + series_to_str(series) )
-    print( "  Formula".ljust(label_chars) + " ( 1 - ( POOL_DATA_P_READS + POOL_TEMP_DATA_P_READS - POOL_ASYNC_DATA_READS) / ( POOL_DATA_L_READS + POOL_TEMP_DATA_L_READS ) " )
+    print_series( "  POOL_TEMP_DATA_L_READS", series )
+    print_text( "  Formula".ljust(label_chars) + " ( 1 - ( POOL_DATA_P_READS + POOL_TEMP_DATA_P_READS - POOL_ASYNC_DATA_READS) / ( POOL_DATA_L_READS + POOL_TEMP_DATA_L_READS ) " )
     # print( "Index            100              (1-(0+0-0)/(24+0))" )
     series = ( 1  - ( ( df['POOL_INDEX_P_READS'] + df['POOL_TEMP_INDEX_P_READS'] - df['POOL_ASYNC_INDEX_READS'] ) / ( df['POOL_INDEX_L_READS'] + df['POOL_TEMP_INDEX_L_READS'] ) ) ) * 100
-    print( "Index hit ratio".ljust(label_chars) + series_to_str(series) )
+    print_series( "Index hit ratio", series )
     series = df['POOL_INDEX_P_READS']
-    print( "  POOL_INDEX_P_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_INDEX_P_READS", series )
     series = df['POOL_TEMP_INDEX_P_READS']
-    print( "  POOL_TEMP_INDEX_P_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_TEMP_INDEX_P_READS", series )
     series = df['POOL_ASYNC_INDEX_READS']
-    print( "  POOL_ASYNC_INDEX_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_ASYNC_INDEX_READS", series )
     series = df['POOL_INDEX_L_READS']
-    print( "  POOL_INDEX_L_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_INDEX_L_READS", series )
     series = df['POOL_TEMP_INDEX_L_READS']
-    print( "  POOL_TEMP_INDEX_L_READS".ljust(label_chars) + series_to_str(series) )
-    print( "  Formula".ljust(label_chars) + " ( 1 - ( POOL_INDEX_P_READS + POOL_TEMP_INDEX_P_READS - POOL_ASYNC_INDEX_READS) / ( POOL_INDEX_L_READS + POOL_TEMP_INDEX_L_READS ) " )
+    print_series( "  POOL_TEMP_INDEX_L_READS", series )
+    print_text( "  Formula".ljust(label_chars) + " ( 1 - ( POOL_INDEX_P_READS + POOL_TEMP_INDEX_P_READS - POOL_ASYNC_INDEX_READS) / ( POOL_INDEX_L_READS + POOL_TEMP_INDEX_L_READS ) " )
     # print( "XDA              0                (1-(0+0-0)/(0+0))" )
     series = ( 1  - ( ( df['POOL_XDA_P_READS'] + df['POOL_TEMP_XDA_P_READS'] - df['POOL_ASYNC_XDA_READS'] ) / ( df['POOL_XDA_L_READS'] + df['POOL_TEMP_XDA_L_READS'] ) ) ) * 100
-    print( "XDA hit ratio".ljust(label_chars) + series_to_str(series) )
+    print_series( "XDA hit ratio", series )
     series = df['POOL_XDA_P_READS']
-    print( "  POOL_XDA_P_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_XDA_P_READS", series )
     series = df['POOL_TEMP_XDA_P_READS']
-    print( "  POOL_TEMP_XDA_P_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_TEMP_XDA_P_READS", series )
     series = df['POOL_ASYNC_XDA_READS']
-    print( "  POOL_ASYNC_XDA_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_ASYNC_XDA_READS", series )
     series = df['POOL_XDA_L_READS']
-    print( "  POOL_XDA_L_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_XDA_L_READS", series )
     series = df['POOL_TEMP_XDA_L_READS']
-    print( "  POOL_TEMP_XDA_L_READS".ljust(label_chars) + series_to_str(series) )
-    print( "  Formula".ljust(label_chars) + " ( 1 - ( POOL_XDA_P_READS + POOL_TEMP_XDA_P_READS - POOL_ASYNC_XDA_READS) / ( POOL_XDA_L_READS + POOL_TEMP_XDA_L_READS ) " )
+    print_series( "  POOL_TEMP_XDA_L_READS", series )
+    print_text( "  Formula".ljust(label_chars) + " ( 1 - ( POOL_XDA_P_READS + POOL_TEMP_XDA_P_READS - POOL_ASYNC_XDA_READS) / ( POOL_XDA_L_READS + POOL_TEMP_XDA_L_READS ) " )
     # print( "COL              0                (1-(0+0-0)/(0+0))" )
     series = ( 1  - ( ( df['POOL_COL_P_READS'] + df['POOL_TEMP_COL_P_READS'] - df['POOL_ASYNC_COL_READS'] ) / ( df['POOL_COL_L_READS'] + df['POOL_TEMP_COL_L_READS'] ) ) ) * 100
-    print( "COL hit ratio".ljust(label_chars) + series_to_str(series) )
+    print_series( "COL hit ratio", series )
     series = df['POOL_COL_P_READS']
-    print( "  POOL_COL_P_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_COL_P_READS", series )
     series = df['POOL_TEMP_COL_P_READS']
-    print( "  POOL_TEMP_COL_P_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_TEMP_COL_P_READS", series )
     series = df['POOL_ASYNC_COL_READS']
-    print( "  POOL_ASYNC_COL_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_ASYNC_COL_READS", series )
     series = df['POOL_COL_L_READS']
-    print( "  POOL_COL_L_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_COL_L_READS", series )
     series = df['POOL_TEMP_COL_L_READS']
-    print( "  POOL_TEMP_COL_L_READS".ljust(label_chars) + series_to_str(series) )
-    print( "  Formula".ljust(label_chars) + " ( 1 - ( POOL_COL_P_READS + POOL_TEMP_COL_P_READS - POOL_ASYNC_COL_READS) / ( POOL_COL_L_READS + POOL_TEMP_COL_L_READS ) " )
+    print_series( "  POOL_TEMP_COL_L_READS", series )
+    print_text( "  Formula".ljust(label_chars) + " ( 1 - ( POOL_COL_P_READS + POOL_TEMP_COL_P_READS - POOL_ASYNC_COL_READS) / ( POOL_COL_L_READS + POOL_TEMP_COL_L_READS ) " )
     # print( "LBP Data         96               (28-0)/(29+0)" )
     series = ( ( df['POOL_DATA_LBP_PAGES_FOUND'] - df['POOL_ASYNC_DATA_LBP_PAGES_FOUND'] ) / ( df['POOL_DATA_L_READS'] + df['POOL_DATA_L_READS'] ) ) * 100
-    print( "LBP Data hit ratio".ljust(label_chars) + series_to_str(series) )
+    print_series( "LBP Data hit ratio", series )
     series = df['POOL_DATA_LBP_PAGES_FOUND']
-    print( "  POOL_DATA_LBP_PAGES_FOUND".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_DATA_LBP_PAGES_FOUND", series )
     series = df['POOL_ASYNC_DATA_LBP_PAGES_FOUND']
-    print( "  POOL_ASYNC_DATA_LBP_PAGES_FOUND".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_ASYNC_DATA_LBP_PAGES_FOUND", series )
     series = df['POOL_DATA_L_READS']
-    print( "  POOL_DATA_L_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_DATA_L_READS", series )
     series = df['POOL_TEMP_DATA_L_READS']
-    print( "  POOL_TEMP_DATA_L_READS".ljust(label_chars) + series_to_str(series) )
-    print( "  Formula".ljust(label_chars) + " ( POOL_DATA_LBP_PAGES_FOUND - POOL_ASYNC_DATA_LBP_PAGES_FOUND ) / ( POOL_DATA_L_READS + POOL_DATA_L_READS ) " )
+    print_series( "  POOL_TEMP_DATA_L_READS", series )
+    print_text( "  Formula".ljust(label_chars) + " ( POOL_DATA_LBP_PAGES_FOUND - POOL_ASYNC_DATA_LBP_PAGES_FOUND ) / ( POOL_DATA_L_READS + POOL_DATA_L_READS ) " )
     # print( "LBP Index        0                (0-0)/(24+0)" )
     series = ( ( df['POOL_INDEX_LBP_PAGES_FOUND'] - df['POOL_ASYNC_INDEX_LBP_PAGES_FOUND'] ) / ( df['POOL_INDEX_L_READS'] + df['POOL_INDEX_L_READS'] ) ) * 100
-    print( "LBP Index hit ratio".ljust(label_chars) + series_to_str(series) )
+    print_series( "LBP Index hit ratio", series )
     series = df['POOL_INDEX_LBP_PAGES_FOUND']
-    print( "  POOL_INDEX_LBP_PAGES_FOUND".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_INDEX_LBP_PAGES_FOUND", series )
     series = df['POOL_ASYNC_INDEX_LBP_PAGES_FOUND']
-    print( "  POOL_ASYNC_INDEX_LBP_PAGES_FOUND".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_ASYNC_INDEX_LBP_PAGES_FOUND", series )
     series = df['POOL_INDEX_L_READS']
-    print( "  POOL_INDEX_L_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_INDEX_L_READS", series )
     series = df['POOL_TEMP_INDEX_L_READS']
-    print( "  POOL_TEMP_INDEX_L_READS".ljust(label_chars) + series_to_str(series) )
-    print( "  Formula".ljust(label_chars) + " ( POOL_INDEX_LBP_PAGES_FOUND - POOL_ASYNC_INDEX_LBP_PAGES_FOUND ) / ( POOL_INDEX_L_READS + POOL_INDEX_L_READS ) " )
+    print_series( "  POOL_TEMP_INDEX_L_READS", series )
+    print_text( "  Formula".ljust(label_chars) + " ( POOL_INDEX_LBP_PAGES_FOUND - POOL_ASYNC_INDEX_LBP_PAGES_FOUND ) / ( POOL_INDEX_L_READS + POOL_INDEX_L_READS ) " )
     # print( "LBP XDA          0                (0-0)/(0+0)" )
     series = ( ( df['POOL_XDA_LBP_PAGES_FOUND'] - df['POOL_ASYNC_XDA_LBP_PAGES_FOUND'] ) / ( df['POOL_XDA_L_READS'] + df['POOL_XDA_L_READS'] ) ) * 100
-    print( "LBP XDA hit ratio".ljust(label_chars) + series_to_str(series) )
+    print_series( "LBP XDA hit ratio", series )
     series = df['POOL_XDA_LBP_PAGES_FOUND']
-    print( "  POOL_XDA_LBP_PAGES_FOUND".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_XDA_LBP_PAGES_FOUND", series )
     series = df['POOL_ASYNC_XDA_LBP_PAGES_FOUND']
-    print( "  POOL_ASYNC_XDA_LBP_PAGES_FOUND".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_ASYNC_XDA_LBP_PAGES_FOUND", series )
     series = df['POOL_XDA_L_READS']
-    print( "  POOL_XDA_L_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_XDA_L_READS", series )
     series = df['POOL_TEMP_XDA_L_READS']
-    print( "  POOL_TEMP_XDA_L_READS".ljust(label_chars) + series_to_str(series) )
-    print( "  Formula".ljust(label_chars) + " ( POOL_XDA_LBP_PAGES_FOUND - POOL_ASYNC_XDA_LBP_PAGES_FOUND ) / ( POOL_XDA_L_READS + POOL_XDA_L_READS ) " )
+    print_series( "  POOL_TEMP_XDA_L_READS", series )
+    print_text( "  Formula".ljust(label_chars) + " ( POOL_XDA_LBP_PAGES_FOUND - POOL_ASYNC_XDA_LBP_PAGES_FOUND ) / ( POOL_XDA_L_READS + POOL_XDA_L_READS ) " )
     # print( "LBP COL          0                (0-0)/(0+0)" )
     series = ( ( df['POOL_COL_LBP_PAGES_FOUND'] - df['POOL_ASYNC_COL_LBP_PAGES_FOUND'] ) / ( df['POOL_COL_L_READS'] + df['POOL_COL_L_READS'] ) ) * 100
-    print( "LBP COL hit ratio".ljust(label_chars) + series_to_str(series) )
+    print_series( "LBP COL hit ratio", series )
     series = df['POOL_COL_LBP_PAGES_FOUND']
-    print( "  POOL_COL_LBP_PAGES_FOUND".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_COL_LBP_PAGES_FOUND", series )
     series = df['POOL_ASYNC_COL_LBP_PAGES_FOUND']
-    print( "  POOL_ASYNC_COL_LBP_PAGES_FOUND".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_ASYNC_COL_LBP_PAGES_FOUND", series )
     series = df['POOL_COL_L_READS']
-    print( "  POOL_COL_L_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_COL_L_READS", series )
     series = df['POOL_TEMP_COL_L_READS']
-    print( "  POOL_TEMP_COL_L_READS".ljust(label_chars) + series_to_str(series) )
-    print( "  Formula".ljust(label_chars) + " ( POOL_COL_LBP_PAGES_FOUND - POOL_ASYNC_COL_LBP_PAGES_FOUND ) / ( POOL_COL_L_READS + POOL_COL_L_READS ) " )
+    print_series( "  POOL_TEMP_COL_L_READS", series )
+    print_text( "  Formula".ljust(label_chars) + " ( POOL_COL_LBP_PAGES_FOUND - POOL_ASYNC_COL_LBP_PAGES_FOUND ) / ( POOL_COL_L_READS + POOL_COL_L_READS ) " )
     # print( "GBP Data         0                (0 - 0)/0" )s
     series = ( ( df['POOL_DATA_GBP_L_READS'] - df['POOL_DATA_GBP_P_READS'] ) / df['POOL_DATA_GBP_L_READS'] ) * 100
-    print( "GBP Data hit ratio".ljust(label_chars) + series_to_str(series) )
+    print_series( "GBP Data hit ratio", series )
     series = df['POOL_DATA_GBP_L_READS']
-    print( "  POOL_DATA_GBP_L_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_DATA_GBP_L_READS", series )
     series = df['POOL_DATA_GBP_P_READS']
-    print( "  POOL_DATA_GBP_P_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_DATA_GBP_P_READS", series )
     series = df['POOL_DATA_GBP_L_READS']
-    print( "  POOL_DATA_GBP_L_READS".ljust(label_chars) + series_to_str(series) )
-    print( "  Formula".ljust(label_chars) + " ( POOL_DATA_GBP_L_READS - POOL_DATA_GBP_P_READS ) / POOL_DATA_GBP_L_READS " )
+    print_series( "  POOL_DATA_GBP_L_READS", series )
+    print_text( "  Formula".ljust(label_chars) + " ( POOL_DATA_GBP_L_READS - POOL_DATA_GBP_P_READS ) / POOL_DATA_GBP_L_READS " )
     # print( "GBP Index        0                (0 - 0)/0" )
     series = ( ( df['POOL_INDEX_GBP_L_READS'] - df['POOL_INDEX_GBP_P_READS'] ) / df['POOL_INDEX_GBP_L_READS'] ) * 100
-    print( "GBP Index hit ratio".ljust(label_chars) + series_to_str(series) )
+    print_series( "GBP Index hit ratio", series )
     series = df['POOL_INDEX_GBP_L_READS']
-    print( "  POOL_INDEX_GBP_L_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_INDEX_GBP_L_READS", series )
     series = df['POOL_INDEX_GBP_P_READS']
-    print( "  POOL_INDEX_GBP_P_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_INDEX_GBP_P_READS", series )
     series = df['POOL_INDEX_GBP_L_READS']
-    print( "  POOL_INDEX_GBP_L_READS".ljust(label_chars) + series_to_str(series) )
-    print( "  Formula".ljust(label_chars) + " ( POOL_INDEX_GBP_L_READS - POOL_INDEX_GBP_P_READS ) / POOL_INDEX_GBP_L_READS " )
+    print_series( "  POOL_INDEX_GBP_L_READS", series )
+    print_text( "  Formula".ljust(label_chars) + " ( POOL_INDEX_GBP_L_READS - POOL_INDEX_GBP_P_READS ) / POOL_INDEX_GBP_L_READS " )
     # print( "GBP XDA          0                (0 - 0)/0" )
     series = ( ( df['POOL_XDA_GBP_L_READS'] - df['POOL_XDA_GBP_P_READS'] ) / df['POOL_XDA_GBP_L_READS'] ) * 100
-    print( "GBP XDA hit ratio".ljust(label_chars) + series_to_str(series) )
+    print_series( "GBP XDA hit ratio", series )
     series = df['POOL_XDA_GBP_L_READS']
-    print( "  POOL_XDA_GBP_L_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_XDA_GBP_L_READS", series )
     series = df['POOL_XDA_GBP_P_READS']
-    print( "  POOL_XDA_GBP_P_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_XDA_GBP_P_READS", series )
     series = df['POOL_XDA_GBP_L_READS']
-    print( "  POOL_XDA_GBP_L_READS".ljust(label_chars) + series_to_str(series) )
-    print( "  Formula".ljust(label_chars) + " ( POOL_XDA_GBP_L_READS - POOL_XDA_GBP_P_READS ) / POOL_XDA_GBP_L_READS " )
+    print_series( "  POOL_XDA_GBP_L_READS", series )
+    print_text( "  Formula".ljust(label_chars) + " ( POOL_XDA_GBP_L_READS - POOL_XDA_GBP_P_READS ) / POOL_XDA_GBP_L_READS " )
     # print( "GBP COL          0                (0 - 0)/0" )
     series = ( ( df['POOL_COL_GBP_L_READS'] - df['POOL_COL_GBP_P_READS'] ) / df['POOL_COL_GBP_L_READS'] ) * 100
-    print( "GBP COL hit ratio".ljust(label_chars) + series_to_str(series) )
+    print_series( "GBP COL hit ratio", series )
     series = df['POOL_COL_GBP_L_READS']
-    print( "  POOL_COL_GBP_L_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_COL_GBP_L_READS", series )
     series = df['POOL_COL_GBP_P_READS']
-    print( "  POOL_COL_GBP_P_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_COL_GBP_P_READS", series )
     series = df['POOL_COL_GBP_L_READS']
-    print( "  POOL_COL_GBP_L_READS".ljust(label_chars) + series_to_str(series) )
-    print( "  Formula".ljust(label_chars) + " ( POOL_COL_GBP_L_READS - POOL_COL_GBP_P_READS ) / POOL_COL_GBP_L_READS " )
+    print_series( "  POOL_COL_GBP_L_READS", series )
+    print_text( "  Formula".ljust(label_chars) + " ( POOL_COL_GBP_L_READS - POOL_COL_GBP_P_READS ) / POOL_COL_GBP_L_READS " )
     print_seperator(0)
 
-    print( "I/O" )
+    print_heading( "I/O" )
     print_seperator(1)
 
-    print( "Buffer pool reads" )
+    print_heading( "Buffer pool reads" )
     series = df['POOL_DATA_L_READS']
-    print( "  POOL_DATA_L_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_DATA_L_READS", series )
     series = df['POOL_TEMP_DATA_L_READS']
-    print( "  POOL_TEMP_DATA_L_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_TEMP_DATA_L_READS", series )
     series = df['POOL_DATA_P_READS']
-    print( "  POOL_DATA_P_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_DATA_P_READS", series )
     series = df['POOL_TEMP_DATA_P_READS']
-    print( "  POOL_TEMP_DATA_P_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_TEMP_DATA_P_READS", series )
     series = df['POOL_ASYNC_DATA_READS']
-    print( "  POOL_ASYNC_DATA_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_ASYNC_DATA_READS", series )
     series = df['POOL_INDEX_L_READS']
-    print( "  POOL_INDEX_L_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_INDEX_L_READS", series )
     series = df['POOL_TEMP_INDEX_L_READS']
-    print( "  POOL_TEMP_INDEX_L_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_TEMP_INDEX_L_READS", series )
     series = df['POOL_INDEX_P_READS']
-    print( "  POOL_INDEX_P_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_INDEX_P_READS", series )
     series = df['POOL_TEMP_INDEX_P_READS']
-    print( "  POOL_TEMP_INDEX_P_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_TEMP_INDEX_P_READS", series )
     series = df['POOL_ASYNC_INDEX_READS']
-    print( "  POOL_ASYNC_INDEX_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_ASYNC_INDEX_READS", series )
     series = df['POOL_XDA_L_READS']
-    print( "  POOL_XDA_L_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_XDA_L_READS", series )
     series = df['POOL_TEMP_XDA_L_READS']
-    print( "  POOL_TEMP_XDA_L_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_TEMP_XDA_L_READS", series )
     series = df['POOL_XDA_P_READS']
-    print( "  POOL_XDA_P_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_XDA_P_READS", series )
     series = df['POOL_TEMP_XDA_P_READS']
-    print( "  POOL_TEMP_XDA_P_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_TEMP_XDA_P_READS", series )
     series = df['POOL_ASYNC_XDA_READS']
-    print( "  POOL_ASYNC_XDA_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_ASYNC_XDA_READS", series )
     series = df['POOL_COL_L_READS']
-    print( "  POOL_COL_L_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_COL_L_READS", series )
     series = df['POOL_TEMP_COL_L_READS']
-    print( "  POOL_TEMP_COL_L_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_TEMP_COL_L_READS", series )
     series = df['POOL_COL_P_READS']
-    print( "  POOL_COL_P_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_COL_P_READS", series )
     series = df['POOL_TEMP_COL_P_READS']
-    print( "  POOL_TEMP_COL_P_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_TEMP_COL_P_READS", series )
     series = df['POOL_ASYNC_COL_READS']
-    print( "  POOL_ASYNC_COL_READS".ljust(label_chars) + series_to_str(series) )
-    print( "Buffer pool pages found" )
+    print_series( "  POOL_ASYNC_COL_READS", series )
+    print_heading( "Buffer pool pages found" )
     series = df['POOL_DATA_LBP_PAGES_FOUND']
-    print( "  POOL_DATA_LBP_PAGES_FOUND".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_DATA_LBP_PAGES_FOUND", series )
     series = df['POOL_ASYNC_DATA_LBP_PAGES_FOUND']
-    print( "  POOL_ASYNC_DATA_LBP_PAGES_FOUND".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_ASYNC_DATA_LBP_PAGES_FOUND", series )
     series = df['POOL_INDEX_LBP_PAGES_FOUND']
-    print( "  POOL_INDEX_LBP_PAGES_FOUND".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_INDEX_LBP_PAGES_FOUND", series )
     series = df['POOL_ASYNC_INDEX_LBP_PAGES_FOUND']
-    print( "  POOL_ASYNC_INDEX_LBP_PAGES_FOUND".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_ASYNC_INDEX_LBP_PAGES_FOUND", series )
     series = df['POOL_XDA_LBP_PAGES_FOUND']
-    print( "  POOL_XDA_LBP_PAGES_FOUND".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_XDA_LBP_PAGES_FOUND", series )
     series = df['POOL_ASYNC_XDA_LBP_PAGES_FOUND']
-    print( "  POOL_ASYNC_XDA_LBP_PAGES_FOUND".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_ASYNC_XDA_LBP_PAGES_FOUND", series )
     series = df['POOL_COL_LBP_PAGES_FOUND']
-    print( "  POOL_COL_LBP_PAGES_FOUND".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_COL_LBP_PAGES_FOUND", series )
     series = df['POOL_ASYNC_COL_LBP_PAGES_FOUND']
-    print( "  POOL_ASYNC_COL_LBP_PAGES_FOUND".ljust(label_chars) + series_to_str(series) )
-    print( "Buffer pool writes" )
+    print_series( "  POOL_ASYNC_COL_LBP_PAGES_FOUND", series )
+    print_heading( "Buffer pool writes" )
     series = df['POOL_DATA_WRITES']
-    print( "  POOL_DATA_WRITES".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_DATA_WRITES", series )
     series = df['POOL_XDA_WRITES']
-    print( "  POOL_XDA_WRITES".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_XDA_WRITES", series )
     series = df['POOL_INDEX_WRITES']
-    print( "  POOL_INDEX_WRITES".ljust(label_chars) + series_to_str(series) )
+    print_series( "  POOL_INDEX_WRITES", series )
     series = df['POOL_COL_WRITES']
-    print( "  POOL_COL_WRITES".ljust(label_chars) + series_to_str(series) )
-    print( "Direct I/O" )
+    print_series( "  POOL_COL_WRITES", series )
+    print_heading( "Direct I/O" )
     series = df['DIRECT_READS']
-    print( "  DIRECT_READS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  DIRECT_READS", series )
     series = df['DIRECT_READ_REQS']
-    print( "  DIRECT_READ_REQS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  DIRECT_READ_REQS", series )
     series = df['DIRECT_WRITES']
-    print( "  DIRECT_WRITES".ljust(label_chars) + series_to_str(series) )
+    print_series( "  DIRECT_WRITES", series )
     series = df['DIRECT_WRITE_REQS']
-    print( "  DIRECT_WRITE_REQS".ljust(label_chars) + series_to_str(series) )
-    print( "Log I/O" )
+    print_series( "  DIRECT_WRITE_REQS", series )
+    print_heading( "Log I/O" )
     series = df['LOG_DISK_WAITS_TOTAL']
-    print( "  LOG_DISK_WAITS_TOTAL".ljust(label_chars) + series_to_str(series) )
+    print_series( "  LOG_DISK_WAITS_TOTAL", series )
     print_seperator(0)
 
-    print( "Locking" )
+    print_heading( "Locking" )
     print_seperator(1)
 
     # print( "                        Per activity                    Total" )
     # print( "                        ------------------------------  ----------------------  " )
     # print( "LOCK_WAIT_TIME          0                               0" )
     series = df['LOCK_WAIT_TIME']
-    print( "LOCK_WAIT_TIME".ljust(label_chars) + series_to_str(series) )
+    print_series( "LOCK_WAIT_TIME", series )
     series = df['LOCK_WAIT_TIME'] / df['ACT_COMPLETED_TOTAL']
-    print( "  Per activity".ljust(label_chars) + series_to_str(series) )
+    print_series( "  Per activity", series )
     # print( "LOCK_WAITS              0                               0" )
     series = df['LOCK_WAITS']
-    print( "LOCK_WAITS".ljust(label_chars) + series_to_str(series) )
+    print_series( "LOCK_WAITS", series )
     series = ( df['LOCK_WAITS'] / df['ACT_COMPLETED_TOTAL'] ) * 100
-    print( "  Per activity".ljust(label_chars) + series_to_str(series) )
+    print_series( "  Per activity", series )
     # print( "LOCK_TIMEOUTS           0                               0" )
     series = df['LOCK_TIMEOUTS']
-    print( "LOCK_TIMEOUTS".ljust(label_chars) + series_to_str(series) )
+    print_series( "LOCK_TIMEOUTS", series )
     series = ( df['LOCK_TIMEOUTS'] / df['ACT_COMPLETED_TOTAL'] ) * 100
-    print( "  Per activity".ljust(label_chars) + series_to_str(series) )
+    print_series( "  Per activity", series )
     # print( "DEADLOCKS               0                               0" )
     series = df['DEADLOCKS']
-    print( "DEADLOCKS".ljust(label_chars) + series_to_str(series) )
+    print_series( "DEADLOCKS", series )
     series = ( df['DEADLOCKS'] / df['ACT_COMPLETED_TOTAL'] ) * 100
-    print( "  Per activity".ljust(label_chars) + series_to_str(series) )
+    print_series( "  Per activity", series )
     # print( "LOCK_ESCALS             0                               0" )
     series = df['LOCK_ESCALS']
-    print( "LOCK_ESCALS".ljust(label_chars) + series_to_str(series) )
+    print_series( "LOCK_ESCALS", series )
     series = ( df['LOCK_ESCALS'] / df['ACT_COMPLETED_TOTAL'] ) * 100
-    print( "  Per activity".ljust(label_chars) + series_to_str(series) )
+    print_series( "  Per activity", series )
     print_seperator(0)
 
-    print( "Routines" )
+    print_heading( "Routines" )
     print_seperator(1)
 
     # print( "                              Per activity              Total" )
     # print( "                              ------------------------  ------------------------" )
     # print( "TOTAL_ROUTINE_INVOCATIONS     0                         0" )
     series = df['TOTAL_ROUTINE_INVOCATIONS']
-    print( "TOTAL_ROUTINE_INVOCATIONS".ljust(label_chars) + series_to_str(series) )
+    print_series( "TOTAL_ROUTINE_INVOCATIONS", series )
     series = df['TOTAL_ROUTINE_INVOCATIONS'] / df['ACT_COMPLETED_TOTAL']
-    print( "  Per activity".ljust(label_chars) + series_to_str(series) )
+    print_series( "  Per activity", series )
     # print( "TOTAL_ROUTINE_TIME            0                         0" )
     series = df['TOTAL_ROUTINE_TIME']
-    print( "TOTAL_ROUTINE_TIME".ljust(label_chars) + series_to_str(series) )
+    print_series( "TOTAL_ROUTINE_TIME", series )
     series = df['TOTAL_ROUTINE_TIME'] / df['ACT_COMPLETED_TOTAL']
-    print( "  Per activity".ljust(label_chars) + series_to_str(series) )
+    print_series( "  Per activity", series )
     print_seperator(0)
 
     series = df['TOTAL_ROUTINE_TIME'] / df['TOTAL_ROUTINE_INVOCATIONS']
-    print( "TOTAL_ROUTINE_TIME per invocation".ljust(label_chars) + series_to_str(series) )
+    print_series( "TOTAL_ROUTINE_TIME per invocation", series )
     print_seperator(0)
 
-    print( "Sort" )
+    print_heading( "Sort" )
     print_seperator(1)
 
     series = df['TOTAL_SORTS']
-    print( "TOTAL_SORTS".ljust(label_chars) + series_to_str(series) )
+    print_series( "TOTAL_SORTS", series )
     series = df['SORT_OVERFLOWS']
-    print( "SORT_OVERFLOWS".ljust(label_chars) + series_to_str(series) )
+    print_series( "SORT_OVERFLOWS", series )
     series = df['POST_THRESHOLD_SORTS']
-    print( "POST_THRESHOLD_SORTS".ljust(label_chars) + series_to_str(series) )
+    print_series( "POST_THRESHOLD_SORTS", series )
     series = df['POST_SHRTHRESHOLD_SORTS']
-    print( "POST_SHRTHRESHOLD_SORTS".ljust(label_chars) + series_to_str(series) )
+    print_series( "POST_SHRTHRESHOLD_SORTS", series )
     print_seperator(0)
 
-    print( "Network" )
+    print_heading( "Network" )
     print_seperator(1)
 
-    print( "Communications with remote clients" )
+    print_heading( "Communications with remote clients" )
     # print( "TCPIP_SEND_VOLUME per send          = 0          (0/0)" )
     series = df['TCPIP_SEND_VOLUME'] / df['TCPIP_SENDS_TOTAL']
-    print( "TCPIP_SEND_VOLUME per send".ljust(label_chars) + series_to_str(series) )
+    print_series( "TCPIP_SEND_VOLUME per send", series )
     series = df['TCPIP_SEND_VOLUME']
-    print( "  TCPIP_SEND_VOLUME".ljust(label_chars) + series_to_str(series) )
+    print_series( "  TCPIP_SEND_VOLUME", series )
     series = df['TCPIP_SENDS_TOTAL']
-    print( "  TCPIP_SENDS_TOTAL".ljust(label_chars) + series_to_str(series) )
+    print_series( "  TCPIP_SENDS_TOTAL", series )
     # print( "TCPIP_RECV_VOLUME per receive       = 0          (0/0)" )
     series = df['TCPIP_RECV_VOLUME'] / df['TCPIP_RECVS_TOTAL']
-    print( "TCPIP_RECV_VOLUME per send".ljust(label_chars) + series_to_str(series) )
+    print_series( "TCPIP_RECV_VOLUME per send", series )
     series = df['TCPIP_RECV_VOLUME']
-    print( "  TCPIP_RECV_VOLUME".ljust(label_chars) + series_to_str(series) )
+    print_series( "  TCPIP_RECV_VOLUME", series )
     series = df['TCPIP_RECVS_TOTAL']
-    print( "  TCPIP_RECVS_TOTAL".ljust(label_chars) + series_to_str(series) )
+    print_series( "  TCPIP_RECVS_TOTAL", series )
     print_seperator(0)
 
-    print( "Communications with local clients" )
+    print_heading( "Communications with local clients" )
     # print( "IPC_SEND_VOLUME per send            = 0          (0/0)" )
     series = df['IPC_SEND_VOLUME'] / df['IPC_SENDS_TOTAL']
-    print( "IPC_SEND_VOLUME per send".ljust(label_chars) + series_to_str(series) )
+    print_series( "IPC_SEND_VOLUME per send", series )
     series = df['IPC_SEND_VOLUME']
-    print( "  IPC_SEND_VOLUME".ljust(label_chars) + series_to_str(series) )
+    print_series( "  IPC_SEND_VOLUME", series )
     series = df['IPC_SENDS_TOTAL']
-    print( "  IPC_SENDS_TOTAL".ljust(label_chars) + series_to_str(series) )
+    print_series( "  IPC_SENDS_TOTAL", series )
     # print( "IPC_RECV_VOLUME per receive         = 0          (0/0)" )
     series = df['IPC_RECV_VOLUME'] / df['IPC_RECVS_TOTAL']
-    print( "IPC_RECV_VOLUME per send".ljust(label_chars) + series_to_str(series) )
+    print_series( "IPC_RECV_VOLUME per send", series )
     series = df['IPC_RECV_VOLUME']
-    print( "  IPC_RECV_VOLUME".ljust(label_chars) + series_to_str(series) )
+    print_series( "  IPC_RECV_VOLUME", series )
     series = df['IPC_RECVS_TOTAL']
-    print( "  IPC_RECVS_TOTAL".ljust(label_chars) + series_to_str(series) )
+    print_series( "  IPC_RECVS_TOTAL", series )
     print_seperator(0)
 
-    print( "Fast communications manager" )
+    print_heading( "Fast communications manager" )
     # print( "FCM_SEND_VOLUME per send            = 0          (0/0)" )
     series = df['FCM_SEND_VOLUME'] / df['FCM_SENDS_TOTAL']
-    print( "FCM_SEND_VOLUME per send".ljust(label_chars) + series_to_str(series) )
+    print_series( "FCM_SEND_VOLUME per send", series )
     series = df['FCM_SEND_VOLUME']
-    print( "  FCM_SEND_VOLUME".ljust(label_chars) + series_to_str(series) )
+    print_series( "  FCM_SEND_VOLUME", series )
     series = df['FCM_SENDS_TOTAL']
-    print( "  FCM_SENDS_TOTAL".ljust(label_chars) + series_to_str(series) )
+    print_series( "  FCM_SENDS_TOTAL", series )
     # print( "FCM_RECV_VOLUME per receive         = 0          (0/0)" )
     series = df['FCM_RECV_VOLUME'] / df['FCM_RECVS_TOTAL']
-    print( "FCM_RECV_VOLUME per send".ljust(label_chars) + series_to_str(series) )
+    print_series( "FCM_RECV_VOLUME per send", series )
     series = df['FCM_RECV_VOLUME']
-    print( "  FCM_RECV_VOLUME".ljust(label_chars) + series_to_str(series) )
+    print_series( "  FCM_RECV_VOLUME", series )
     series = df['FCM_RECVS_TOTAL']
-    print( "  FCM_RECVS_TOTAL".ljust(label_chars) + series_to_str(series) )
+    print_series( "  FCM_RECVS_TOTAL", series )
     print_seperator(0)
 
-    print( "Other" )
+    print_heading( "Other" )
     print_seperator(1)
 
-    print( "Compilation" )
+    print_heading( "Compilation" )
     series = df['TOTAL_COMPILATIONS']
-    print( "  TOTAL_COMPILATIONS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  TOTAL_COMPILATIONS", series )
     series = df['PKG_CACHE_INSERTS']
-    print( "  PKG_CACHE_INSERTS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  PKG_CACHE_INSERTS", series )
     series = df['PKG_CACHE_LOOKUPS']
-    print( "  PKG_CACHE_LOOKUPS".ljust(label_chars) + series_to_str(series) )
-    print( "Catalog cache" )
+    print_series( "  PKG_CACHE_LOOKUPS", series )
+    print_heading( "Catalog cache" )
     series = df['CAT_CACHE_INSERTS']
-    print( "  CAT_CACHE_INSERTS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  CAT_CACHE_INSERTS", series )
     series = df['CAT_CACHE_LOOKUPS']
-    print( "  CAT_CACHE_LOOKUPS".ljust(label_chars) + series_to_str(series) )
-    print( "Transaction processing" )
+    print_series( "  CAT_CACHE_LOOKUPS", series )
+    print_heading( "Transaction processing" )
     series = df['TOTAL_APP_COMMITS']
-    print( "  TOTAL_APP_COMMITS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  TOTAL_APP_COMMITS", series )
     series = df['INT_COMMITS']
-    print( "  INT_COMMITS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  INT_COMMITS", series )
     series = df['TOTAL_APP_ROLLBACKS']
-    print( "  TOTAL_APP_ROLLBACKS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  TOTAL_APP_ROLLBACKS", series )
     series = df['INT_ROLLBACKS']
-    print( "  INT_ROLLBACKS".ljust(label_chars) + series_to_str(series) )
-    print( "Log buffer" )
+    print_series( "  INT_ROLLBACKS", series )
+    print_heading( "Log buffer" )
     series = df['NUM_LOG_BUFFER_FULL']
-    print( "  NUM_LOG_BUFFER_FULL".ljust(label_chars) + series_to_str(series) )
-    print( "Activities aborted/rejected" )
+    print_series( "  NUM_LOG_BUFFER_FULL", series )
+    print_heading( "Activities aborted/rejected" )
     series = df['ACT_ABORTED_TOTAL']
-    print( "  ACT_ABORTED_TOTAL".ljust(label_chars) + series_to_str(series) )
+    print_series( "  ACT_ABORTED_TOTAL", series )
     series = df['ACT_REJECTED_TOTAL']
-    print( "  ACT_REJECTED_TOTAL".ljust(label_chars) + series_to_str(series) )
-    print( "Workload management controls" )
+    print_series( "  ACT_REJECTED_TOTAL", series )
+    print_heading( "Workload management controls" )
     series = df['WLM_QUEUE_ASSIGNMENTS_TOTAL']
-    print( "  WLM_QUEUE_ASSIGNMENTS_TOTAL".ljust(label_chars) + series_to_str(series) )
+    print_series( "  WLM_QUEUE_ASSIGNMENTS_TOTAL", series )
     series = df['WLM_QUEUE_TIME_TOTAL']
-    print( "  WLM_QUEUE_TIME_TOTAL".ljust(label_chars) + series_to_str(series) )
+    print_series( "  WLM_QUEUE_TIME_TOTAL", series )
     print_seperator(0)
 
-    print( "DB2 utility operations" )
+    print_heading( "DB2 utility operations" )
     print_seperator(1)
 
     series = df['TOTAL_RUNSTATS']
-    print( "  TOTAL_RUNSTATS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  TOTAL_RUNSTATS", series )
     series = df['TOTAL_REORGS']
-    print( "  TOTAL_REORGS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  TOTAL_REORGS", series )
     series = df['TOTAL_LOADS']
-    print( "  TOTAL_LOADS".ljust(label_chars) + series_to_str(series) )
+    print_series( "  TOTAL_LOADS", series )
     print_seperator(0)
 
 # function to output monreport.dbsummary
@@ -852,15 +1264,8 @@ def monreport_dbsummary(start_time=pd.Timestamp.min, end_time=pd.Timestamp.max,
     #                   1
     # 10:20             0
     #                   1
-    df = collection_to_df('MON_GET_DATABASE')
-
-    # filter on members
-    if members:
-        df = df.loc[ df['MEMBER'].isin(members) ]
-
-    # transform collection time column to datetime and filter on collection times
-    df['COLLECTION_TIME'] = pd.to_datetime ( df['COLLECTION_TIME'], format=collection_time_format ).dt.floor('S')
-    df = df.loc[ ( df['COLLECTION_TIME'] >= start_time ) & ( df['COLLECTION_TIME'] <= end_time ) ]
+    # filtered on members and collection times
+    df = collection_to_df('MON_GET_DATABASE', start_time, end_time, members)
     collection_times = df.groupby('COLLECTION_TIME').count().index
 
     # if no collections found
@@ -896,7 +1301,8 @@ def monreport_dbsummary(start_time=pd.Timestamp.min, end_time=pd.Timestamp.max,
     print_seperator(2)
 
 # function to output monreport.connection
-def monreport_connection(start_time=pd.Timestamp.min, end_time=pd.Timestamp.max, period=1, members=None, application_handles=None):
+def monreport_connection(start_time=pd.Timestamp.min, end_time=pd.Timestamp.max, period=1, members=None, application_handles=None,
+                         top_connections=None, rank_by=None, page=None, page_size=10, summary_only=False):
 
     # get dataframe
     # collection_time | application_handle | member | ...
@@ -908,7 +1314,8 @@ def monreport_connection(start_time=pd.Timestamp.min, end_time=pd.Timestamp.max,
     #                                        2
     #                   200                  1
     #                                        2
-    df = collection_to_df('MON_GET_CONNECTION')
+    # filtered on members, application handles and collection times
+    df = collection_to_df('MON_GET_CONNECTION', start_time, end_time, members, application_handles)
     df['POOL_ASYNC_DATA_LBP_PAGES_FOUND'] = 0
     df['POOL_ASYNC_INDEX_LBP_PAGES_FOUND'] = 0
     df['POOL_ASYNC_XDA_LBP_PAGES_FOUND'] = 0
@@ -917,18 +1324,6 @@ def monreport_connection(start_time=pd.Timestamp.min, end_time=pd.Timestamp.max,
     df['POOL_ASYNC_INDEX_READS'] = 0
     df['POOL_ASYNC_XDA_READS'] = 0
     df['POOL_ASYNC_COL_READS'] = 0
-
-    # filter on members
-    if members:
-        df = df.loc[ df['MEMBER'].isin(members) ]
-
-    # filter on application handles
-    if application_handles:
-        df = df.loc[ df['APPLICATION_HANDLE'].isin(application_handles) ]
-
-    # transform collection time column to datetime and filter on collection times
-    df['COLLECTION_TIME'] = pd.to_datetime ( df['COLLECTION_TIME'], format=collection_time_format ).dt.floor('S')
-    df = df.loc[ ( df['COLLECTION_TIME'] >= start_time ) & ( df['COLLECTION_TIME'] <= end_time ) ]
     collection_times = df.groupby('COLLECTION_TIME').count().index
 
     # if no collections found
@@ -937,35 +1332,63 @@ def monreport_connection(start_time=pd.Timestamp.min, end_time=pd.Timestamp.max,
         print( "  Try increasing scope by adjusting start_time, end_time, and period.")
         return
 
-    # split df into multiple dfs based on connection
-    dfs_by_conn = {}
-    for conn, df in df.groupby(['APPLICATION_HANDLE', 'APPLICATION_NAME', 'APPLICATION_ID']):
+    # group df on connection and collection time and sum across all members
+    # connection columns are grouped on copies so they are also summed like other columns
+    conn_cols = ['APPLICATION_HANDLE', 'APPLICATION_NAME', 'APPLICATION_ID']
+    df = df.groupby([df[col].rename('CONN_' + col) for col in conn_cols] + ['COLLECTION_TIME']).sum(numeric_only=True)
 
-        # group df on collection time and sum across all members
-        df = df.groupby('COLLECTION_TIME').sum()
+    # position of each connection's collections in a connections x collection times grid
+    conn_codes, conns = pd.factorize(df.index.droplevel('COLLECTION_TIME'))
+    time_codes = collection_times.get_indexer(df.index.get_level_values('COLLECTION_TIME'))
+    grid = np.full((len(conns), len(collection_times)), -1)
+    grid[conn_codes, time_codes] = np.arange(len(df))
 
-        # fill in missing collections by reindexing
-        # all leading values will equal 0
-        # all trailing values will equal the values from the last collection
-        df = df.reindex(collection_times, fill_value=0, method='ffill').reset_index()
+    # fill in missing collections by forward filling positions across collection times
+    # all leading values will equal 0
+    # all trailing values will equal the values from the last collection
+    grid = np.maximum.accumulate(grid, axis=1)
+    df = df.reset_index(drop=True).reindex(grid.ravel(), fill_value=0)
+    df.insert(0, 'COLLECTION_TIME', np.tile(collection_times, len(conns)))
 
-        # diff across collection times
-        # the first value will be diffed from 0 so it will equal itself
-        # the last value will be diffed even though it doesn't make it to end of the interval
-        df = df.diff(periods=period)[period::period]
+    # diff across collection times
+    # rows are diffed across all connections at once, then only rows diffed within a connection are kept
+    # the last value will be diffed even though it doesn't make it to end of the interval
+    df = df.diff(periods=period)
+    df.index = np.tile(np.arange(len(collection_times)), len(conns))
+    conn_rows = np.arange(len(collection_times))[period::period]
+    df = df[np.isin(df.index, conn_rows)]
 
-        # create column for collection time diff in seconds
-        df = df.assign(SECONDS_ELAPSED=df['COLLECTION_TIME'].dt.total_seconds())
+    # create column for collection time diff in seconds
+    df = df.assign(SECONDS_ELAPSED=df['COLLECTION_TIME'].dt.total_seconds())
 
-        dfs_by_conn[conn] = df
+    # order connections by the sum of the rank by metric across collection times, highest first
+    conn_order = np.arange(len(conns))
+    if rank_by or top_connections:
+        rank_by = rank_by or 'TOTAL_CPU_TIME'
+        assert rank_by in df.columns, "Metric %s can not be used to rank connections." % rank_by
+        conn_totals = np.nansum(df[rank_by].to_numpy().reshape(len(conns), len(conn_rows)), axis=1)
+        conn_order = np.argsort(-conn_totals, kind='stable')
+
+    # keep only the top connections, and the connections on the requested page
+    if top_connections:
+        conn_order = conn_order[:top_connections]
+    if page:
+        conn_order = conn_order[(page-1)*page_size : page*page_size]
+
+    # split df into multiple dfs based on connection, only for connections that will be printed
+    dfs_by_conn = {}
+    for i in conn_order:
+        dfs_by_conn[conns[i]] = df.iloc[i*len(conn_rows) : (i+1)*len(conn_rows)]
 
-    # warn if too many connections when printing to terminal
-    print_details = True
-    if len(dfs_by_conn) > 3 and os.fstat(0) == os.fstat(1):
+    # warn if too many connections when printing to terminal, unless output was already limited
+    print_details = not summary_only
+    limited = top_connections or rank_by or page or summary_only
+    if len(dfs_by_conn) > 3 and os.fstat(0) == os.fstat(1) and not limited and output_format == 'text':
         print( "  There are %s connections." % len(dfs_by_conn))
         print( "  Details will be printed for each connection individually")
         print( "  resulting in a very large output.")
-        print( "  You can shorten this by passing in specific application handles.")
+        print( "  You can shorten this by passing in specific application handles,")
+        print( "  or with the top_connections, page and summary_only options.")
         print_seperator(0)
 
         value = input("    Enter 1 to print summary of connections only or 2 to print everything: ")
@@ -984,12 +1407,14 @@ def monreport_connection(start_time=pd.Timestamp.min, end_time=pd.Timestamp.max,
     # print header
     print_header("MONREPORT.CONNECTION", collection_times, period, diff=True, outliers=True)
 
-    global label_chars
+    global label_chars, output_fields
 
     print_seperator(2)
 
     # print summary of connections
-    print( "Summary of connections" )
+    print_heading( "Summary of connections" )
+    if len(dfs_by_conn) < len(conns):
+        print_text( "  Showing %s of %s connections%s" % (len(dfs_by_conn), len(conns), ", ranked by " + rank_by if rank_by else "") )
     print_seperator(1)
 
     for conn, df in dfs_by_conn.items():
@@ -997,33 +1422,34 @@ def monreport_connection(start_time=pd.Timestamp.min, end_time=pd.Timestamp.max,
         print_seperator(0)
 
         # print connection details
-        print( "Connection details: Handle = %s, Name = %s, ID = %s" % (conn) )
+        output_fields.update( zip(['application_handle', 'application_name', 'application_id'], conn) )
+        print_text( "Connection details: Handle = %s, Name = %s, ID = %s" % (conn) )
         print_seperator(0)
 
         # if no collections found
         if len(df) == 0:
-            print( "  No collection data available for collection times.")
-            print( "  Try increasing scope by adjusting start_time, end_time, and period.")
+            print_text( "  No collection data available for collection times.")
+            print_text( "  Try increasing scope by adjusting start_time, end_time, and period.")
             continue
 
         # print connection summary
         series = df['TOTAL_CPU_TIME']
-        print( "  TOTAL_CPU_TIME".ljust(label_chars) + series_to_str(series) )
+        print_series( "  TOTAL_CPU_TIME", series )
         series = df['TOTAL_ACT_TIME']
-        print( "  TOTAL_ACT_TIME".ljust(label_chars) + series_to_str(series) )
+        print_series( "  TOTAL_ACT_TIME", series )
         series = df['ACT_COMPLETED_TOTAL']
-        print( "  ACT_COMPLETED_TOTAL".ljust(label_chars) + series_to_str(series) )
+        print_series( "  ACT_COMPLETED_TOTAL", series )
         series = df['TOTAL_WAIT_TIME']
-        print( "  TOTAL_WAIT_TIME".ljust(label_chars) + series_to_str(series) )
+        print_series( "  TOTAL_WAIT_TIME", series )
         series = df['CLIENT_IDLE_WAIT_TIME']
-        print( "  CLIENT_IDLE_WAIT_TIME".ljust(label_chars) + series_to_str(series) )
+        print_series( "  CLIENT_IDLE_WAIT_TIME", series )
 
     print_seperator(2)
 
     if print_details:
 
         # print details for each connection
-        print( "Details for each connection" )
+        print_heading( "Details for each connection" )
         print_seperator(1)
 
         # print common req metrics for connections
@@ -1032,13 +1458,14 @@ def monreport_connection(start_time=pd.Timestamp.min, end_time=pd.Timestamp.max,
             print_seperator(0)
 
             # print connection details
-            print( "Connection details: Handle = %s, Name = %s, ID = %s" % (conn) )
+            output_fields.update( zip(['application_handle', 'application_name', 'application_id'], conn) )
+            print_text( "Connection details: Handle = %s, Name = %s, ID = %s" % (conn) )
             print_seperator(1)
 
             # if no collections found
             if len(df) == 0:
-                print( "  No collection data available for collection times.")
-                print( "  Try increasing scope by adjusting start_time, end_time, and period.")
+                print_text( "  No collection data available for collection times.")
+                print_text( "  Try increasing scope by adjusting start_time, end_time, and period.")
                 continue
 
             # print connection common req metrics
@@ -1046,6 +1473,10 @@ def monreport_connection(start_time=pd.Timestamp.min, end_time=pd.Timestamp.max,
 
         print_seperator(2)
 
+# columns of MON_GET_PKG_CACHE_STMT used by monreport.pkgcache
+pkgcache_columns = ['EXECUTABLE_ID', 'STMT_TEXT', 'NUM_EXECUTIONS', 'TOTAL_CPU_TIME', 'TOTAL_ACT_WAIT_TIME', 'LOCK_WAIT_TIME',
+                    'ROWS_READ', 'ROWS_MODIFIED', 'POOL_READ_TIME', 'POOL_WRITE_TIME', 'DIRECT_READ_TIME', 'DIRECT_WRITE_TIME']
+
 # function to output monreport.pkgcache
 def monreport_pkgcache(start_time=pd.Timestamp.min, end_time=pd.Timestamp.max, members=None):
 
@@ -1059,19 +1490,13 @@ def monreport_pkgcache(start_time=pd.Timestamp.min, end_time=pd.Timestamp.max, m
     #                   1
     # 10:20             0
     #                   1
-    df = collection_to_df('MON_GET_PKG_CACHE_STMT')
+    # filtered on members and collection times
+    # only the columns ranked and shown by the report are loaded
+    df = collection_to_df('MON_GET_PKG_CACHE_STMT', start_time, end_time, members, columns=pkgcache_columns)
 
     # store a mapping of executable ids and stmt text lob ids in a seperate df
     stmt_text_df = df[['EXECUTABLE_ID', 'STMT_TEXT']]
     stmt_text_df = stmt_text_df.groupby('EXECUTABLE_ID').max()
-
-    # filter on members
-    if members:
-        df = df.loc[ df['MEMBER'].isin(members) ]
-
-    # transform collection time column to datetime and filter on collection times
-    df['COLLECTION_TIME'] = pd.to_datetime ( df['COLLECTION_TIME'], format=collection_time_format ).dt.floor('S')
-    df = df.loc[ ( df['COLLECTION_TIME'] >= start_time ) & ( df['COLLECTION_TIME'] <= end_time ) ]
     collection_times = df.groupby('COLLECTION_TIME').count().index
 
     # if no collections found
@@ -1102,98 +1527,80 @@ def monreport_pkgcache(start_time=pd.Timestamp.min, end_time=pd.Timestamp.max, m
     # print Top 10 statements by TOTAL_CPU_TIME
     temp_df = df.sort_values("TOTAL_CPU_TIME", ascending=False)[:10]
     temp_df["STMT_TEXT"] = temp_df["STMT_TEXT"].apply(get_lob)
-    print("Top 10 statements by TOTAL_CPU_TIME")
-    print_seperator(1)
-    print(temp_df.to_string(columns=["TOTAL_CPU_TIME", "COLLECTION_TIME", "STMT_TEXT"],
+    print_table("Top 10 statements by TOTAL_CPU_TIME", temp_df,
+        columns=["TOTAL_CPU_TIME", "COLLECTION_TIME", "STMT_TEXT"],
         header=["TOTAL_CPU_TIME", "PEAK TIME", "STMT_TEXT"],
-        index=False, justify="left", col_space=20, max_colwidth=stmt_text_len))
-    print_seperator(0)
+        max_colwidth=stmt_text_len)
 
     # print Top 10 statements by TOTAL_CPU TIME per exec
     df["TOTAL_CPU_TIME_PER_EXEC"] = df["TOTAL_CPU_TIME"] / df["NUM_EXECUTIONS"]
     temp_df = df.sort_values("TOTAL_CPU_TIME_PER_EXEC", ascending=False)[:10]
     temp_df["STMT_TEXT"] = temp_df["STMT_TEXT"].apply(get_lob)
-    print("Top 10 statements by TOTAL_CPU TIME per exec")
-    print_seperator(1)
-    print(temp_df.to_string(columns=["TOTAL_CPU_TIME_PER_EXEC", "COLLECTION_TIME", "STMT_TEXT"],
+    print_table("Top 10 statements by TOTAL_CPU TIME per exec", temp_df,
+        columns=["TOTAL_CPU_TIME_PER_EXEC", "COLLECTION_TIME", "STMT_TEXT"],
         header=["TOTAL_CPU_TIME", "PEAK TIME", "STMT_TEXT"],
-        index=False, justify="left", col_space=20, max_colwidth=stmt_text_len))
-    print_seperator(0)
+        max_colwidth=stmt_text_len)
 
     # print Top 10 statements by TOTAL_ACT_WAIT_TIME
     temp_df = df.sort_values("TOTAL_ACT_WAIT_TIME", ascending=False)[:10]
     temp_df["STMT_TEXT"] = temp_df["STMT_TEXT"].apply(get_lob)
-    print("Top 10 statements by TOTAL_ACT_WAIT_TIME")
-    print_seperator(1)
-    print(temp_df.to_string(columns=["TOTAL_ACT_WAIT_TIME", "LOCK_WAIT_TIME", "COLLECTION_TIME", "STMT_TEXT"],
+    print_table("Top 10 statements by TOTAL_ACT_WAIT_TIME", temp_df,
+        columns=["TOTAL_ACT_WAIT_TIME", "LOCK_WAIT_TIME", "COLLECTION_TIME", "STMT_TEXT"],
         header=["TOTAL_ACT_WAIT_TIME", "LOCK_WAIT_TIME", "PEAK TIME", "STMT_TEXT"],
-        index=False, justify="left", col_space=20, max_colwidth=stmt_text_len))
-    print_seperator(0)
+        max_colwidth=stmt_text_len)
 
     # print Top 10 statements by TOTAL_ACT_WAIT_TIME per exec
     df["TOTAL_ACT_WAIT_TIME_PER_EXEC"] = df["TOTAL_ACT_WAIT_TIME"] / df["NUM_EXECUTIONS"]
     temp_df = df.sort_values("TOTAL_ACT_WAIT_TIME_PER_EXEC", ascending=False)[:10]
     temp_df["STMT_TEXT"] = temp_df["STMT_TEXT"].apply(get_lob)
-    print("Top 10 statements by TOTAL_ACT_WAIT_TIME per exec")
-    print_seperator(1)
-    print(temp_df.to_string(columns=["TOTAL_ACT_WAIT_TIME_PER_EXEC", "LOCK_WAIT_TIME", "COLLECTION_TIME", "STMT_TEXT"],
+    print_table("Top 10 statements by TOTAL_ACT_WAIT_TIME per exec", temp_df,
+        columns=["TOTAL_ACT_WAIT_TIME_PER_EXEC", "LOCK_WAIT_TIME", "COLLECTION_TIME", "STMT_TEXT"],
         header=["TOTAL_ACT_WAIT_TIME", "LOCK_WAIT_TIME", "PEAK TIME", "STMT_TEXT"],
-        index=False, justify="left", col_space=20, max_colwidth=stmt_text_len))
-    print_seperator(0)
+        max_colwidth=stmt_text_len)
 
     # print Top 10 statements by ROWS_READ + ROWS_MODIFIED
     df["ROWS_READ_PLUS_ROWS_MODIFIED"] = df["ROWS_READ"] + df["ROWS_MODIFIED"]
     temp_df = df.sort_values("ROWS_READ_PLUS_ROWS_MODIFIED", ascending=False)[:10]
     temp_df["STMT_TEXT"] = temp_df["STMT_TEXT"].apply(get_lob)
-    print("Top 10 statements by ROWS_READ + ROWS_MODIFIED")
-    print_seperator(1)
-    print(temp_df.to_string(columns=["ROWS_READ_PLUS_ROWS_MODIFIED", "COLLECTION_TIME", "STMT_TEXT"],
+    print_table("Top 10 statements by ROWS_READ + ROWS_MODIFIED", temp_df,
+        columns=["ROWS_READ_PLUS_ROWS_MODIFIED", "COLLECTION_TIME", "STMT_TEXT"],
         header=["ROWS_READ+ROWS_MODIFIED", "PEAK TIME", "STMT_TEXT"],
-        index=False, justify="left", col_space=20, max_colwidth=stmt_text_len))
-    print_seperator(0)
+        max_colwidth=stmt_text_len)
 
     # print Top 10 statements by ROWS_READ + ROWS_MODIFIED per exec
     df["ROWS_READ_PLUS_ROWS_MODIFIED_PER_EXEC"] = df["ROWS_READ_PLUS_ROWS_MODIFIED"] / df["NUM_EXECUTIONS"]
     temp_df = df.sort_values("ROWS_READ_PLUS_ROWS_MODIFIED_PER_EXEC", ascending=False)[:10]
     temp_df["STMT_TEXT"] = temp_df["STMT_TEXT"].apply(get_lob)
-    print("Top 10 statements by ROWS_READ + ROWS_MODIFIED per exec")
-    print_seperator(1)
-    print(temp_df.to_string(columns=["ROWS_READ_PLUS_ROWS_MODIFIED_PER_EXEC", "COLLECTION_TIME", "STMT_TEXT"],
+    print_table("Top 10 statements by ROWS_READ + ROWS_MODIFIED per exec", temp_df,
+        columns=["ROWS_READ_PLUS_ROWS_MODIFIED_PER_EXEC", "COLLECTION_TIME", "STMT_TEXT"],
         header=["ROWS_READ+ROWS_MODIFIED", "PEAK TIME", "STMT_TEXT"],
-        index=False, justify="left", col_space=20, max_colwidth=stmt_text_len))
-    print_seperator(0)
+        max_colwidth=stmt_text_len)
 
     # print Top 10 statements by number of executions
     temp_df = df.sort_values("NUM_EXECUTIONS", ascending=False)[:10]
     temp_df["STMT_TEXT"] = temp_df["STMT_TEXT"].apply(get_lob)
-    print("Top 10 statements by number of executions")
-    print_seperator(1)
-    print(temp_df.to_string(columns=["NUM_EXECUTIONS", "COLLECTION_TIME", "STMT_TEXT"],
+    print_table("Top 10 statements by number of executions", temp_df,
+        columns=["NUM_EXECUTIONS", "COLLECTION_TIME", "STMT_TEXT"],
         header=["Executions", "PEAK TIME", "STMT_TEXT"],
-        index=False, justify="left", col_space=20, max_colwidth=stmt_text_len))
-    print_seperator(0)
+        max_colwidth=stmt_text_len)
 
     # print Top 10 statements by I/O wait time
     df["IO_WAIT_TIME"] = df["POOL_READ_TIME"] + df["POOL_WRITE_TIME"] + df["DIRECT_READ_TIME"] + df["DIRECT_WRITE_TIME"]
     temp_df = df.sort_values("IO_WAIT_TIME", ascending=False)[:10]
     temp_df["STMT_TEXT"] = temp_df["STMT_TEXT"].apply(get_lob)
-    print("Top 10 statements by I/O wait time")
-    print_seperator(1)
-    print(temp_df.to_string(columns=["IO_WAIT_TIME", "COLLECTION_TIME", "STMT_TEXT"],
+    print_table("Top 10 statements by I/O wait time", temp_df,
+        columns=["IO_WAIT_TIME", "COLLECTION_TIME", "STMT_TEXT"],
         header=["I/O wait time", "PEAK TIME", "STMT_TEXT"],
-        index=False, justify="left", col_space=20, max_colwidth=stmt_text_len))
-    print_seperator(0)
+        max_colwidth=stmt_text_len)
 
     # print Top 10 statements by I/O wait time per exec
     df["IO_WAIT_TIME_PER_EXEC"] = df["IO_WAIT_TIME"] / df["NUM_EXECUTIONS"]
     temp_df = df.sort_values("IO_WAIT_TIME_PER_EXEC", ascending=False)[:10]
     temp_df["STMT_TEXT"] = temp_df["STMT_TEXT"].apply(get_lob)
-    print("Top 10 statements by I/O wait time per exec")
-    print_seperator(1)
-    print(temp_df.to_string(columns=["IO_WAIT_TIME_PER_EXEC", "COLLECTION_TIME", "STMT_TEXT"],
+    print_table("Top 10 statements by I/O wait time per exec", temp_df,
+        columns=["IO_WAIT_TIME_PER_EXEC", "COLLECTION_TIME", "STMT_TEXT"],
         header=["I/O wait time", "PEAK TIME", "STMT_TEXT"],
-        index=False, justify="left", col_space=20, max_colwidth=stmt_text_len))
-    print_seperator(0)
+        max_colwidth=stmt_text_len)
 
     print_seperator(2)
 
@@ -1217,15 +1624,62 @@ def main():
                         help='filter certain reports by member')
     parser.add_argument('-ah', '--application_handles', type=int, nargs='+',
                         help='filter certain reports by application handle')
+    parser.add_argument('-tc', '--top_connections', type=int,
+                        help='connection report only shows this many connections, ranked by rank_by')
+    parser.add_argument('-rb', '--rank_by',
+                        help='metric to rank connections by in the connection report, summed across collections, for example TOTAL_CPU_TIME')
+    parser.add_argument('-pg', '--page', type=int,
+                        help='connection report only shows this page of connections, pages have page_size connections')
+    parser.add_argument('-ps', '--page_size', default=10, type=int,
+                        help='number of connections on each page of the connection report')
+    parser.add_argument('-so', '--summary_only', action='store_true',
+                        help='connection report only shows the summary of connections, without details for each connection')
+    parser.add_argument('-f', '--format', default='text', choices=['text', 'json', 'csv', 'parquet'],
+                        help='output format, json, csv and parquet output a record for each value of each metric instead of the text report')
+    parser.add_argument('-o', '--output',
+                        help='file to write json, csv or parquet output to, json and csv are written to stdout by default')
+    parser.add_argument('-ap', '--archive_path',
+                        help='directory of archived hourly directories, which are read without extracting them, default is path with an _archive suffix')
+    parser.add_argument('-ip', '--index_path',
+                        help='directory of indexes built by common/histindex.py, used to only read the records of filtered members and application handles, default is path with an _index suffix')
+    parser.add_argument('-cp', '--cache_path',
+                        help='directory to cache parsed collection files and archive indexes in, repeat reports only parse new or changed files')
+    parser.add_argument('-j', '--jobs', default=1, type=int,
+                        help='number of processes to parse collection files with, 0 uses all cores')
+    parser.add_argument('-mm', '--max_memory', type=int,
+                        help='limit in megabytes of filtered collection data held in memory, the report stops if it is exceeded')
 
     args = parser.parse_args()
 
+    # resolve cache and output paths before changing directory
+    global cache_path, archive_path, index_path
+    if args.cache_path:
+        histfiles.index_cache_path = os.path.abspath( args.cache_path )
+        if pyarrow:
+            cache_path = histfiles.index_cache_path
+        else:
+            print("The pyarrow package is required to cache parsed collection files, they are parsed on every report.", file=sys.stderr)
+    if args.archive_path:
+        archive_path = os.path.abspath( args.archive_path )
+    index_path = os.path.abspath( args.index_path or histindex.default_index_path(args.path) )
+
+    global output_format, output_path
+    output_format = args.format
+    if args.output:
+        output_path = os.path.abspath( args.output )
+
     # change directory to path
     os.chdir( args.path )
 
     global stats
     stats = args.stats
 
+    global max_memory
+    max_memory = args.max_memory
+
+    global jobs
+    jobs = args.jobs
+
     # convert start and end times to datetime
     global collection_time_format
     try: # if time format like "YYYY-mm-dd HH:MM"
@@ -1239,12 +1693,16 @@ def main():
     if args.report == 'dbsummary':
         monreport_dbsummary(args.start_time, args.end_time, args.period, args.members)
     elif args.report == 'connection':
-        monreport_connection(args.start_time, args.end_time, args.period, args.members, args.application_handles)
+        monreport_connection(args.start_time, args.end_time, args.period, args.members, args.application_handles,
+                             args.top_connections, args.rank_by, args.page, args.page_size, args.summary_only)
     elif args.report == 'pkgcache':
         monreport_pkgcache(args.start_time, args.end_time, args.members)
     else:
         print("Incorrect report, run with -h for help")
         exit()
 
+    # write records if not outputting text
+    write_output()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
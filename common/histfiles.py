@@ -0,0 +1,255 @@
+import io
+import os
+import re
+import bz2
+import glob
+import gzip
+import json
+import lzma
+import fnmatch
+import tarfile
+import zipfile
+from collections import OrderedDict
+
+# zstandard is optional, only needed to read files compressed by zstd
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# extensions of archived hourly directories, as created by ARCH_CMD and named by ARCH_EXT
+archive_exts = ('.tar.gz', '.tgz', '.tar.bz2', '.tar.xz', '.tar', '.zip')
+
+# extensions of compressed collection files, as created by COMP_CMD and named by COMP_EXT
+compress_exts = ('.gz', '.bz2', '.xz', '.zst')
+
+# archived files are addressed as archive path / name of file in hourly directory
+# for example IBMHIST_SAMPLE_archive/SAMPLE_2020081213.tar.gz/lob/MON_GET_PKG_CACHE_STMT_202008121340.lob
+archive_path_re = re.compile( '(' + '|'.join( re.escape(ext) for ext in archive_exts ) + r')[/\\]' )
+
+# directory to cache archive indexes in, disabled if None
+index_cache_path = None
+
+# archive indexes by archive path
+# each index maps file names in the hourly directory to [ offset, size, name in archive ]
+archive_indexes = dict()
+
+# open archives by archive path, least recently used first
+open_archives = OrderedDict()
+max_open_archives = 4
+
+# function to get archive extension of path, empty if path is not an archive
+def archive_ext(path):
+
+    for ext in archive_exts:
+        if path.endswith(ext):
+            return ext
+    return ''
+
+# function to get compression extension of collection file, empty if file is not compressed
+def compress_ext(path):
+
+    if archive_ext(path):
+        return ''
+    for ext in compress_exts:
+        if path.endswith(ext):
+            return ext
+    return ''
+
+# function to get name of hourly directory or archived hourly directory
+def hour_name(path):
+
+    name = os.path.basename( path.rstrip('/\\') )
+    ext = archive_ext(name)
+    return name[:-len(ext)] if ext else name
+
+# function to split path of archived file into archive path and file name
+# archive path is None if file is not archived
+def split_archive_path(path):
+
+    match = archive_path_re.search(path)
+    if not match or not os.path.isfile( path[:match.end()-1] ):
+        return None, path
+    return path[:match.end()-1], path[match.end():].replace('\\', '/')
+
+# function to find hourly directories and archived hourly directories with names matching pattern
+# archives are searched for in archive path, by default the base path with an _archive suffix
+# archives are skipped if their hourly directory has not been removed yet
+def hour_dirs(base_path='', pattern='*', archive_path=None):
+
+    dirs = glob.glob( os.path.join(base_path, pattern) )
+    names = set( hour_name(d) for d in dirs )
+
+    if archive_path is None:
+        archive_path = os.path.abspath(base_path or '.') + '_archive'
+
+    if os.path.isdir(archive_path):
+        for path in sorted( glob.glob( os.path.join(archive_path, '*') ) ):
+            name = hour_name(path)
+            if archive_ext(path) and fnmatch.fnmatch(name, pattern) and name not in names and os.path.isfile(path):
+                dirs.append(path)
+
+    return dirs
+
+# function to find files in hourly directory or archived hourly directory
+# pattern is matched against paths relative to hourly directory, for example lob/*
+def list_files(hour_dir, pattern):
+
+    if os.path.isdir(hour_dir) or not archive_ext(hour_dir):
+        return glob.glob( os.path.join(hour_dir, pattern) )
+
+    return [ hour_dir + '/' + name for name in archive_index(hour_dir) if fnmatch.fnmatchcase(name, pattern) ]
+
+# function to find collection files in hourly directory or archived hourly directory, compressed or not
+# pattern is matched against names of uncompressed files, for example MON_GET_DATABASE_*.del
+def list_data_files(hour_dir, pattern):
+
+    files = []
+    for ext in ('',) + compress_exts:
+        files += list_files(hour_dir, pattern + ext)
+    return files
+
+# function to get name of file in hourly directory from name in archive
+# archives contain the full path of the hourly directory, which is removed
+def member_name(name, hour):
+
+    parts = [ part for part in name.replace('\\', '/').split('/') if part ]
+    if hour in parts:
+        parts = parts[ len(parts) - parts[::-1].index(hour) : ]
+    return '/'.join(parts)
+
+# function to get index of archive
+# archives are read once to build the index, which is cached if index cache path is set
+# cached indexes are keyed by archive size and modification time
+def archive_index(archive):
+
+    global index_cache_path, archive_indexes
+
+    if archive in archive_indexes:
+        return archive_indexes[archive]
+
+    archive_stat = os.stat(archive)
+    key = [ archive_stat.st_size, archive_stat.st_mtime_ns ]
+
+    # read index from cache if archive has not changed
+    cache_file = None
+    if index_cache_path:
+        cache_file = os.path.join( index_cache_path, os.path.splitdrive( os.path.abspath(archive) )[1].lstrip('/\\') + '.index.json' )
+        try:
+            with open(cache_file) as f:
+                cached = json.load(f)
+            if cached['key'] == key:
+                archive_indexes[archive] = cached['index']
+                return cached['index']
+        except Exception:
+            pass
+
+    # build index from archive members
+    hour, index = hour_name(archive), dict()
+    if archive.endswith('.zip'):
+        with zipfile.ZipFile(archive) as z:
+            for info in z.infolist():
+                if not info.is_dir():
+                    index[ member_name(info.filename, hour) ] = [ info.header_offset, info.file_size, info.filename ]
+    else:
+        with tarfile.open(archive, 'r:*') as tar:
+            for info in tar:
+                if info.isreg():
+                    index[ member_name(info.name, hour) ] = [ info.offset_data, info.size, info.name ]
+
+    # write index to cache, through a temp file so concurrent readers never read a partial index
+    if cache_file:
+        os.makedirs( os.path.dirname(cache_file), exist_ok=True )
+        tmp_file = cache_file + '.' + str(os.getpid()) + '.tmp'
+        with open(tmp_file, 'w') as f:
+            json.dump( { 'key': key, 'index': index }, f )
+        os.replace(tmp_file, cache_file)
+
+    archive_indexes[archive] = index
+    return index
+
+# function to get open archive
+# archives are kept open for reuse, closing the least recently used if there are too many
+def open_archive(archive):
+
+    global open_archives, max_open_archives
+
+    if archive in open_archives:
+        open_archives.move_to_end(archive)
+        return open_archives[archive]
+
+    handle = zipfile.ZipFile(archive) if archive.endswith('.zip') else tarfile.open(archive, 'r:*')
+
+    open_archives[archive] = handle
+    if len(open_archives) > max_open_archives:
+        _, old_handle = open_archives.popitem(last=False)
+        old_handle.close()
+
+    return handle
+
+# function to open compressed file or file object for streaming decompression
+# files may hold several compressed streams, which are read as one
+def decompress_file(f, ext):
+
+    if ext == '.gz':
+        return gzip.open(f)
+    if ext == '.bz2':
+        return bz2.open(f)
+    if ext == '.xz':
+        return lzma.open(f)
+
+    assert zstandard, "The zstandard package is required to read " + ext + " files."
+    if isinstance(f, str):
+        f = open(f, 'rb')
+    return io.BufferedReader( zstandard.ZstdDecompressor().stream_reader(f, read_across_frames=True) )
+
+# function to open file for binary reading, from an archive if archived
+# archived files are streamed from the archive without extracting it
+# compressed files are decompressed as they are read
+def open_file(path):
+
+    archive, name = split_archive_path(path)
+    ext = compress_ext(name)
+    if archive is None:
+        return decompress_file(path, ext) if ext else open(path, 'rb')
+
+    offset, size, member = archive_index(archive)[name]
+    handle = open_archive(archive)
+    if isinstance(handle, zipfile.ZipFile):
+        f = handle.open(member)
+    else:
+        # seek directly to the file using its offset in the index
+        info = tarfile.TarInfo(member)
+        info.type, info.offset_data, info.size = tarfile.REGTYPE, offset, size
+        f = handle.extractfile(info)
+
+    return decompress_file(f, ext) if ext else f
+
+# function to read size bytes from start of file, from an archive if archived
+def read_range(path, start, size):
+
+    with open_file(path) as f:
+        f.seek(start)
+        return f.read(size)
+
+# function to get size and modification time of file, using the archive modification time if archived
+def file_key(path):
+
+    archive, name = split_archive_path(path)
+    if archive is None:
+        file_stat = os.stat(path)
+        return (file_stat.st_size, file_stat.st_mtime_ns)
+
+    return (archive_index(archive)[name][1], os.stat(archive).st_mtime_ns)
+
+# function to sort files in the order they are best read in
+# archived files are read in the order they are stored, so compressed archives are never read backwards
+def read_order(paths):
+
+    def order(path):
+        archive, name = split_archive_path(path)
+        if archive is None:
+            return ('', 0, path)
+        return (archive, archive_index(archive)[name][0], path)
+
+    return sorted(paths, key=order)
@@ -0,0 +1,198 @@
+import os
+import csv
+import json
+import fnmatch
+import argparse
+
+import histfiles
+
+# columns indexed by default, other columns can be indexed with --columns
+index_columns = ['APPLICATION_HANDLE', 'EXECUTABLE_ID', 'MEMBER']
+
+# loaded hourly indexes by index file path
+hour_indexes = dict()
+
+# function to get path of index file of hourly directory or archived hourly directory
+# indexes are stored by hourly directory name in index path, by default the base path with an _index suffix
+def index_file(hour_dir, index_path):
+
+    return os.path.join( index_path, histfiles.hour_name(hour_dir) + '.index.json' )
+
+# function to get default index path of base path
+def default_index_path(base_path=''):
+
+    return os.path.abspath(base_path or '.') + '_index'
+
+# function to read a record of a file in Db2 DEL format, starting with line
+# records are lines, joined with the following lines while a quoted string with new lines has not ended
+def read_record(f, line):
+
+    record = line
+    while record.count(b'"') % 2:
+        line = f.readline()
+        if not line:
+            break
+        record += line
+    return record
+
+# function to read records of a file in Db2 DEL format with their byte offsets, starting with the column names
+def read_records(f):
+
+    offset = 0
+    line = f.readline()
+    while line:
+        record = read_record(f, line)
+        yield offset, record
+        offset += len(record)
+        line = f.readline()
+
+# function to decode and tokenize a record in Db2 DEL format
+def parse_record(record):
+
+    return next( csv.reader( [ record.decode('utf-8', 'ignore').replace('\0', '') ] ), [] )
+
+# function to index a file, mapping values of index columns to the byte offsets of records with them
+def index_file_values(path, columns):
+
+    values = dict()
+    with histfiles.open_file(path) as f:
+        records = read_records(f)
+        header = [ col.strip() for col in parse_record( next(records, (0, b''))[1] ) ]
+        positions = [ (col, header.index(col)) for col in columns if col in header ]
+        for col, i in positions:
+            values[col] = dict()
+
+        # only tokenize records if an index column is in the file
+        if positions:
+            for offset, record in records:
+                row = parse_record(record)
+                for col, i in positions:
+                    if i < len(row):
+                        values[col].setdefault(row[i], []).append(offset)
+
+    return values
+
+# function to check if name of file in index matches one of patterns, compressed or not
+def matches_patterns(name, patterns):
+
+    return any( fnmatch.fnmatchcase(name, pattern + ext) for pattern in patterns for ext in ('',) + histfiles.compress_exts )
+
+# function to build or update index of hourly directory or archived hourly directory
+# files are only indexed if they are not in the index, or have changed since they were indexed
+# files of other patterns are kept in the index, so indexing some collections does not remove the others
+def build_index(hour_dir, index_path, columns=index_columns, patterns=['*.del']):
+
+    path = index_file(hour_dir, index_path)
+    index = load_index(path) or { 'files': dict() }
+
+    changed = False
+    names = set()
+    for pattern in patterns:
+        for file in histfiles.list_data_files(hour_dir, pattern):
+            name = os.path.basename(file)
+            names.add(name)
+            key = list( histfiles.file_key(file) )
+            entry = index['files'].get(name)
+            if entry and entry['key'] == key and set(entry['columns']) >= set(columns):
+                continue
+            index['files'][name] = { 'key': key, 'columns': columns, 'values': index_file_values(file, columns) }
+            changed = True
+
+    # remove files of patterns which no longer exist
+    for name in set( index['files'] ) - names:
+        if matches_patterns(name, patterns):
+            del index['files'][name]
+            changed = True
+
+    # write index through a temp file so concurrent readers never read a partial index
+    if changed:
+        os.makedirs(index_path, exist_ok=True)
+        tmp_file = path + '.' + str(os.getpid()) + '.tmp'
+        with open(tmp_file, 'w') as f:
+            json.dump(index, f, separators=(',', ':'))
+        os.replace(tmp_file, path)
+        hour_indexes[path] = index
+
+    return changed
+
+# function to load index file, None if it does not exist or can not be read
+def load_index(path):
+
+    global hour_indexes
+
+    if path not in hour_indexes:
+        try:
+            with open(path) as f:
+                hour_indexes[path] = json.load(f)
+        except (OSError, ValueError):
+            hour_indexes[path] = None
+
+    return hour_indexes[path]
+
+# function to look up byte offsets of records in a file with the given values of index columns
+# keys maps column names to lists of values, records must have one of the values of each indexed column
+# returns None if the file is not indexed, has changed since it was indexed, or none of the columns are indexed
+def lookup(path, keys, index_path):
+
+    if not index_path or not keys:
+        return None
+
+    archive, name = histfiles.split_archive_path(path)
+    hour_dir, name = (archive, name) if archive else os.path.split(path)
+
+    index = load_index( index_file(hour_dir, index_path) )
+    entry = index and index['files'].get(name)
+    if not entry or entry['key'] != list( histfiles.file_key(path) ):
+        return None
+
+    offsets = None
+    for col, values in keys.items():
+        if col in entry['values']:
+            col_offsets = set()
+            for value in values:
+                col_offsets.update( entry['values'][col].get(str(value), []) )
+            offsets = col_offsets if offsets is None else offsets & col_offsets
+
+    return None if offsets is None else sorted(offsets)
+
+# function to read the column names and records at byte offsets of a file
+# returns the records as text, starting with the line of column names
+# records are decoded as when the file is read in full, utf-8 for report.py and ascii for quickparse.py
+def read_offsets(path, offsets, encoding='utf-8'):
+
+    lines = []
+    with histfiles.open_file(path) as f:
+        lines.append( f.readline() )
+        for offset in offsets:
+            f.seek(offset)
+            lines.append( read_record( f, f.readline() ) )
+
+    return b''.join(lines).decode(encoding, 'ignore').replace('\0', '')
+
+def main():
+
+    # parse arguments
+    description = "Build indexes of hourly directories, mapping values of key columns to the files and byte offsets of records with them"
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('path', help='path where collection directories are stored')
+    parser.add_argument('-ip', '--index_path',
+                        help='directory to write indexes to, default is path with an _index suffix')
+    parser.add_argument('-ap', '--archive_path',
+                        help='directory of archived hourly directories, default is path with an _archive suffix')
+    parser.add_argument('-c', '--columns', nargs='+', default=index_columns,
+                        help='columns to index, default is ' + ' '.join(index_columns))
+    parser.add_argument('-n', '--collection_names', nargs='+',
+                        help='only index files of these collections, default is all collections')
+
+    args = parser.parse_args()
+
+    index_path = os.path.abspath( args.index_path or default_index_path(args.path) )
+    patterns = [ name + '_*.del' for name in args.collection_names ] if args.collection_names else ['*.del']
+
+    # build or update index of each hourly directory
+    for hour_dir in sorted( histfiles.hour_dirs( args.path, '*_' + '[0-9]' * 10 + '*', args.archive_path ), key=histfiles.hour_name ):
+        changed = build_index(hour_dir, index_path, args.columns, patterns)
+        print( "%s %s" % ( "Indexed" if changed else "Unchanged", histfiles.hour_name(hour_dir) ) )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+import os
+import json
+import hashlib
+import argparse
+
+import histfiles
+import histindex
+
+# name of the copy of task_details.json in each hourly directory
+task_details_name = 'task_details_copy.json'
+
+# directory to cache schemas in, disabled if None
+cache_path = None
+
+# loaded schemas by hash of task details
+# each schema holds the task definitions, and the column names of each collection with the file and file key they were read from
+schemas = dict()
+
+# function to find task details file in the first hourly directory or archived hourly directory that has one
+def task_details_file(hour_dirs):
+
+    for hour_dir in hour_dirs:
+        files = histfiles.list_files(str(hour_dir), task_details_name)
+        if files:
+            return files[0]
+    return None
+
+# function to create schema from content of task details file
+def new_schema(content):
+
+    return { 'hash': hashlib.sha1(content).hexdigest(), 'tasks': json.loads(content), 'columns': dict(), 'sources': dict() }
+
+# function to get path of cached schema by hash of task details
+def schema_cache_file(schema_hash):
+
+    return os.path.join( cache_path, 'schema', schema_hash + '.json' )
+
+# function to load schema of task details file, from the cache if enabled
+# schemas are keyed by a hash of the task details, so column names found by earlier runs are reused until the tasks change,
+# or until rows are found with a different number of columns, e.g. after a fixpack adds columns to a table function
+def load_schema(path):
+
+    global schemas
+
+    with histfiles.open_file(path) as f:
+        content = f.read()
+    schema_hash = hashlib.sha1(content).hexdigest()
+
+    if schema_hash not in schemas:
+        schema = None
+        if cache_path:
+            try:
+                with open( schema_cache_file(schema_hash) ) as f:
+                    schema = json.load(f)
+            except (OSError, ValueError):
+                pass
+        schemas[schema_hash] = schema or new_schema(content)
+
+    return schemas[schema_hash]
+
+# function to read schema file, written by histmeta.py or a task_details.json file
+def read_schema_file(path):
+
+    with open(path, 'rb') as f:
+        content = f.read()
+    schema = json.loads(content)
+
+    return new_schema(content) if isinstance(schema, list) else schema
+
+# function to write schema to file, through a temp file so concurrent readers never read a partial schema
+def write_schema(schema, path):
+
+    os.makedirs( os.path.dirname( os.path.abspath(path) ), exist_ok=True )
+    tmp_file = path + '.' + str(os.getpid()) + '.tmp'
+    with open(tmp_file, 'w') as f:
+        json.dump(schema, f, indent=2)
+    os.replace(tmp_file, path)
+
+# function to get task definition of collection, None if it is not defined
+def collection_task(schema, collection_name):
+
+    for task in schema['tasks']:
+        if task['collection_name'] == collection_name:
+            return task
+    return None
+
+# function to read the header line of a collection file
+def read_header(file):
+
+    with histfiles.open_file(file) as f:
+        _, record = next( histindex.read_records(f), (0, b'') )
+    return record
+
+# function to get column names of collection, parsing them from the header line of file if the schema does not have them yet,
+# if reread is set as rows of file have a different number of columns, or if file is the file they were parsed from and has changed
+# column names of a cached schema or a schema file are trusted otherwise, so no file is read
+# column names parsed from file are added to the cached schema if the cache is enabled
+def collection_columns(schema, collection_name, file, reread=False):
+
+    sources = schema.setdefault('sources', dict())
+    source = sources.get(collection_name)
+
+    if reread or collection_name not in schema['columns'] or ( source and source[0] == file and source[1] != list( histfiles.file_key(file) ) ):
+        schema['columns'][collection_name] = [ col.strip() for col in histindex.parse_record( read_header(file) ) ]
+        sources[collection_name] = [ file, list( histfiles.file_key(file) ) ]
+        if cache_path:
+            write_schema( schema, schema_cache_file(schema['hash']) )
+
+    return schema['columns'][collection_name]
+
+def main():
+
+    # parse arguments
+    description = "Write the task definitions and the column names of each collection to a schema file, to be read by the loader and quickparse scripts with -schemaFrom"
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('path', help='path where collection directories are stored')
+    parser.add_argument('-o', '--output', required=True,
+                        help='schema file to write')
+    parser.add_argument('-ap', '--archive_path',
+                        help='directory of archived hourly directories, default is path with an _archive suffix')
+
+    args = parser.parse_args()
+
+    # read tasks from the latest hourly directory, as collections may have changed since the first
+    hour_dirs = sorted( histfiles.hour_dirs( args.path, '*_' + '[0-9]' * 10 + '*', args.archive_path ), key=histfiles.hour_name, reverse=True )
+    path = task_details_file(hour_dirs)
+    assert path, "No " + task_details_name + " file found."
+    schema = load_schema(path)
+
+    # read column names of each SQL collection from its latest file
+    for task in schema['tasks']:
+        if task['collection_class'] != 'SQL':
+            continue
+        for hour_dir in hour_dirs:
+            files = sorted( histfiles.list_data_files( hour_dir, task['collection_name'] + '_*.del' ) )
+            if files:
+                collection_columns( schema, task['collection_name'], files[-1] )
+                break
+
+    write_schema(schema, args.output)
+    print( "Wrote schema of " + str( len(schema['columns']) ) + " collections to " + args.output )
+
+if __name__ == "__main__":
+    main()